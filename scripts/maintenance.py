@@ -0,0 +1,8 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from src.tools.maintenance import main
+
+
+if __name__ == '__main__':
+    main()
@@ -42,6 +42,32 @@ class Settings(BaseSettings):
     it_siber_recipients: str = Field("", validation_alias="IT_SIBER_RECIPIENTS")
     kvkk_recipients: str = Field("", validation_alias="KVKK_RECIPIENTS")
 
+    lexical_scoring_enabled: bool = Field(False, validation_alias="LEXICAL_SCORING_ENABLED")
+    lexical_min_score: int = Field(0, validation_alias="LEXICAL_MIN_SCORE")
+
+    fetch_max_concurrent: int = Field(1, validation_alias="FETCH_MAX_CONCURRENT")
+
+    priority_scheduling_enabled: bool = Field(True, validation_alias="PRIORITY_SCHEDULING_ENABLED")
+    early_dispatch_min_confidence: int = Field(0, validation_alias="EARLY_DISPATCH_MIN_CONFIDENCE")
+    early_dispatch_window_seconds: int = Field(120, validation_alias="EARLY_DISPATCH_WINDOW_SECONDS")
+
+    mukerrer_editions_enabled: bool = Field(True, validation_alias="MUKERRER_EDITIONS_ENABLED")
+
+    schedule_window_start: str = Field("00:00", validation_alias="SCHEDULE_WINDOW_START")
+    schedule_window_end: str = Field("03:00", validation_alias="SCHEDULE_WINDOW_END")
+    schedule_dense_minutes: int = Field(5, validation_alias="SCHEDULE_DENSE_MINUTES")
+    schedule_retry_minutes: int = Field(15, validation_alias="SCHEDULE_RETRY_MINUTES")
+    schedule_sparse_minutes: int = Field(120, validation_alias="SCHEDULE_SPARSE_MINUTES")
+
+    # 0 = no run budget; set it for the scheduled runs (e.g. 2700).
+    run_budget_seconds: int = Field(0, validation_alias="RUN_BUDGET_SECONDS")
+
+    # 0 keeps every item in items.db.
+    retention_months: int = Field(0, validation_alias="RETENTION_MONTHS")
+    vacuum_interval_days: int = Field(7, validation_alias="VACUUM_INTERVAL_DAYS")
+    mail_log_max_bytes: int = Field(5_000_000, validation_alias="MAIL_LOG_MAX_BYTES")
+    mail_log_keep_files: int = Field(12, validation_alias="MAIL_LOG_KEEP_FILES")
+
 
 def get_settings() -> Settings:
     import os
@@ -78,6 +104,23 @@ def get_settings() -> Settings:
             "lojistik_recipients": "LOJISTIK_RECIPIENTS",
             "it_siber_recipients": "IT_SIBER_RECIPIENTS",
             "kvkk_recipients": "KVKK_RECIPIENTS",
+            "lexical_scoring_enabled": "LEXICAL_SCORING_ENABLED",
+            "lexical_min_score": "LEXICAL_MIN_SCORE",
+            "fetch_max_concurrent": "FETCH_MAX_CONCURRENT",
+            "priority_scheduling_enabled": "PRIORITY_SCHEDULING_ENABLED",
+            "early_dispatch_min_confidence": "EARLY_DISPATCH_MIN_CONFIDENCE",
+            "early_dispatch_window_seconds": "EARLY_DISPATCH_WINDOW_SECONDS",
+            "mukerrer_editions_enabled": "MUKERRER_EDITIONS_ENABLED",
+            "schedule_window_start": "SCHEDULE_WINDOW_START",
+            "schedule_window_end": "SCHEDULE_WINDOW_END",
+            "schedule_dense_minutes": "SCHEDULE_DENSE_MINUTES",
+            "schedule_retry_minutes": "SCHEDULE_RETRY_MINUTES",
+            "schedule_sparse_minutes": "SCHEDULE_SPARSE_MINUTES",
+            "run_budget_seconds": "RUN_BUDGET_SECONDS",
+            "retention_months": "RETENTION_MONTHS",
+            "vacuum_interval_days": "VACUUM_INTERVAL_DAYS",
+            "mail_log_max_bytes": "MAIL_LOG_MAX_BYTES",
+            "mail_log_keep_files": "MAIL_LOG_KEEP_FILES",
         }
 
         def as_bool(v: str | None) -> bool | None:
@@ -90,7 +133,21 @@ def get_settings() -> Settings:
             val = os.getenv(env_key)
             if val is None:
                 continue
-            if attr == "smtp_port":
+            if attr in (
+                "smtp_port",
+                "lexical_min_score",
+                "fetch_max_concurrent",
+                "early_dispatch_min_confidence",
+                "early_dispatch_window_seconds",
+                "schedule_dense_minutes",
+                "schedule_retry_minutes",
+                "schedule_sparse_minutes",
+                "run_budget_seconds",
+                "retention_months",
+                "vacuum_interval_days",
+                "mail_log_max_bytes",
+                "mail_log_keep_files",
+            ):
                 try:
                     fallback_kwargs[attr] = int(val)
                 except Exception:
@@ -101,6 +158,9 @@ def get_settings() -> Settings:
                 "smtp_tls_reject_unauthorized",
                 "smtp_enabled",
                 "admin_mail_enabled",
+                "lexical_scoring_enabled",
+                "priority_scheduling_enabled",
+                "mukerrer_editions_enabled",
             ):
                 bool_val = as_bool(val)
                 if bool_val is not None:
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+from datetime import date
+from typing import Optional
+
 import streamlit as st
-from src.db.storage import get_latest_items
+from src.db.storage import DEPARTMENT_COLUMNS, get_latest_items, get_latest_run_id
+
+# How long a rerun trusts the last seen run id before asking SQLite again.
+RUN_ID_TTL_S = 30
 
 
 st.set_page_config(page_title="Regulation Monitor - Latest Items", layout="wide")
@@ -9,13 +15,28 @@ st.set_page_config(page_title="Regulation Monitor - Latest Items", layout="wide"
 st.title("En Son Çekilen Başlıklar")
 
 count = st.sidebar.number_input("Gösterilecek satır", min_value=1, max_value=500, value=100)
+department = st.sidebar.selectbox("Departman", ["", *DEPARTMENT_COLUMNS], format_func=lambda d: d.upper() or "Tümü")
+only_day = st.sidebar.checkbox("Tek gün")
+day = st.sidebar.date_input("Tarih", value=date.today()) if only_day else None
 refresh = st.sidebar.button("Yenile")
 
-def load_items(limit: int):
-    return get_latest_items(limit)
 
+@st.cache_data(ttl=RUN_ID_TTL_S, show_spinner=False)
+def latest_run_id() -> Optional[int]:
+    return get_latest_run_id()
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_items(run_id: Optional[int], limit: int, department: str, day: Optional[date]) -> list[dict]:
+    # ``run_id`` is only part of the cache key: a new run gives a new key, so
+    # reruns are served from the cache until new results have been stored.
+    return get_latest_items(limit, department=department or None, day=day)
+
+
+if refresh:
+    latest_run_id.clear()
 
-items = load_items(count)
+items = load_items(latest_run_id(), int(count), department, day)
 
 st.write(f"Toplam kayıt: {len(items)}")
 
@@ -25,6 +46,9 @@ for row in items:
     url = row.get("url")
     section = row.get("section")
     subsection = row.get("subsection")
-    with st.expander(f"{title} — {run_date}"):
+    departments = ", ".join(d.upper() for d in row.get("departments", []))
+    with st.expander(f"{title} — {run_date}" + (f" [{departments}]" if departments else "")):
         st.write(f"URL: {url}")
         st.write(f"Bölüm: {section} — Alt: {subsection}")
+        for hit in row.get("hits", []):
+            st.write(f"{hit['department'].upper()} ({hit['confidence'] or '-'}): {hit['evidence'] or '-'}")
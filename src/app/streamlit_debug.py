@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from collections import Counter, defaultdict
-from datetime import date
+from datetime import date, timedelta
 from pathlib import Path
 import sys
 from time import perf_counter
@@ -17,13 +17,12 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.app.config import get_settings
-from src.core.http import build_session
 from src.core.models import GazetteItem
-from src.gazette.client import daily_index_url, fetch_daily_html
-from src.notify.emailer import send_html_email
+from src.db.history_export import EXPORT_DIR, read_history
+from src.notify.outbox import send_now
 from src.notify.templates import build_generic_email_html, build_generic_email_subject
-from src.pipeline.run_daily import CandidateDecision, PolicyHit, collect_daily_hits, default_policies
+from src.pipeline.engine import PipelineEngine, recipients_map as build_recipients_map
+from src.pipeline.run_daily import CandidateDecision, PolicyHit, default_policies
 from src.policies.base import PolicyDecision
 
 
@@ -99,6 +98,7 @@ def _policy_hit_to_row(hit: PolicyHit) -> dict[str, Any]:
         "score": decision.score,
         "is_relevant": decision.is_relevant,
         "reasons": ", ".join(decision.reasons),
+        "lexical_score": hit.lexical.score if hit.lexical else None,
         "llm_confidence": llm.confidence,
         "llm_isg": llm.isg,
         "llm_ik": llm.ik,
@@ -111,13 +111,15 @@ def _policy_hit_to_row(hit: PolicyHit) -> dict[str, Any]:
 
 def _run_debug(day: date) -> dict[str, Any]:
     start = perf_counter()
-    settings = get_settings()
-    session = build_session()
+    engine = PipelineEngine(default_policies())
+    settings = engine.settings
 
-    url = daily_index_url(day)
-    html = fetch_daily_html(session=session, day=day)
-    policies = default_policies()
-    items, candidate_map, raw_hits_by_policy = collect_daily_hits(day=day, policies=policies)
+    day_result = engine.process_day(day)
+    url = day_result.index.url
+    html = day_result.index.html
+    items = list(day_result.items)
+    candidate_map = day_result.candidate_map
+    raw_hits_by_policy = day_result.hits_by_dept
 
     decisions_by_policy: dict[str, list[tuple[GazetteItem, PolicyDecision]]] = {}
     hits_by_policy: dict[str, list[tuple[GazetteItem, PolicyDecision]]] = {}
@@ -149,12 +151,7 @@ def _run_debug(day: date) -> dict[str, Any]:
         decisions_by_policy[policy_name] = decisions
         hits_by_policy[policy_name] = hits
 
-    recipients_map = {
-        "isg": _split_recipients(settings.isg_recipients),
-        "ik": _split_recipients(settings.ik_recipients),
-        "muhasebe": _split_recipients(settings.muhasebe_recipients),
-        "lojistik": _split_recipients(settings.lojistik_recipients),
-    }
+    recipients_map = build_recipients_map(settings)
 
     section_counts = Counter(item.section or "(empty)" for item in items)
     subsection_counts = Counter(item.subsection or "(empty)" for item in items)
@@ -181,6 +178,7 @@ def _run_debug(day: date) -> dict[str, Any]:
         "items": items,
         "candidate_map": candidate_map,
         "settings": settings,
+        "engine": engine,
         "settings_preview": _settings_preview(settings),
         "section_counts": section_counts,
         "subsection_counts": subsection_counts,
@@ -194,6 +192,27 @@ def _run_debug(day: date) -> dict[str, Any]:
     }
 
 
+def _render_history(day: date, days: int) -> None:
+    """Department hits from the Parquet export; only the needed columns and months are read."""
+    st.subheader(f"History (Parquet export, {days} days up to {day:%Y-%m-%d})")
+    try:
+        hits = read_history(
+            "item_departments",
+            columns=["run_date", "department"],
+            start=day - timedelta(days=days - 1),
+            end=day,
+        ).to_pandas()
+    except Exception as exc:
+        st.info(f"No Parquet export under `{EXPORT_DIR}` ({exc}). Run `python -m scripts.export_history`.")
+        return
+    if hits.empty:
+        st.info("No exported hits in this range.")
+        return
+    pivot = hits.pivot_table(index="run_date", columns="department", aggfunc="size", fill_value=0)
+    st.bar_chart(pivot)
+    st.dataframe(pivot.sort_index(ascending=False), use_container_width=True)
+
+
 def main() -> None:
     st.set_page_config(page_title="RG Debug Console", layout="wide")
     st.title("Factory Regulation Monitoring - Debug Console")
@@ -205,6 +224,10 @@ def main() -> None:
         show_only_hits = st.checkbox("Only show relevant policy rows", value=True)
         allow_send_email = st.checkbox("Enable real email sending", value=False)
         run_clicked = st.button("Run debug", type="primary")
+        history_days = st.selectbox("History (exported)", [0, 30, 90, 365], format_func=lambda d: "off" if not d else f"{d} days")
+
+    if history_days:
+        _render_history(run_day, history_days)
 
     if run_clicked:
         with st.spinner("Running pipeline..."):
@@ -341,36 +364,17 @@ def main() -> None:
                     default=mailable_departments,
                 )
                 if st.button("Send selected emails", type="primary"):
-                    sent_count = 0
-                    errors: list[str] = []
-                    settings = result["settings"]
-                    for dept in selected_departments:
-                        hits = hits_by_policy[dept]
-                        recipients = recipients_map.get(dept, [])
-                        if not recipients:
-                            errors.append(f"{dept.upper()}: no recipients configured.")
-                            continue
-
-                        subject = build_generic_email_subject(dept, result["day"], len(hits))
-                        html_body = build_generic_email_html(dept, result["day"], [item for item, _ in hits])
-                        try:
-                            send_html_email(
-                                smtp_host=settings.smtp_host,
-                                smtp_port=settings.smtp_port,
-                                smtp_user=settings.smtp_user,
-                                smtp_password=settings.smtp_password,
-                                smtp_secure=settings.smtp_secure,
-                                smtp_auth=settings.smtp_auth,
-                                smtp_tls_reject_unauthorized=settings.smtp_tls_reject_unauthorized,
-                                smtp_enabled=settings.smtp_enabled,
-                                mail_from=settings.mail_from,
-                                recipients=recipients,
-                                subject=subject,
-                                html_body=html_body,
-                            )
-                            sent_count += 1
-                        except Exception as exc:  # pragma: no cover - manual/debug path
-                            errors.append(f"{dept.upper()}: {exc}")
+                    # Direct send: the outbox would drop items already delivered
+                    # (a resend) and add unrelated leftover rows.
+                    engine: PipelineEngine = result["engine"]
+                    mail_results = send_now(
+                        engine.settings,
+                        recipients_map,
+                        result["day"],
+                        {dept: [hit.item for hit in policy_hits_by_policy.get(dept, [])] for dept in selected_departments},
+                    )
+                    sent_count = sum(1 for r in mail_results if r.status == "sent")
+                    errors = [f"{r.department.upper()}: {r.error}" for r in mail_results if r.error]
 
                     if sent_count:
                         st.success(f"Sent {sent_count} email batch(es).")
@@ -1,50 +1,135 @@
 from __future__ import annotations
 
 import os
-import threading
-import traceback
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
-from flask import Flask, flash, redirect, render_template, request, url_for
+from typing import List, Optional
 
-from src.db.storage import get_department_counts, get_items, get_last_check_time
+from flask import Flask, flash, get_template_attribute, jsonify, redirect, render_template, request, url_for
+
+from src.db.storage import (
+    ItemCursor,
+    cancel_fetch_job,
+    enqueue_fetch_job,
+    get_daily_stats,
+    get_day_progress,
+    get_department_counts,
+    get_fetch_jobs,
+    get_items,
+    get_last_check_time,
+    get_latest_stage_timings,
+    release_connection,
+)
 
 template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
 app = Flask(__name__, template_folder=template_dir)
 app.secret_key = "regulation-monitor-secret-key"
 
 
-@app.route("/")
-def index():
+@app.teardown_appcontext
+def _release_db(exc: Optional[BaseException]) -> None:
+    # The threaded server runs each request on a new thread; its connection goes
+    # back to the pool for the next request instead of being reopened.
+    release_connection()
+
+
+PAGE_SIZES = (50, 100, 200, 500)
+
+
+def _page_args():
     limit = request.args.get("limit", 100, type=int)
-    if limit not in (50, 100, 200, 500):
+    if limit not in PAGE_SIZES:
         limit = 100
     search = request.args.get("q", "").strip()
-    items = get_items(limit=limit, search=search or None)
+    department = request.args.get("dept", "").strip().lower()
+    return limit, search, department
+
+
+def _next_cursor(items: List[dict], limit: int, search: str) -> Optional[str]:
+    """Cursor of the page after ``items``; None when this was the last page (or a ranked search)."""
+    if search or len(items) < limit:
+        return None
+    return f"{items[-1]['run_date']}:{items[-1]['id']}"
+
+
+def _parse_cursor(raw: str) -> Optional[ItemCursor]:
+    run_date, _, item_id = raw.partition(":")
+    try:
+        return date.fromisoformat(run_date).isoformat(), int(item_id)
+    except ValueError:
+        return None
+
+
+@app.route("/")
+def index():
+    limit, search, department = _page_args()
+    items = get_items(limit=limit, search=search or None, department=department or None)
     last_check = get_last_check_time()
-    dept_counts = get_department_counts(items)
+    dept_counts = get_department_counts()
+    stage_timings = get_latest_stage_timings()
+    jobs = get_fetch_jobs(limit=5)
+    day_progress = get_day_progress(date.today())
     today = date.today().isoformat()
     return render_template(
         "index.html",
         items=items,
+        next_cursor=_next_cursor(items, limit, search),
         limit=limit,
         search=search,
+        department=department,
         last_check=last_check,
         dept_counts=dept_counts,
+        stage_timings=stage_timings,
+        jobs=jobs,
+        day_progress=day_progress,
         today=today,
     )
 
 
-def _fetch_worker(day: date) -> None:
-    """Run pipeline for the given day in a background thread."""
-    try:
-        from src.pipeline.run_daily import default_policies, run
+@app.route("/api/items")
+def api_items():
+    """
+    One page of the item list for infinite scroll: ``cursor`` is the
+    ``next_cursor`` of the previous page. ``html`` holds the rendered table rows.
+    """
+    limit, search, department = _page_args()
+    before = None
+    if request.args.get("cursor"):
+        before = _parse_cursor(request.args["cursor"])
+        if before is None:
+            return jsonify({"error": "invalid cursor"}), 400
+    items = get_items(limit=limit, search=search or None, department=department or None, before=before)
+    return jsonify(
+        {
+            "items": items,
+            "next_cursor": _next_cursor(items, limit, search),
+            "html": str(get_template_attribute("_items.html", "item_rows")(items)),
+        }
+    )
+
+
+TREND_DAYS = (7, 30, 90, 365)
+
 
-        run(day=day, policies=default_policies())
-        print(f"[INFO] Manual fetch completed for {day.isoformat()}")
-    except Exception:
-        print(f"[ERROR] Manual fetch failed for {day.isoformat()}")
-        traceback.print_exc()
+@app.route("/trends")
+def trends():
+    """Per-day counters from ``daily_stats``; never reads the items table."""
+    days = request.args.get("days", 30, type=int)
+    if days not in TREND_DAYS:
+        days = 30
+    stats = get_daily_stats(start=date.today() - timedelta(days=days - 1))
+    totals = {
+        key: sum(r[key] for r in stats) for key in ("items_found", "candidates", "classified", "hit_items", "llm_calls")
+    }
+    dept_totals = {dept: sum(r["departments"][dept] for r in stats) for dept in (stats[0]["departments"] if stats else {})}
+    return render_template(
+        "trends.html",
+        stats=stats,
+        days=days,
+        totals=totals,
+        dept_totals=dept_totals,
+        max_items=max((r["items_found"] for r in stats), default=0),
+    )
 
 
 @app.route("/fetch", methods=["POST"])
@@ -53,13 +138,32 @@ def fetch():
     if date_str:
         try:
             day = datetime.strptime(date_str, "%Y-%m-%d").date()
-            thread = threading.Thread(target=_fetch_worker, args=(day,), daemon=True)
-            thread.start()
-            flash(
-                f"{date_str} tarihi için veri çekme işlemi başlatıldı. "
-                "Birkaç dakika sonra sayfayı yenileyerek sonuçları görebilirsiniz.",
-                "info",
-            )
+            # The pipeline runs in the worker process; the web process only queues the job.
+            job_id, created = enqueue_fetch_job(day)
+            if created:
+                flash(f"{date_str} tarihi için veri çekme işi kuyruğa alındı (iş #{job_id}).", "info")
+            else:
+                flash(f"{date_str} tarihi için zaten bekleyen/çalışan bir iş var (iş #{job_id}).", "warning")
         except ValueError:
             flash("Geçersiz tarih formatı. YYYY-MM-DD kullanın.", "danger")
     return redirect(url_for("index"))
+
+
+@app.route("/jobs")
+def jobs():
+    limit = min(request.args.get("limit", 20, type=int), 100)
+    return jsonify(get_fetch_jobs(limit=limit))
+
+
+@app.route("/jobs/<int:job_id>/cancel", methods=["POST"])
+def cancel_job(job_id: int):
+    status = cancel_fetch_job(job_id)
+    if status is None:
+        flash(f"İş #{job_id} bulunamadı.", "danger")
+    elif status == "cancelled":
+        flash(f"İş #{job_id} iptal edildi.", "info")
+    elif status == "running":
+        flash(f"İş #{job_id} için iptal istendi; mevcut kayıt bitince duracak.", "info")
+    else:
+        flash(f"İş #{job_id} zaten tamamlanmış ({status}).", "warning")
+    return redirect(url_for("index"))
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover - optional dependency
+    zstandard = None  # type: ignore[assignment]
+
+# The first byte of a blob names its codec. New blobs are always zlib (standard
+# library): the search triggers decompress them inside SQLite, where a missing
+# optional package would fail the write. zstd blobs written by earlier versions
+# stay readable where zstandard is installed.
+ZLIB = b"z"
+ZSTD = b"s"
+ZLIB_LEVEL = 9
+
+
+def pack_text(text: Optional[str]) -> Optional[bytes]:
+    """Compress ``text`` with zlib; ``None`` for empty text."""
+    if not text:
+        return None
+    return ZLIB + zlib.compress(text.encode("utf-8"), ZLIB_LEVEL)
+
+
+def unpack_text(blob: Optional[bytes], max_chars: Optional[int] = None) -> str:
+    """
+    The text of a ``pack_text`` blob. With ``max_chars`` only its first
+    ``max_chars`` characters are decompressed (UTF-8: at most 4 bytes each).
+    """
+    if not blob:
+        return ""
+    codec, payload = bytes(blob[:1]), bytes(blob[1:])
+    max_bytes = 4 * max_chars if max_chars is not None else None
+    if codec == ZLIB:
+        data = zlib.decompressobj().decompress(payload, max_bytes) if max_bytes else zlib.decompress(payload)
+    elif codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("blob is zstd-compressed but the zstandard package is not installed")
+        if max_bytes:
+            data = zstandard.ZstdDecompressor().stream_reader(payload).read(max_bytes)
+        else:
+            data = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        raise ValueError(f"unknown compression codec {codec!r}")
+    if max_bytes is None:
+        return data.decode("utf-8")
+    # The cut may split a character; its bytes are dropped.
+    return data.decode("utf-8", "ignore")[:max_chars]
@@ -9,3 +9,4 @@ class GazetteItem:
     url: str
     section: Optional[str] = None      # ör: "YASAMA BÖLÜMÜ"
     subsection: Optional[str] = None   # ör: "KANUN"
+    edition: str = ""                  # "" = asıl sayı, "M1", "M2" = mükerrer sayılar
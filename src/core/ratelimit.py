@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Spaces calls at least ``min_interval_s`` apart across all threads sharing
+    the limiter, so parallel workers stay within one global request rate.
+    """
+
+    def __init__(self, min_interval_s: float) -> None:
+        self.min_interval_s = max(0.0, min_interval_s)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self) -> float:
+        """Block until the caller's slot; returns the seconds waited."""
+        if self.min_interval_s <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval_s
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+# Turkish letters folded to their ASCII base; "I" is dotless in Turkish but
+# users type both, so dotted/dotless i fold to the same letter.
+_TR_FOLD = str.maketrans(
+    {
+        "İ": "i",
+        "I": "i",
+        "ı": "i",
+        "Ş": "s",
+        "ş": "s",
+        "Ğ": "g",
+        "ğ": "g",
+        "Ü": "u",
+        "ü": "u",
+        "Ö": "o",
+        "ö": "o",
+        "Ç": "c",
+        "ç": "c",
+        "Â": "a",
+        "â": "a",
+        "Î": "i",
+        "î": "i",
+        "Û": "u",
+        "û": "u",
+    }
+)
+
+
+def fold_tr(text: str) -> str:
+    """
+    Case- and accent-insensitive form of Turkish text for search
+    ("SAĞLIK", "Sağlık" and "saglik" all become "saglik").
+
+    The result has the same length as the input for ordinary text, so match
+    positions in the folded text can be used to cut snippets from the original.
+    """
+    folded = (text or "").translate(_TR_FOLD)
+    lowered = folded.lower()
+    return lowered if len(lowered) == len(folded) else "".join(c.lower()[:1] for c in folded)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    stage: str
+    count: int
+    total_s: float
+    p50_s: float
+    p95_s: float
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def cache_hit_rate(self) -> Optional[float]:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else None
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StageTimer:
+    """
+    Collects wall-clock samples per stage plus cache hit/miss counts.
+
+    Thread-safe, so stages running in worker threads can share one timer.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._hits: Counter[str] = Counter()
+        self._misses: Counter[str] = Counter()
+        self._order: List[str] = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._hits.clear()
+            self._misses.clear()
+            self._order.clear()
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, perf_counter() - start)
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._touch(stage)
+            self._samples[stage].append(seconds)
+
+    def cache(self, stage: str, hit: bool) -> None:
+        with self._lock:
+            self._touch(stage)
+            if hit:
+                self._hits[stage] += 1
+            else:
+                self._misses[stage] += 1
+
+    def summary(self) -> Tuple[StageTiming, ...]:
+        with self._lock:
+            timings: List[StageTiming] = []
+            for stage in self._order:
+                samples = sorted(self._samples.get(stage, ()))
+                timings.append(
+                    StageTiming(
+                        stage=stage,
+                        count=len(samples),
+                        total_s=sum(samples),
+                        p50_s=percentile(samples, 50),
+                        p95_s=percentile(samples, 95),
+                        cache_hits=self._hits[stage],
+                        cache_misses=self._misses[stage],
+                    )
+                )
+            return tuple(timings)
+
+    def _touch(self, stage: str) -> None:
+        if stage not in self._order:
+            self._order.append(stage)
@@ -0,0 +1 @@
+"""Long-running scheduler and worker entry points."""
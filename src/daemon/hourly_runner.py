@@ -2,10 +2,7 @@
 from __future__ import annotations
 
 import logging
-import subprocess
-import sys
-import time
-from datetime import datetime, timedelta
+from time import perf_counter
 
 
 logging.basicConfig(
@@ -15,30 +12,22 @@ logging.basicConfig(
 )
 
 
-def run_once() -> None:
-    logging.info("Starting hourly run")
-    try:
-        # call the existing entrypoint as a subprocess so behavior matches CLI
-        subprocess.run([sys.executable, "-m", "src.app.main"], check=False)
-    except Exception:
-        logging.exception("Run failed")
-    logging.info("Hourly run finished")
-
+def main() -> None:
+    logging.info("Hourly runner started")
 
-def sleep_until_next_hour() -> None:
-    now = datetime.now()
-    next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
-    seconds = (next_hour - now).total_seconds()
-    logging.info("Sleeping %.0f seconds until next hour (%s)", seconds, next_hour.isoformat())
-    time.sleep(seconds)
+    # Pay the import and setup cost (bs4, pydantic, requests, optional
+    # fitz/pytesseract, compiled rules, HTTP session) once for the process
+    # lifetime instead of once per run.
+    started = perf_counter()
+    from src.daemon.worker import PipelineWorker, serve
 
+    worker = PipelineWorker()
+    worker.startup_s = perf_counter() - started
+    logging.info("Warm worker ready in %.2fs", worker.startup_s)
 
-def main() -> None:
-    logging.info("Hourly runner started")
-    # Run immediately on start, then at every top of hour
-    while True:
-        run_once()
-        sleep_until_next_hour()
+    # Run immediately on start, then as the adaptive publication-window
+    # schedule decides; manual fetch jobs queued by the dashboard run in between.
+    serve(worker)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Optional
+
+from src.app.config import Settings
+from src.db.storage import archive_items_before, compact_db, incremental_vacuum_enabled, maintenance_due
+from src.notify.mail_log import rotate_mail_log
+
+# Archiving is checked at most once a day; most days there is nothing to move.
+ARCHIVE_INTERVAL_DAYS = 1
+
+
+def retention_cutoff(today: date, months: int) -> date:
+    """First day of the month ``months`` months before ``today``'s month; older items are archived."""
+    index = today.year * 12 + today.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def run_maintenance(
+    settings: Settings,
+    today: Optional[date] = None,
+    force: bool = False,
+    full_vacuum: bool = False,
+) -> None:
+    """
+    Periodic housekeeping between runs: archive items past ``RETENTION_MONTHS``,
+    compact the database every ``VACUUM_INTERVAL_DAYS`` and rotate the mail
+    event log. ``force`` ignores the intervals (not the settings that disable
+    a task). Compaction runs in short steps (see ``compact_db``); ``full_vacuum``
+    runs one blocking VACUUM and is only for a stopped worker.
+    """
+    today = today or date.today()
+    if settings.retention_months > 0 and (force or maintenance_due("archive", ARCHIVE_INTERVAL_DAYS)):
+        cutoff = retention_cutoff(today, settings.retention_months)
+        moved = archive_items_before(cutoff)
+        for year, count in moved.items():
+            print(f"[MAINT] archived {count} item(s) of {year} (before {cutoff.isoformat()})")
+
+    if full_vacuum or (
+        settings.vacuum_interval_days > 0 and (force or maintenance_due("vacuum", settings.vacuum_interval_days))
+    ):
+        if not full_vacuum and not incremental_vacuum_enabled():
+            print("[MAINT] items.db is not in incremental vacuum mode; convert it once: scripts.maintenance --full-vacuum")
+        before, after = compact_db(full=full_vacuum)
+        print(f"[MAINT] database compacted: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+    archive = rotate_mail_log(settings.mail_log_max_bytes, settings.mail_log_keep_files)
+    if archive is not None:
+        print(f"[MAINT] mail log rotated -> {archive.name}")
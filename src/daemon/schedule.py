@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from src.app.config import Settings
+
+
+@dataclass(frozen=True)
+class ScheduleConfig:
+    """
+    The gazette is published once around midnight. Inside the publication
+    window the worker polls every ``dense``; outside it, a day that is not
+    fully processed is retried every ``retry`` and a finished day is only
+    checked every ``sparse`` for extra ("mükerrer") editions.
+    """
+
+    window_start: time = time(0, 0)
+    window_end: time = time(3, 0)
+    dense: timedelta = timedelta(minutes=5)
+    retry: timedelta = timedelta(minutes=15)
+    sparse: timedelta = timedelta(hours=2)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ScheduleConfig":
+        return cls(
+            window_start=time.fromisoformat(settings.schedule_window_start),
+            window_end=time.fromisoformat(settings.schedule_window_end),
+            dense=timedelta(minutes=settings.schedule_dense_minutes),
+            retry=timedelta(minutes=settings.schedule_retry_minutes),
+            sparse=timedelta(minutes=settings.schedule_sparse_minutes),
+        )
+
+
+@dataclass(frozen=True)
+class DayStatus:
+    published: bool = False  # the index had items
+    complete: bool = False  # published and nothing left to retry
+
+
+class AdaptiveSchedule:
+    """Decides when the worker runs next, based on what the last run for the day found."""
+
+    def __init__(self, config: Optional[ScheduleConfig] = None) -> None:
+        self.config = config or ScheduleConfig()
+        self._days: Dict[date, DayStatus] = {}
+
+    def record(self, day: date, total_items: Optional[int], retry_items: int = 0) -> None:
+        """``total_items`` is ``None`` when the run failed (e.g. the index is not online yet)."""
+        previous = self._days.get(day, DayStatus())
+        published = previous.published or bool(total_items)
+        complete = published and total_items is not None and retry_items == 0
+        self._days[day] = DayStatus(published=published, complete=complete)
+        # Only today's and yesterday's status can still matter.
+        for old in [d for d in self._days if d < day - timedelta(days=1)]:
+            del self._days[old]
+
+    def status(self, day: date) -> DayStatus:
+        return self._days.get(day, DayStatus())
+
+    def in_window(self, now: datetime) -> bool:
+        start, end, t = self.config.window_start, self.config.window_end, now.time()
+        if start <= end:
+            return start <= t < end
+        return t >= start or t < end  # window spans midnight
+
+    def next_window_start(self, now: datetime) -> datetime:
+        start = datetime.combine(now.date(), self.config.window_start)
+        return start if start > now else start + timedelta(days=1)
+
+    def next_run_at(self, now: datetime) -> datetime:
+        status = self.status(now.date())
+        if status.complete:
+            step = self.config.sparse
+        elif self.in_window(now):
+            step = self.config.dense
+        else:
+            step = self.config.retry
+        # Never sleep past the next publication window or the day change.
+        midnight = datetime.combine(now.date() + timedelta(days=1), time(0, 0))
+        return min(now + step, self.next_window_start(now), midnight)
+
+    def describe(self, now: datetime) -> str:
+        status = self.status(now.date())
+        if status.complete:
+            return "day complete, sparse checks for extra editions"
+        if status.published:
+            return "day published, retrying unfinished items"
+        return "waiting for publication" + (" (window open)" if self.in_window(now) else "")
@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+import threading
+import traceback
+from datetime import date, datetime, timedelta
+from statistics import median
+from time import perf_counter
+from typing import List, Optional
+
+from src.app.config import get_settings
+from src.daemon.maintenance import run_maintenance
+from src.daemon.schedule import AdaptiveSchedule, ScheduleConfig
+from src.db.storage import (
+    claim_fetch_job,
+    finish_fetch_job,
+    get_daily_stats,
+    requeue_fetch_job,
+    update_fetch_job_progress,
+)
+from src.notify.emailer import send_html_email
+from src.notify.templates import build_admin_status_email_html, build_admin_status_email_subject
+from src.pipeline.engine import PipelineCaches, PipelineEngine, ProgressCallback, RunCancelled, split_recipients
+from src.pipeline.lease import LeaseHeld
+from src.pipeline.run_daily import RunReport, default_policies, run
+
+# How often an idle worker looks for manual fetch jobs queued by the web process.
+JOB_POLL_SECONDS = 5.0
+# Days of daily_stats shown in the admin status email.
+ADMIN_TREND_DAYS = 7
+
+
+def send_admin_status_email(
+    *,
+    day: date,
+    report: RunReport | None,
+    run_error: Exception | None,
+    traceback_text: str = "",
+) -> None:
+    settings = get_settings()
+    if not settings.admin_mail_enabled:
+        print("[INFO] ADMIN_MAIL_ENABLED is false. Admin status email skipped.")
+        return
+
+    recipients = split_recipients(settings.admin_recipients)
+    if not recipients:
+        print("[WARN] ADMIN_RECIPIENTS is empty. Admin status email skipped.")
+        return
+
+    rows: list[dict[str, str]] = []
+    total_items: int | None = None
+    new_items: int | None = None
+    skipped_items: int | None = None
+    outbox_counts: dict[str, int] | None = None
+    timing_rows: list[dict[str, str]] = []
+    if report is not None:
+        total_items = report.total_items
+        new_items = report.new_items
+        skipped_items = report.skipped_items
+        outbox_counts = {
+            "queued": report.mail_queued,
+            "sent": report.mail_sent,
+            "deduplicated": report.mail_deduplicated,
+        }
+        for timing in report.stage_timings:
+            hit_rate = timing.cache_hit_rate
+            timing_rows.append(
+                {
+                    "stage": timing.stage,
+                    "total": f"{timing.total_s:.2f}s",
+                    "count": str(timing.count),
+                    "p50": f"{timing.p50_s:.2f}s",
+                    "p95": f"{timing.p95_s:.2f}s",
+                    "cache": f"{hit_rate:.0%}" if hit_rate is not None else "-",
+                }
+            )
+        for result in report.department_results:
+            rows.append(
+                {
+                    "department": result.department.upper(),
+                    "status": result.status,
+                    "hit_count": f"{result.hit_count} (yeni {result.queued}, tekrar {result.deduplicated})",
+                    "recipients": ", ".join(result.recipients) if result.recipients else "-",
+                    "subject": result.subject or "-",
+                    "titles": " | ".join(result.sample_titles) if result.sample_titles else "-",
+                    "error": result.error or "-",
+                }
+            )
+
+    trend_rows: list[dict[str, str]] = []
+    try:
+        stats = get_daily_stats(start=day - timedelta(days=ADMIN_TREND_DAYS - 1), end=day)
+    except Exception as exc:
+        print(f"[WARN] ADMIN: daily stats unavailable -> {exc}")
+        stats = []
+    for row in stats:
+        trend_rows.append(
+            {
+                "date": row["run_date"],
+                "items": str(row["items_found"]),
+                "candidates": str(row["candidates"]),
+                "llm_calls": str(row["llm_calls"]),
+                "hits": ", ".join(f"{dept.upper()} {n}" for dept, n in row["departments"].items() if n) or "-",
+            }
+        )
+
+    success = run_error is None
+    subject = build_admin_status_email_subject(day=day, success=success)
+    html_body = build_admin_status_email_html(
+        day=day,
+        success=success,
+        total_items=total_items,
+        rows=rows,
+        error_message=str(run_error) if run_error else "",
+        traceback_text=traceback_text if run_error else "",
+        new_items=new_items,
+        skipped_items=skipped_items,
+        outbox_counts=outbox_counts,
+        timing_rows=timing_rows,
+        trend_rows=trend_rows,
+    )
+
+    send_html_email(
+        smtp_host=settings.smtp_host,
+        smtp_port=settings.smtp_port,
+        smtp_user=settings.smtp_user,
+        smtp_password=settings.smtp_password,
+        smtp_secure=settings.smtp_secure,
+        smtp_auth=settings.smtp_auth,
+        smtp_tls_reject_unauthorized=settings.smtp_tls_reject_unauthorized,
+        smtp_enabled=settings.smtp_enabled,
+        mail_from=settings.mail_from,
+        recipients=recipients,
+        subject=subject,
+        html_body=html_body,
+    )
+    print(f"[INFO] ADMIN: status email sent to {', '.join(recipients)}")
+
+
+class PipelineWorker:
+    """
+    Long-lived, in-process pipeline runner.
+
+    Imports, the HTTP session (and its keep-alive connections), compiled policy
+    rules and the text/LLM caches survive between runs; only the daily index is
+    fetched fresh each time. Caches are dropped when the day changes.
+
+    Manual fetch jobs run on a second engine (same session, LLM client and
+    rate limiter, caches of its own), so a job for another day does not drop
+    the scheduled run's warm caches.
+    """
+
+    def __init__(self, engine: Optional[PipelineEngine] = None, startup_s: float = 0.0) -> None:
+        self.engine = engine or PipelineEngine(default_policies())
+        self.policies = list(self.engine.policy_map.values())
+        self.startup_s = startup_s
+        self.run_durations: List[float] = []
+        self.last_error: Optional[Exception] = None
+        self.last_traceback = ""
+        self._cache_day: Optional[date] = None
+        self._job_engine: Optional[PipelineEngine] = None
+        self._job_cache_day: Optional[date] = None
+
+    def run_once(
+        self,
+        day: Optional[date] = None,
+        admin_email: bool = True,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Optional[RunReport]:
+        """
+        Run the pipeline for ``day`` (default today), skipping items earlier runs
+        already handled. Returns ``None`` and sets ``last_error`` if the run failed.
+        """
+        day = day or date.today()
+        print(f"\n[SCHEDULER] Running check for {day.isoformat()} ...")
+        self._cache_day = _prepare_caches(self.engine, day, self._cache_day)
+        started = perf_counter()
+        report = self._run(self.engine, day, progress, incremental=True)
+        # Only these runs feed startup_report; jobs run on caches of their own.
+        self.run_durations.append(perf_counter() - started)
+        if admin_email:
+            self.send_status(day, report)
+        return report
+
+    def run_job(self, day: date, progress: Optional[ProgressCallback] = None) -> Optional[RunReport]:
+        """
+        Manual fetch for ``day``: like a direct ``run(day)`` every item is
+        processed again (``incremental=False``), on the job engine.
+        """
+        if self._job_engine is None:
+            self._job_engine = PipelineEngine(
+                self.policies,
+                settings=self.engine.settings,
+                session=self.engine.session,
+                ollama=self.engine.ollama,
+                rate_limiter=self.engine.rate_limiter,
+            )
+        self._job_cache_day = _prepare_caches(self._job_engine, day, self._job_cache_day)
+        return self._run(self._job_engine, day, progress, incremental=False)
+
+    def _run(
+        self,
+        engine: PipelineEngine,
+        day: date,
+        progress: Optional[ProgressCallback],
+        incremental: bool,
+    ) -> Optional[RunReport]:
+        report: RunReport | None = None
+        run_error: Exception | None = None
+        tb_text = ""
+
+        try:
+            report = run(day=day, policies=self.policies, engine=engine, incremental=incremental, progress=progress)
+        except RunCancelled as exc:
+            run_error = exc
+            print(f"[INFO] Run for {day.isoformat()} cancelled")
+        except LeaseHeld as exc:
+            run_error = exc
+            print(f"[INFO] Run for {day.isoformat()} skipped: {exc}")
+        except Exception as exc:
+            run_error = exc
+            tb_text = traceback.format_exc()
+            print(tb_text)
+        self.last_error = run_error
+        self.last_traceback = tb_text
+        return report
+
+    def send_status(self, day: date, report: Optional[RunReport]) -> None:
+        """Admin status email for the last run."""
+        try:
+            send_admin_status_email(
+                day=day, report=report, run_error=self.last_error, traceback_text=self.last_traceback,
+            )
+        except Exception as admin_exc:
+            print(f"[ERROR] ADMIN: status email failed -> {admin_exc}")
+
+    def startup_report(self) -> str:
+        """Cold start (imports + first run) versus warm steady-state run time."""
+        if not self.run_durations:
+            return f"startup {self.startup_s:.2f}s, no runs yet"
+        first = self.run_durations[0]
+        text = f"startup {self.startup_s:.2f}s, first run {first:.2f}s"
+        warm = self.run_durations[1:]
+        if warm:
+            steady = median(warm)
+            text += f", steady-state median {steady:.2f}s over {len(warm)} run(s)"
+            if steady > 0:
+                text += f" ({(self.startup_s + first) / steady:.1f}x cold/warm)"
+        return text
+
+
+def _prepare_caches(engine: PipelineEngine, day: date, cache_day: Optional[date]) -> date:
+    """Ready ``engine``'s caches for a run of ``day``; returns the day they now belong to."""
+    # The index page changes during the day (late or extra editions), so it is never reused.
+    engine.caches.index.clear()
+    if cache_day != day:
+        engine.caches = PipelineCaches()
+    return day
+
+
+def run_next_fetch_job(worker: PipelineWorker, max_running: int = 1) -> bool:
+    """Run the oldest queued manual fetch job, if any. Returns whether a job ran."""
+    job = claim_fetch_job(max_running)
+    if job is None:
+        return False
+    job_id = job["id"]
+    day = date.fromisoformat(job["run_date"])
+    print(f"[JOB] #{job_id} manual fetch for {day.isoformat()}")
+
+    def progress(done: int, total: int) -> None:
+        if update_fetch_job_progress(job_id, done, total):
+            raise RunCancelled(f"job #{job_id} cancelled at {done}/{total}")
+
+    report = worker.run_job(day, progress=progress)
+    if isinstance(worker.last_error, LeaseHeld):
+        # Another worker is running this day; claim_fetch_job skips it until the lease ends.
+        requeue_fetch_job(job_id, str(worker.last_error))
+        print(f"[INFO] JOB #{job_id} requeued: {worker.last_error}")
+        return False
+    if isinstance(worker.last_error, RunCancelled):
+        finish_fetch_job(job_id, "cancelled", str(worker.last_error))
+        print(f"[INFO] JOB #{job_id} cancelled")
+    elif report is None:
+        finish_fetch_job(job_id, "failed", str(worker.last_error or "run failed"))
+        print(f"[ERROR] JOB #{job_id} failed")
+    else:
+        finish_fetch_job(job_id, "done")
+        print(f"[INFO] JOB #{job_id} completed for {day.isoformat()}")
+    return True
+
+
+def run_scheduled_check(worker: PipelineWorker, schedule: AdaptiveSchedule) -> Optional[RunReport]:
+    """
+    Run today's check and feed the result to the schedule. The admin email is
+    only sent when the run found new items or failed outside the "not yet
+    published" phase of the window, so dense polling does not flood it.
+    """
+    day = date.today()
+    waiting = not schedule.status(day).published and schedule.in_window(datetime.now())
+    report = worker.run_once(day, admin_email=False)
+    print(f"[SCHEDULER] {worker.startup_report()}")
+    if isinstance(worker.last_error, LeaseHeld):
+        return None  # another worker runs today; its result is not ours to record
+    if report is None:
+        schedule.record(day, None)
+        if not waiting:
+            worker.send_status(day, report)
+    else:
+        schedule.record(day, report.total_items, report.retry_items)
+        if report.new_items:
+            worker.send_status(day, report)
+    return report
+
+
+def serve(
+    worker: Optional[PipelineWorker] = None,
+    *,
+    poll_interval_s: float = JOB_POLL_SECONDS,
+    max_running: Optional[int] = None,
+    schedule: Optional[AdaptiveSchedule] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """
+    Worker main loop: an immediate run for today, then runs timed by the
+    adaptive publication-window schedule, each followed by due maintenance;
+    manual fetch jobs queued in the database run in between.
+    """
+    worker = worker or PipelineWorker()
+    settings = worker.engine.settings
+    if max_running is None:
+        max_running = settings.fetch_max_concurrent
+    schedule = schedule or AdaptiveSchedule(ScheduleConfig.from_settings(settings))
+    stop_event = stop_event or threading.Event()
+    next_run = datetime.now()
+
+    while not stop_event.is_set():
+        if datetime.now() >= next_run:
+            run_scheduled_check(worker, schedule)
+            try:
+                run_maintenance(settings)
+            except Exception as exc:
+                print(f"[ERROR] MAINT: maintenance failed -> {exc}")
+            now = datetime.now()
+            next_run = schedule.next_run_at(now)
+            print(
+                f"[SCHEDULER] {schedule.describe(now)}; next check at {next_run.strftime('%Y-%m-%d %H:%M')}"
+            )
+            continue
+        try:
+            if run_next_fetch_job(worker, max_running):
+                continue
+        except Exception as exc:
+            print(f"[ERROR] JOB: queue poll failed -> {exc}")
+        wait_s = min(poll_interval_s, max(0.0, (next_run - datetime.now()).total_seconds()))
+        stop_event.wait(wait_s)
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.db import storage
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore[assignment]
+    pads = None  # type: ignore[assignment]
+    pq = None  # type: ignore[assignment]
+
+EXPORT_DIR = storage.DB_DIR / "parquet"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    name: str
+    # SELECT for one day range; its two parameters are the first and last day (ISO).
+    sql: str
+    schema: Callable[[], "pa.Schema"]
+
+
+def _items_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("run_date", pa.date32()),
+            ("id", pa.int64()),
+            ("title", pa.string()),
+            ("url", pa.string()),
+            ("section", pa.string()),
+            ("subsection", pa.string()),
+            ("edition", pa.string()),
+            ("is_pdf", pa.bool_()),
+            ("stage", pa.string()),
+            ("confidence", pa.int32()),
+            ("departments", pa.list_(pa.string())),
+        ]
+    )
+
+
+def _hits_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("run_date", pa.date32()),
+            ("item_id", pa.int64()),
+            ("department", pa.string()),
+            ("confidence", pa.int32()),
+            ("evidence", pa.string()),
+        ]
+    )
+
+
+def _runs_schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("run_date", pa.date32()),
+            ("run_id", pa.int64()),
+            ("check_time", pa.string()),
+            ("items_found", pa.int32()),
+            ("stage", pa.string()),
+            ("item_count", pa.int32()),
+            ("total_s", pa.float64()),
+            ("p50_s", pa.float64()),
+            ("p95_s", pa.float64()),
+            ("cache_hits", pa.int32()),
+            ("cache_misses", pa.int32()),
+        ]
+    )
+
+
+# Every query walks idx_items_date (or run_log) for one month at a time.
+TABLES: Tuple[ExportTable, ...] = (
+    ExportTable(
+        "items",
+        """
+        SELECT items.run_date, items.id, items.title, items.url, items.section, items.subsection,
+               items.edition, items.is_pdf, items.stage, items.confidence,
+               (SELECT group_concat(department, ',') FROM item_departments d WHERE d.item_id = items.id) AS departments
+        FROM items WHERE items.run_date BETWEEN ? AND ? ORDER BY items.run_date, items.id
+        """,
+        _items_schema,
+    ),
+    ExportTable(
+        "item_departments",
+        """
+        SELECT items.run_date, d.item_id, d.department, d.confidence, d.evidence
+        FROM items JOIN item_departments d ON d.item_id = items.id
+        WHERE items.run_date BETWEEN ? AND ? ORDER BY items.run_date, d.item_id, d.department
+        """,
+        _hits_schema,
+    ),
+    ExportTable(
+        "runs",
+        """
+        SELECT r.run_date, r.id AS run_id, r.check_time, r.items_found, t.stage, t.item_count,
+               t.total_s, t.p50_s, t.p95_s, t.cache_hits, t.cache_misses
+        FROM run_log r LEFT JOIN run_stage_timing t ON t.run_id = r.id
+        WHERE r.run_date BETWEEN ? AND ? ORDER BY r.run_date, r.id, t.id
+        """,
+        _runs_schema,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    first_day: Optional[date]
+    last_day: Optional[date]
+    files: int
+    rows: Dict[str, int]
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("Parquet export needs pyarrow: pip install 'factory-regulation-monitoring[analytics]'")
+
+
+def load_manifest(root: Path = EXPORT_DIR) -> Dict[str, Any]:
+    path = root / MANIFEST_NAME
+    if not path.exists():
+        return {"version": MANIFEST_VERSION, "exported_through": None, "parts": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _save_manifest(root: Path, manifest: Dict[str, Any]) -> None:
+    path = root / MANIFEST_NAME
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _months(first: date, last: date) -> List[Tuple[date, date]]:
+    """``[first, last]`` split at month boundaries."""
+    ranges: List[Tuple[date, date]] = []
+    start = first
+    while start <= last:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        end = min(last, next_month - timedelta(days=1))
+        ranges.append((start, end))
+        start = next_month
+    return ranges
+
+
+def _to_arrow(table: ExportTable, rows: Sequence[Any]) -> "pa.Table":
+    schema = table.schema()
+    columns: Dict[str, List[Any]] = {field.name: [] for field in schema}
+    for row in rows:
+        for field in schema:
+            value = row[field.name]
+            if field.name == "run_date":
+                value = date.fromisoformat(value)
+            elif field.name == "departments":
+                value = value.split(",") if value else []
+            elif field.name == "is_pdf":
+                value = bool(value)
+            columns[field.name].append(value)
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def export_history(
+    root: Path = EXPORT_DIR,
+    through: Optional[date] = None,
+    since: Optional[date] = None,
+) -> ExportResult:
+    """
+    Append the days after the manifest's ``exported_through`` up to ``through``
+    (default: yesterday, as today's run may still change) as Parquet files
+    partitioned by ``year=YYYY/month=MM``, one file per table and month.
+
+    ``since`` re-exports from that day on: parts holding later days are
+    removed first, and their earlier days are exported again with them.
+    """
+    _require_pyarrow()
+    through = through or date.today() - timedelta(days=1)
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(root)
+
+    parts: List[Dict[str, Any]] = manifest["parts"]
+    if since is not None:
+        stale = [p for p in parts if date.fromisoformat(p["last_day"]) >= since]
+        for p in stale:
+            since = min(since, date.fromisoformat(p["first_day"]))
+            (root / p["path"]).unlink(missing_ok=True)
+        parts = [p for p in parts if p not in stale]
+        first = since
+    elif manifest["exported_through"]:
+        first = date.fromisoformat(manifest["exported_through"]) + timedelta(days=1)
+    else:
+        with storage._db() as conn:
+            oldest = conn.execute("SELECT MIN(run_date) FROM items").fetchone()[0]
+        first = date.fromisoformat(oldest) if oldest else through + timedelta(days=1)
+
+    files, rows_written = 0, {t.name: 0 for t in TABLES}
+    for start, end in _months(first, through):
+        for table in TABLES:
+            with storage._db() as conn:
+                rows = conn.execute(table.sql, (start.isoformat(), end.isoformat())).fetchall()
+            if not rows:
+                continue
+            relative = Path(table.name) / f"year={start.year}" / f"month={start.month:02d}" / (
+                f"part-{start:%Y%m%d}-{end:%Y%m%d}.parquet"
+            )
+            path = root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            pq.write_table(_to_arrow(table, rows), tmp, compression="zstd")
+            os.replace(tmp, path)
+            parts.append(
+                {
+                    "table": table.name,
+                    "path": relative.as_posix(),
+                    "first_day": start.isoformat(),
+                    "last_day": end.isoformat(),
+                    "rows": len(rows),
+                }
+            )
+            files += 1
+            rows_written[table.name] += len(rows)
+
+    # The manifest is written last: an interrupted export is simply redone.
+    if first <= through:
+        manifest["exported_through"] = through.isoformat()
+    manifest["parts"] = parts
+    _save_manifest(root, manifest)
+    return ExportResult(
+        first_day=first if first <= through else None,
+        last_day=through if first <= through else None,
+        files=files,
+        rows=rows_written,
+    )
+
+
+def read_history(
+    table: str = "items",
+    columns: Optional[Sequence[str]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    department: Optional[str] = None,
+    root: Path = EXPORT_DIR,
+) -> "pa.Table":
+    """
+    Exported rows of ``table`` for days in ``[start, end]``, reading only
+    ``columns``. The date range prunes ``year=/month=`` directories and row
+    groups, so a narrow range never opens the other files. Use
+    ``.to_pandas()`` on the result for a DataFrame. ``department`` applies
+    to ``item_departments``.
+    """
+    _require_pyarrow()
+    dataset = pads.dataset(root / table, format="parquet", partitioning="hive")
+    expr = None
+    for bound, op in ((start, ">="), (end, "<=")):
+        if bound is None:
+            continue
+        ym = bound.year * 100 + bound.month
+        month_expr = pads.field("year") * 100 + pads.field("month")
+        cond = (month_expr >= ym) if op == ">=" else (month_expr <= ym)
+        cond &= (pads.field("run_date") >= bound) if op == ">=" else (pads.field("run_date") <= bound)
+        expr = cond if expr is None else expr & cond
+    if department is not None:
+        # Only the hit tables have one department per row; items keep a list.
+        cond = pads.field("department") == department
+        expr = cond if expr is None else expr & cond
+    return dataset.to_table(columns=list(columns) if columns else None, filter=expr)
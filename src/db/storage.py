@@ -1,26 +1,194 @@
 from __future__ import annotations
 
+import json
+import queue
+import re
 import sqlite3
-from datetime import date, datetime
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import islice
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Set
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
+from src.core.compress import pack_text, unpack_text
 from src.core.models import GazetteItem
+from src.core.text import fold_tr
+from src.core.timing import StageTiming
 
 DB_DIR = Path.cwd() / "data"
 DB_PATH = DB_DIR / "items.db"
 
+# Writers wait this long for another connection's write lock instead of failing
+# with "database is locked".
+BUSY_TIMEOUT_S = 30.0
+# WAL lets the web threads read while the worker writes; NORMAL sync is safe in WAL mode.
+# auto_vacuum only takes effect on a new database, so it comes before WAL mode
+# (which writes the file header); older files are converted by a full VACUUM.
+PRAGMAS = (
+    "PRAGMA auto_vacuum = INCREMENTAL",
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_S * 1000)}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
 
-def _connect() -> sqlite3.Connection:
+# Departments with a legacy ``dept_<name>`` column on ``items`` (see ``_migrate_departments``).
+DEPARTMENT_COLUMNS = ("muhasebe", "isg", "ik", "lojistik", "it_siber", "kvkk")
+
+# Idle connections kept per database file for threads that come and go (Flask's
+# threaded server starts a thread per request); more than this are closed.
+POOL_SIZE = 8
+
+_local = threading.local()
+_idle: Dict[str, "queue.LifoQueue[sqlite3.Connection]"] = {}
+_idle_lock = threading.Lock()
+_migrate_lock = threading.Lock()
+_migrated: Set[str] = set()
+
+
+def _idle_connections(path: str) -> "queue.LifoQueue[sqlite3.Connection]":
+    with _idle_lock:
+        return _idle.setdefault(path, queue.LifoQueue(maxsize=POOL_SIZE))
+
+
+def _thread_connection() -> sqlite3.Connection:
+    """
+    This thread's connection to ``DB_PATH``: taken from the idle pool (or
+    opened) on first use, then reused until ``release_connection``.
+    """
+    path = str(DB_PATH)
+    connections: Dict[str, sqlite3.Connection] = _local.__dict__.setdefault("connections", {})
+    conn = connections.get(path)
+    if conn is None:
+        try:
+            conn = _idle_connections(path).get_nowait()
+        except queue.Empty:
+            conn = _open_connection(path)
+        connections[path] = conn
+    return conn
+
+
+def _open_connection(path: str) -> sqlite3.Connection:
     DB_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    # Pooled connections move between threads, one thread at a time.
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    # Used by the full-text search triggers; every connection that writes items needs them.
+    conn.create_function("fold_tr", 1, fold_tr, deterministic=True)
+    conn.create_function("pack_text", 1, pack_text, deterministic=True)
+    conn.create_function("unpack_text", 1, unpack_text, deterministic=True)
     return conn
 
 
-def init_db() -> None:
+def release_connection() -> None:
+    """
+    Hand this thread's connections back to the idle pool (closing any beyond
+    ``POOL_SIZE``). Called at the end of each web request; long-lived threads
+    such as the worker simply keep theirs.
+    """
+    for path, conn in _local.__dict__.pop("connections", {}).items():
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _idle_connections(path).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def _connect() -> sqlite3.Connection:
+    init_db()
+    return _thread_connection()
+
+
+@contextmanager
+def _db() -> Iterator[sqlite3.Connection]:
+    """The thread's connection; commits when the block succeeds, rolls back when it raises."""
     conn = _connect()
-    conn.executescript(
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def close_connections() -> None:
+    """
+    Close this thread's connections and the idle pooled ones (e.g. before
+    deleting or replacing the database file).
+    """
+    for conn in _local.__dict__.pop("connections", {}).values():
+        conn.close()
+    with _idle_lock:
+        pools = list(_idle.values())
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+def init_db() -> None:
+    """
+    Bring the schema up to date. Migrations run once per process and database
+    file (the first call does the work, later calls return immediately); the
+    ``schema_version`` table records which ones were applied.
+    """
+    path = str(DB_PATH)
+    if path in _migrated:
+        return
+    with _migrate_lock:
+        if path in _migrated:
+            return
+        _apply_migrations(_thread_connection())
+        _migrated.add(path)
+
+
+def _apply_migrations(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL)"
+    )
+    # Another process may be migrating the same file: take the write lock before looking.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+        for version, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, applied_at) VALUES (?, ?)",
+                (version, datetime.utcnow().isoformat()),
+            )
+            print(f"[INFO] Database schema migrated to version {version}")
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _execute_script(conn: sqlite3.Connection, script: str) -> None:
+    # Unlike executescript(), this keeps the statements inside the migration transaction.
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):  # a trigger body holds several ";"
+            if statement.strip(" \n;"):
+                conn.execute(statement)
+            statement = ""
+
+
+def _migrate_baseline(conn: sqlite3.Connection) -> None:
+    """Schema as of the first versioned release; also upgrades databases created before it."""
+    _execute_script(
+        conn,
         """
         CREATE TABLE IF NOT EXISTS items (
             id          INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -36,7 +204,12 @@ def init_db() -> None:
             dept_lojistik  INTEGER DEFAULT 0,
             dept_it_siber  INTEGER DEFAULT 0,
             dept_kvkk      INTEGER DEFAULT 0,
-            inserted_at TEXT    NOT NULL
+            inserted_at TEXT    NOT NULL,
+            stage          TEXT    DEFAULT '',
+            confidence     INTEGER,
+            llm_decision   TEXT    DEFAULT '',
+            updated_at     TEXT,
+            edition        TEXT    DEFAULT ''
         );
 
         CREATE TABLE IF NOT EXISTS run_log (
@@ -45,6 +218,74 @@ def init_db() -> None:
             run_date    TEXT    NOT NULL,
             items_found INTEGER DEFAULT 0
         );
+
+        CREATE TABLE IF NOT EXISTS run_stage_timing (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id       INTEGER NOT NULL REFERENCES run_log(id),
+            stage        TEXT    NOT NULL,
+            item_count   INTEGER DEFAULT 0,
+            total_s      REAL    DEFAULT 0,
+            p50_s        REAL    DEFAULT 0,
+            p95_s        REAL    DEFAULT 0,
+            cache_hits   INTEGER DEFAULT 0,
+            cache_misses INTEGER DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_stage_timing_run ON run_stage_timing(run_id);
+
+        CREATE TABLE IF NOT EXISTS mail_outbox (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            department  TEXT    NOT NULL,
+            url         TEXT    NOT NULL,
+            run_date    TEXT    NOT NULL,
+            title       TEXT    NOT NULL,
+            section     TEXT    DEFAULT '',
+            subsection  TEXT    DEFAULT '',
+            status      TEXT    NOT NULL DEFAULT 'queued',
+            attempts    INTEGER DEFAULT 0,
+            error       TEXT    DEFAULT '',
+            queued_at   TEXT    NOT NULL,
+            claimed_at  TEXT,
+            sent_at     TEXT
+        );
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_outbox_dept_url ON mail_outbox(department, url);
+        CREATE INDEX IF NOT EXISTS idx_outbox_status ON mail_outbox(status);
+
+        CREATE TABLE IF NOT EXISTS fetch_job (
+            id           INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_date     TEXT    NOT NULL,
+            status       TEXT    NOT NULL DEFAULT 'queued',
+            error        TEXT    DEFAULT '',
+            requested_at TEXT    NOT NULL,
+            started_at   TEXT,
+            finished_at  TEXT,
+            progress_done    INTEGER DEFAULT 0,
+            progress_total   INTEGER DEFAULT 0,
+            cancel_requested INTEGER DEFAULT 0,
+            request_count    INTEGER DEFAULT 1,
+            heartbeat_at     TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_fetch_job_status ON fetch_job(status, id);
+
+        CREATE TABLE IF NOT EXISTS run_lease (
+            run_date     TEXT    PRIMARY KEY,
+            owner        TEXT    NOT NULL,
+            acquired_at  TEXT    NOT NULL,
+            expires_at   TEXT    NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS backfill_checkpoint (
+            run_date    TEXT    PRIMARY KEY,
+            status      TEXT    NOT NULL,
+            items       INTEGER DEFAULT 0,
+            hits        INTEGER DEFAULT 0,
+            duration_s  REAL    DEFAULT 0,
+            error       TEXT    DEFAULT '',
+            started_at  TEXT    NOT NULL,
+            finished_at TEXT
+        );
         """
     )
     # Migration: add columns that may be missing in older databases
@@ -53,122 +294,1436 @@ def init_db() -> None:
             conn.execute(f"ALTER TABLE items ADD COLUMN {col} INTEGER DEFAULT 0")
         except sqlite3.OperationalError:
             pass  # column already exists
+    for col, decl in (
+        ("stage", "TEXT DEFAULT ''"),
+        ("confidence", "INTEGER"),
+        ("llm_decision", "TEXT DEFAULT ''"),
+        ("updated_at", "TEXT"),
+        ("edition", "TEXT DEFAULT ''"),
+    ):
+        try:
+            conn.execute(f"ALTER TABLE items ADD COLUMN {col} {decl}")
+        except sqlite3.OperationalError:
+            pass  # column already exists
+    for col, decl in (
+        ("progress_done", "INTEGER DEFAULT 0"),
+        ("progress_total", "INTEGER DEFAULT 0"),
+        ("cancel_requested", "INTEGER DEFAULT 0"),
+        ("request_count", "INTEGER DEFAULT 1"),
+        ("heartbeat_at", "TEXT"),
+    ):
+        try:
+            conn.execute(f"ALTER TABLE fetch_job ADD COLUMN {col} {decl}")
+        except sqlite3.OperationalError:
+            pass  # column already exists
     try:
         conn.execute(
             "CREATE UNIQUE INDEX IF NOT EXISTS idx_items_date_url ON items(run_date, url)"
         )
     except sqlite3.OperationalError:
         pass
-    conn.commit()
-    conn.close()
+
+
+def _migrate_search(conn: sqlite3.Connection) -> None:
+    """
+    Detail texts (``item_text``, one row per URL) and an FTS5 index over item
+    titles/sections and texts. Both columns are indexed in ``fold_tr`` form so
+    Turkish casing and accents do not matter; triggers keep the index in sync.
+    """
+    _execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS item_text (
+            url         TEXT    PRIMARY KEY,
+            text        TEXT    NOT NULL DEFAULT '',
+            updated_at  TEXT    NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_items_url ON items(url);
+        """,
+    )
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(head, body, prefix = '2 3')")
+    except sqlite3.OperationalError as exc:
+        print(f"[WARN] SQLite has no FTS5, search falls back to LIKE -> {exc}")
+        return
+    # Title matches weigh more than matches deep in a detail text.
+    conn.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    _execute_script(
+        conn,
+        """
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, head, body) VALUES (
+                new.id,
+                fold_tr(new.title || ' ' || COALESCE(new.section, '') || ' ' || COALESCE(new.subsection, '')),
+                COALESCE((SELECT fold_tr(text) FROM item_text WHERE url = new.url), '')
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF title, section, subsection ON items BEGIN
+            UPDATE items_fts
+            SET head = fold_tr(new.title || ' ' || COALESCE(new.section, '') || ' ' || COALESCE(new.subsection, ''))
+            WHERE rowid = new.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+            DELETE FROM items_fts WHERE rowid = old.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_text_fts_insert AFTER INSERT ON item_text BEGIN
+            UPDATE items_fts SET body = fold_tr(new.text) WHERE rowid IN (SELECT id FROM items WHERE url = new.url);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_text_fts_update AFTER UPDATE OF text ON item_text BEGIN
+            UPDATE items_fts SET body = fold_tr(new.text) WHERE rowid IN (SELECT id FROM items WHERE url = new.url);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_text_fts_delete AFTER DELETE ON item_text BEGIN
+            UPDATE items_fts SET body = '' WHERE rowid IN (SELECT id FROM items WHERE url = old.url);
+        END;
+
+        INSERT INTO items_fts (rowid, head, body)
+        SELECT id, fold_tr(title || ' ' || COALESCE(section, '') || ' ' || COALESCE(subsection, '')), ''
+        FROM items;
+        """,
+    )
+
+
+def _migrate_departments(conn: sqlite3.Connection) -> None:
+    """
+    One row per (item, department) hit instead of the fixed ``dept_*`` columns,
+    so a new department needs no schema change and counts come from an index.
+    Existing flags are copied over; the ``dept_*`` columns are no longer written.
+    """
+    _execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS item_departments (
+            item_id     INTEGER NOT NULL,
+            run_date    TEXT    NOT NULL,
+            department  TEXT    NOT NULL,
+            confidence  INTEGER,
+            evidence    TEXT    DEFAULT '',
+            PRIMARY KEY (item_id, department)
+        ) WITHOUT ROWID;
+
+        CREATE INDEX IF NOT EXISTS idx_item_departments_dept_date ON item_departments(department, run_date);
+
+        CREATE TRIGGER IF NOT EXISTS item_departments_delete AFTER DELETE ON items BEGIN
+            DELETE FROM item_departments WHERE item_id = old.id;
+        END;
+        """,
+    )
+    for dept in DEPARTMENT_COLUMNS:
+        conn.execute(
+            f"INSERT OR IGNORE INTO item_departments (item_id, run_date, department, confidence) "
+            f"SELECT id, run_date, ?, confidence FROM items WHERE dept_{dept} = 1",
+            (dept,),
+        )
+
+
+# Characters of a detail text that go into the search index.
+SEARCH_TEXT_CHARS = 20000
+
+
+def _migrate_artifacts(conn: sqlite3.Connection) -> None:
+    """
+    ``item_artifacts`` replaces ``item_text``: per URL the extracted detail text
+    and the full LLM decision (raw output, evidence) as compressed blobs (see
+    ``src.core.compress``), so audits and re-classification need no network.
+    The search index reads the text through ``unpack_text``.
+    """
+    _execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS item_artifacts (
+            url         TEXT    PRIMARY KEY,
+            text        BLOB,
+            text_chars  INTEGER DEFAULT 0,
+            decision    BLOB,
+            updated_at  TEXT    NOT NULL
+        );
+
+        INSERT OR IGNORE INTO item_artifacts (url, text, text_chars, updated_at)
+        SELECT url, pack_text(text), length(text), updated_at FROM item_text;
+
+        DROP TRIGGER IF EXISTS item_text_fts_insert;
+        DROP TRIGGER IF EXISTS item_text_fts_update;
+        DROP TRIGGER IF EXISTS item_text_fts_delete;
+        DROP TABLE IF EXISTS item_text;
+        """,
+    )
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone() is None:
+        return
+    body = f"fold_tr(substr(unpack_text(new.text), 1, {SEARCH_TEXT_CHARS}))"
+    _execute_script(
+        conn,
+        f"""
+        DROP TRIGGER IF EXISTS items_fts_insert;
+
+        CREATE TRIGGER items_fts_insert AFTER INSERT ON items BEGIN
+            INSERT INTO items_fts (rowid, head, body) VALUES (
+                new.id,
+                fold_tr(new.title || ' ' || COALESCE(new.section, '') || ' ' || COALESCE(new.subsection, '')),
+                COALESCE(
+                    (SELECT fold_tr(substr(unpack_text(text), 1, {SEARCH_TEXT_CHARS})) FROM item_artifacts WHERE url = new.url),
+                    ''
+                )
+            );
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_artifacts_fts_insert AFTER INSERT ON item_artifacts BEGIN
+            UPDATE items_fts SET body = {body} WHERE rowid IN (SELECT id FROM items WHERE url = new.url);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_artifacts_fts_update AFTER UPDATE OF text ON item_artifacts
+        WHEN new.text IS NOT old.text BEGIN
+            UPDATE items_fts SET body = {body} WHERE rowid IN (SELECT id FROM items WHERE url = new.url);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS item_artifacts_fts_delete AFTER DELETE ON item_artifacts BEGIN
+            UPDATE items_fts SET body = '' WHERE rowid IN (SELECT id FROM items WHERE url = old.url);
+        END;
+        """,
+    )
+
+
+def _migrate_item_order(conn: sqlite3.Connection) -> None:
+    """
+    Index for the dashboard's newest-first order: the implicit rowid makes it
+    ``(run_date, id)``, so keyset pages walk it instead of sorting all items.
+    """
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_items_date ON items(run_date)")
+
+
+# Stages of items that passed the candidate gate (``skipped`` ones did not, ``parsed`` ones are pending).
+CANDIDATE_STAGES = ("no_text", "lexical_gate", "classified", "failed")
+
+
+def _migrate_daily_stats(conn: sqlite3.Connection) -> None:
+    """
+    Per-day counters for trend views, kept small so they never touch ``items``
+    at read time. Existing days are seeded from their items; their
+    ``llm_calls`` is the number of stored LLM decisions (a lower bound).
+    """
+    _execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS daily_stats (
+            run_date     TEXT    PRIMARY KEY,
+            items_found  INTEGER DEFAULT 0,
+            candidates   INTEGER DEFAULT 0,
+            classified   INTEGER DEFAULT 0,
+            hit_items    INTEGER DEFAULT 0,
+            llm_calls    INTEGER DEFAULT 0,
+            runs         INTEGER DEFAULT 0,
+            updated_at   TEXT    NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS daily_department_stats (
+            run_date    TEXT    NOT NULL,
+            department  TEXT    NOT NULL,
+            hits        INTEGER DEFAULT 0,
+            PRIMARY KEY (run_date, department)
+        ) WITHOUT ROWID;
+        """,
+    )
+    days = [r[0] for r in conn.execute("SELECT DISTINCT run_date FROM items")]
+    for day in days:
+        _refresh_day_stats(conn, day, llm_calls=0, runs=0)
+    conn.execute(
+        "UPDATE daily_stats SET llm_calls = classified, "
+        "runs = (SELECT COUNT(*) FROM run_log WHERE run_log.run_date = daily_stats.run_date)"
+    )
+
+
+def _migrate_maintenance(conn: sqlite3.Connection) -> None:
+    """When each periodic maintenance task (archive, vacuum) last ran."""
+    conn.execute("CREATE TABLE IF NOT EXISTS maintenance (task TEXT PRIMARY KEY, last_run TEXT NOT NULL)")
+
+
+def _migrate_item_degraded(conn: sqlite3.Connection) -> None:
+    """
+    Budget level an item was handled at when cheaper than normal (``text_layer``
+    or ``title_only``; see ``RunBudget``), so an incremental run retries it.
+    """
+    try:
+        conn.execute("ALTER TABLE items ADD COLUMN degraded TEXT DEFAULT ''")
+    except sqlite3.OperationalError:
+        pass  # column already exists
+
+
+# (version, migration) in order; append new migrations, never edit applied ones.
+MIGRATIONS: Tuple[Tuple[int, Callable[[sqlite3.Connection], None]], ...] = (
+    (1, _migrate_baseline),
+    (2, _migrate_search),
+    (3, _migrate_departments),
+    (4, _migrate_artifacts),
+    (5, _migrate_item_order),
+    (6, _migrate_daily_stats),
+    (7, _migrate_maintenance),
+    (8, _migrate_item_degraded),
+)
+
+# Items are written in chunks of this many rows (all inside one transaction).
+ITEM_WRITE_CHUNK = 10000
+
+_UPSERT_ITEM_SQL = """
+    INSERT INTO items
+        (run_date, title, url, section, subsection, is_pdf, edition, inserted_at, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(run_date, url) DO UPDATE SET updated_at = excluded.updated_at
+"""
+
+# (department, confidence, evidence)
+DepartmentHit = Tuple[str, Optional[int], str]
+
+
+def _write_items(
+    conn: sqlite3.Connection,
+    sql: str,
+    rows: Iterable[Tuple[Sequence, Iterable[DepartmentHit]]],
+) -> Tuple[int, int]:
+    """Upsert items and replace their department hits in one write transaction.
+
+    Each row is ``(parameters for sql, hits)``; the parameters start with
+    ``run_date, title, url``. ``rows`` may be a generator: it is consumed in
+    chunks, so very large batches never sit in memory as one list.
+    Returns ``(inserted, updated)``.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM items").fetchone()[0]
+    changed = 0
+    rows = iter(rows)
+    while chunk := list(islice(rows, ITEM_WRITE_CHUNK)):
+        # rowcount, unlike total_changes, leaves out rows written by triggers.
+        changed += conn.executemany(sql, [params for params, _ in chunk]).rowcount
+        conn.executemany(
+            "DELETE FROM item_departments WHERE item_id = (SELECT id FROM items WHERE run_date = ? AND url = ?)",
+            [(params[0], params[2]) for params, _ in chunk],
+        )
+        conn.executemany(
+            "INSERT INTO item_departments (item_id, run_date, department, confidence, evidence) "
+            "SELECT id, run_date, ?, ?, ? FROM items WHERE run_date = ? AND url = ?",
+            [(dept, confidence, evidence, params[0], params[2]) for params, hits in chunk for dept, confidence, evidence in hits],
+        )
+    # Updated rows keep their id, so everything above the old maximum is new.
+    inserted = conn.execute("SELECT COUNT(*) FROM items WHERE id > ?", (last_id,)).fetchone()[0]
+    return inserted, changed - inserted
+
+
+def upsert_items(rows: Iterable[Tuple[date, GazetteItem, Iterable[str]]]) -> Tuple[int, int]:
+    """Bulk insert/update ``(run_day, item, departments)`` rows, possibly spanning many days.
+
+    Existing rows (same day and URL) get their department hits replaced.
+    Returns ``(inserted, updated)``.
+    """
+    now = datetime.utcnow().isoformat()
+
+    def prepared() -> Iterator[Tuple[tuple, List[DepartmentHit]]]:
+        for run_day, it, departments in rows:
+            params = (
+                run_day.isoformat(),
+                it.title,
+                it.url,
+                it.section or "",
+                it.subsection or "",
+                1 if it.url.lower().endswith(".pdf") else 0,
+                it.edition,
+                now,
+                now,
+            )
+            yield params, [(dept, None, "") for dept in sorted(set(departments))]
+
+    with _db() as conn:
+        return _write_items(conn, _UPSERT_ITEM_SQL, prepared())
 
 
 def save_items(
     run_day: date,
     items: Iterable[GazetteItem],
     dept_map: Optional[Dict[str, Set[str]]] = None,
-) -> None:
+) -> Tuple[int, int]:
     """Persist gazette items with optional department hit flags.
 
     ``dept_map`` maps item URL → set of department names that matched.
+    Returns ``(inserted, updated)``.
     """
-    init_db()
-    conn = _connect()
-    now = datetime.utcnow().isoformat()
     dept_map = dept_map or {}
+    return upsert_items((run_day, it, dept_map.get(it.url, ())) for it in items)
 
-    for it in items:
-        depts = dept_map.get(it.url, set())
-        is_pdf = 1 if it.url.lower().endswith(".pdf") else 0
-        conn.execute(
+
+def save_parsed_items(run_day: date, items: Iterable[GazetteItem]) -> int:
+    """Insert freshly parsed items (stage ``parsed``) in one transaction.
+
+    Items already stored for the day keep their stage and decision. Returns
+    the number of new rows.
+    """
+    with _db() as conn:
+        now = datetime.utcnow().isoformat()
+        cur = conn.executemany(
             """
             INSERT INTO items
-                (run_date, title, url, section, subsection, is_pdf,
-                 dept_muhasebe, dept_isg, dept_ik, dept_lojistik,
-                 dept_it_siber, dept_kvkk, inserted_at)
+                (run_date, title, url, section, subsection, is_pdf, edition, stage, inserted_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'parsed', ?, ?)
+            ON CONFLICT(run_date, url) DO NOTHING
+            """,
+            [
+                (
+                    run_day.isoformat(),
+                    it.title,
+                    it.url,
+                    it.section or "",
+                    it.subsection or "",
+                    1 if it.url.lower().endswith(".pdf") else 0,
+                    it.edition,
+                    now,
+                    now,
+                )
+                for it in items
+            ],
+        )
+        return cur.rowcount
+
+
+def save_item_outcomes(run_day: date, outcomes: Sequence[dict]) -> Tuple[int, int]:
+    """Write a batch of per-item results in one transaction.
+
+    Each dict holds ``item`` (GazetteItem), ``stage``, ``departments`` (set of
+    department names) and optionally ``degraded``, ``confidence``, ``evidence``,
+    ``llm_decision`` (compact JSON reused by later runs), ``text`` (extracted
+    detail text) and ``decision`` (full LLM decision JSON incl. raw output);
+    the last two are stored compressed in ``item_artifacts``.
+    Returns ``(inserted, updated)``.
+    """
+    if not outcomes:
+        return 0, 0
+    with _db() as conn:
+        now = datetime.utcnow().isoformat()
+        counts = _write_items(
+            conn,
+            """
+            INSERT INTO items
+                (run_date, title, url, section, subsection, is_pdf, edition, stage, degraded, confidence,
+                 llm_decision, inserted_at, updated_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(run_date, url) DO UPDATE SET
-                dept_muhasebe = excluded.dept_muhasebe,
-                dept_isg      = excluded.dept_isg,
-                dept_ik       = excluded.dept_ik,
-                dept_lojistik = excluded.dept_lojistik,
-                dept_it_siber = excluded.dept_it_siber,
-                dept_kvkk     = excluded.dept_kvkk,
-                inserted_at   = excluded.inserted_at
+                stage        = excluded.stage,
+                degraded     = excluded.degraded,
+                confidence   = excluded.confidence,
+                llm_decision = excluded.llm_decision,
+                updated_at   = excluded.updated_at
             """,
-            (
-                run_day.isoformat(),
-                it.title,
-                it.url,
-                it.section or "",
-                it.subsection or "",
-                is_pdf,
-                1 if "muhasebe" in depts else 0,
-                1 if "isg" in depts else 0,
-                1 if "ik" in depts else 0,
-                1 if "lojistik" in depts else 0,
-                1 if "it_siber" in depts else 0,
-                1 if "kvkk" in depts else 0,
-                now,
-            ),
+            [
+                (
+                    (
+                        run_day.isoformat(),
+                        o["item"].title,
+                        o["item"].url,
+                        o["item"].section or "",
+                        o["item"].subsection or "",
+                        1 if o["item"].url.lower().endswith(".pdf") else 0,
+                        o["item"].edition,
+                        o["stage"],
+                        o.get("degraded", ""),
+                        o.get("confidence"),
+                        o.get("llm_decision", ""),
+                        now,
+                        now,
+                    ),
+                    [(dept, o.get("confidence"), o.get("evidence", "")) for dept in sorted(o["departments"])],
+                )
+                for o in outcomes
+            ],
         )
-    conn.commit()
-    conn.close()
+        # A missing text or decision keeps what an earlier run stored. pack_text is
+        # deterministic, so an unchanged text compares equal as a blob and the
+        # row (and with it the search index) is left alone.
+        conn.executemany(
+            """
+            INSERT INTO item_artifacts (url, text, text_chars, decision, updated_at) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                text       = COALESCE(excluded.text, item_artifacts.text),
+                text_chars = CASE WHEN excluded.text IS NULL THEN item_artifacts.text_chars ELSE excluded.text_chars END,
+                decision   = CASE
+                    WHEN excluded.decision IS NULL THEN item_artifacts.decision
+                    -- A decision without raw output (rebuilt from items.llm_decision) never replaces a full one.
+                    WHEN item_artifacts.decision IS NOT NULL
+                         AND json_extract(unpack_text(excluded.decision), '$.raw') = '' THEN item_artifacts.decision
+                    ELSE excluded.decision
+                END,
+                updated_at = excluded.updated_at
+            WHERE (excluded.text IS NOT NULL AND excluded.text IS NOT item_artifacts.text)
+               OR (excluded.decision IS NOT NULL AND excluded.decision IS NOT item_artifacts.decision)
+            """,
+            [
+                (o["item"].url, pack_text(o.get("text")), len(o.get("text") or ""), pack_text(o.get("decision")), now)
+                for o in outcomes
+                if o.get("text") or o.get("decision")
+            ],
+        )
+        return counts
 
 
-def save_run_log(run_day: date, items_found: int) -> None:
-    init_db()
-    conn = _connect()
+@dataclass(frozen=True)
+class ItemArtifact:
+    """Stored detail text and LLM decision of a URL; blobs are decompressed on first access."""
+
+    url: str
+    text_blob: Optional[bytes] = None
+    decision_blob: Optional[bytes] = None
+    text_chars: int = 0
+    updated_at: str = ""
+
+    @property
+    def stored_bytes(self) -> int:
+        return len(self.text_blob or b"") + len(self.decision_blob or b"")
+
+    @cached_property
+    def text(self) -> str:
+        return unpack_text(self.text_blob)
+
+    @cached_property
+    def decision(self) -> Dict[str, object]:
+        """The full ``MultiDeptDecision`` fields (incl. ``raw`` and ``evidence``), or {}."""
+        payload = unpack_text(self.decision_blob)
+        return json.loads(payload) if payload else {}
+
+
+def get_artifacts(urls: Sequence[str]) -> Dict[str, ItemArtifact]:
+    """URL -> stored artifact for the given URLs (missing ones are left out)."""
+    found: Dict[str, ItemArtifact] = {}
+    with _db() as conn:
+        for start in range(0, len(urls), 500):
+            chunk = list(urls[start : start + 500])
+            for r in conn.execute(
+                f"SELECT * FROM item_artifacts WHERE url IN ({', '.join('?' for _ in chunk)})", chunk
+            ):
+                found[r["url"]] = ItemArtifact(
+                    url=r["url"],
+                    text_blob=r["text"],
+                    decision_blob=r["decision"],
+                    text_chars=r["text_chars"] or 0,
+                    updated_at=r["updated_at"],
+                )
+    return found
+
+
+def get_day_items(run_day: date) -> List[dict]:
+    """All items stored for ``run_day`` in page order, with their ``departments``."""
+    with _db() as conn:
+        rows = conn.execute("SELECT * FROM items WHERE run_date = ? ORDER BY id", (run_day.isoformat(),)).fetchall()
+        return _with_departments(conn, [dict(r) for r in rows])
+
+
+def get_stored_decisions(run_day: date) -> Dict[str, str]:
+    """URL -> stored LLM decision JSON for items classified on ``run_day``."""
+    with _db() as conn:
+        rows = conn.execute(
+            "SELECT url, llm_decision FROM items WHERE run_date = ? AND llm_decision != ''",
+            (run_day.isoformat(),),
+        ).fetchall()
+        return {r["url"]: r["llm_decision"] for r in rows}
+
+
+def get_handled_urls(run_day: date) -> Set[str]:
+    """
+    URLs of ``run_day`` that need no more work: processed at full level and,
+    if they hit departments, queued for every one of them. New, failed,
+    deferred or degraded items and hits never queued for mail (e.g. a run
+    with ``notify=False``) are not included, so an incremental run retries them.
+    """
+    with _db() as conn:
+        rows = conn.execute(
+            """
+            SELECT url FROM items
+            WHERE run_date = ? AND COALESCE(degraded, '') = ''
+              AND stage IN ('skipped', 'no_text', 'lexical_gate', 'classified')
+              AND NOT EXISTS (
+                  SELECT 1 FROM item_departments d
+                  WHERE d.item_id = items.id
+                    AND NOT EXISTS (SELECT 1 FROM mail_outbox o WHERE o.department = d.department AND o.url = items.url)
+              )
+            """,
+            (run_day.isoformat(),),
+        ).fetchall()
+        return {r["url"] for r in rows}
+
+
+def get_day_progress(run_day: date) -> Dict[str, int]:
+    """Item counts per processing stage for a day (``parsed`` = not processed yet)."""
+    with _db() as conn:
+        rows = conn.execute(
+            "SELECT COALESCE(NULLIF(stage, ''), 'done') AS stage, COUNT(*) AS n FROM items "
+            "WHERE run_date = ? GROUP BY 1",
+            (run_day.isoformat(),),
+        ).fetchall()
+        return {r["stage"]: r["n"] for r in rows}
+
+
+def save_run_log(run_day: date, items_found: int) -> int:
+    with _db() as conn:
+        cur = conn.execute(
+            "INSERT INTO run_log (check_time, run_date, items_found) VALUES (?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), run_day.isoformat(), items_found),
+        )
+        return int(cur.lastrowid)
+
+
+def refresh_daily_stats(run_day: date, llm_calls: int = 0) -> None:
+    """
+    Recompute ``run_day``'s row in ``daily_stats``/``daily_department_stats``
+    from that day's items (an index range, not a scan) and add this run's
+    ``llm_calls`` to the day's total. Called once at the end of each run.
+    """
+    with _db() as conn:
+        _refresh_day_stats(conn, run_day.isoformat(), llm_calls=llm_calls, runs=1)
+
+
+def _refresh_day_stats(conn: sqlite3.Connection, day: str, llm_calls: int, runs: int) -> None:
+    stages = ", ".join("?" for _ in CANDIDATE_STAGES)
+    totals = conn.execute(
+        f"""
+        SELECT COUNT(*) AS items_found,
+               COALESCE(SUM(stage IN ({stages})), 0) AS candidates,
+               COALESCE(SUM(stage = 'classified'), 0) AS classified,
+               COALESCE(SUM(EXISTS (SELECT 1 FROM item_departments d WHERE d.item_id = items.id)), 0) AS hit_items
+        FROM items WHERE run_date = ?
+        """,
+        (*CANDIDATE_STAGES, day),
+    ).fetchone()
     conn.execute(
-        "INSERT INTO run_log (check_time, run_date, items_found) VALUES (?, ?, ?)",
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), run_day.isoformat(), items_found),
+        """
+        INSERT INTO daily_stats (run_date, items_found, candidates, classified, hit_items, llm_calls, runs, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(run_date) DO UPDATE SET
+            items_found = excluded.items_found,
+            candidates  = excluded.candidates,
+            classified  = excluded.classified,
+            hit_items   = excluded.hit_items,
+            llm_calls   = daily_stats.llm_calls + excluded.llm_calls,
+            runs        = daily_stats.runs + excluded.runs,
+            updated_at  = excluded.updated_at
+        """,
+        (
+            day,
+            totals["items_found"],
+            totals["candidates"],
+            totals["classified"],
+            totals["hit_items"],
+            llm_calls,
+            runs,
+            datetime.utcnow().isoformat(),
+        ),
+    )
+    conn.execute("DELETE FROM daily_department_stats WHERE run_date = ?", (day,))
+    conn.execute(
+        """
+        INSERT INTO daily_department_stats (run_date, department, hits)
+        SELECT items.run_date, d.department, COUNT(*)
+        FROM items JOIN item_departments d ON d.item_id = items.id
+        WHERE items.run_date = ?
+        GROUP BY d.department
+        """,
+        (day,),
     )
-    conn.commit()
-    conn.close()
 
 
-def get_items(limit: int = 100, search: Optional[str] = None) -> List[dict]:
-    init_db()
-    conn = _connect()
+def get_daily_stats(start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+    """
+    ``daily_stats`` rows for days in ``[start, end]``, newest first. Each row
+    gets ``departments``: hits per department, known departments default to 0.
+    """
+    where, params = "", []
+    if start is not None:
+        where, params = " WHERE run_date >= ?", [start.isoformat()]
+    if end is not None:
+        where += " AND run_date <= ?" if where else " WHERE run_date <= ?"
+        params.append(end.isoformat())
+    with _db() as conn:
+        rows = [dict(r) for r in conn.execute(f"SELECT * FROM daily_stats{where} ORDER BY run_date DESC", params)]
+        by_day: Dict[str, Dict[str, int]] = {r["run_date"]: dict.fromkeys(DEPARTMENT_COLUMNS, 0) for r in rows}
+        for r in conn.execute(f"SELECT * FROM daily_department_stats{where}", params):
+            if r["run_date"] in by_day:
+                by_day[r["run_date"]][r["department"]] = r["hits"]
+    for r in rows:
+        r["departments"] = by_day[r["run_date"]]
+    return rows
+
+
+def save_stage_timings(run_id: int, timings: Iterable[StageTiming]) -> None:
+    with _db() as conn:
+        conn.executemany(
+            """
+            INSERT INTO run_stage_timing
+                (run_id, stage, item_count, total_s, p50_s, p95_s, cache_hits, cache_misses)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (run_id, t.stage, t.count, t.total_s, t.p50_s, t.p95_s, t.cache_hits, t.cache_misses)
+                for t in timings
+            ],
+        )
+
+
+def get_latest_stage_timings() -> List[dict]:
+    """Stage timings of the most recent run that recorded any."""
+    with _db() as conn:
+        rows = conn.execute(
+            """
+            SELECT t.*, r.check_time, r.run_date
+            FROM run_stage_timing t JOIN run_log r ON r.id = t.run_id
+            WHERE t.run_id = (SELECT MAX(run_id) FROM run_stage_timing)
+            ORDER BY t.id
+            """
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+
+# Position in the newest-first item order: (run_date, id) of the last row shown.
+ItemCursor = Tuple[str, int]
+
+
+def get_items(
+    limit: int = 100,
+    search: Optional[str] = None,
+    department: Optional[str] = None,
+    before: Optional[ItemCursor] = None,
+    hits: bool = False,
+) -> List[dict]:
+    """Newest items first, optionally only those hitting ``department``.
+
+    ``before`` continues after the given ``(run_date, id)`` (keyset paging):
+    every page is an index range scan, so a deep page costs the same as the
+    first. Searches are ranked and not paged; ``before`` is ignored for them.
+    Every row gets ``departments``: the list of department names it hit, and
+    with ``hits`` also ``hits`` (see ``_with_departments``).
+    """
     if search:
-        like = f"%{search}%"
+        return search_items(search, limit=limit, department=department, hits=hits)
+    with _db() as conn:
+        if department:
+            # Walks idx_item_departments_dept_date newest first instead of scanning items.
+            where, params = "d.department = ?", [department]
+            if before is not None:
+                where += " AND (d.run_date, d.item_id) < (?, ?)"
+                params.extend(before)
+            rows = conn.execute(
+                f"SELECT items.* FROM item_departments d JOIN items ON items.id = d.item_id "
+                f"WHERE {where} ORDER BY d.run_date DESC, d.item_id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        else:
+            where, params = "", []
+            if before is not None:
+                where, params = "WHERE (run_date, id) < (?, ?)", list(before)
+            rows = conn.execute(
+                f"SELECT * FROM items {where} ORDER BY run_date DESC, id DESC LIMIT ?",
+                (*params, limit),
+            ).fetchall()
+        return _with_departments(conn, [dict(r) for r in rows], hits=hits)
+
+
+def get_latest_items(limit: int = 100, department: Optional[str] = None, day: Optional[date] = None) -> List[dict]:
+    """
+    Read model for dashboards: ``get_items`` with every row's ``hits``
+    (department, confidence, evidence), only ``day``'s items if given.
+    """
+    if day is None:
+        return get_items(limit, department=department, hits=True)
+    # Keyset page starting right after the day; rows of earlier days end it.
+    rows = get_items(limit, department=department, before=((day + timedelta(days=1)).isoformat(), 0), hits=True)
+    return [r for r in rows if r["run_date"] == day.isoformat()]
+
+
+def get_latest_run_id() -> Optional[int]:
+    """Id of the newest ``run_log`` row; changes whenever a run has stored new results."""
+    with _db() as conn:
+        return conn.execute("SELECT MAX(id) FROM run_log").fetchone()[0]
+
+
+def _with_departments(conn: sqlite3.Connection, rows: List[dict], hits: bool = False) -> List[dict]:
+    """
+    Add ``departments`` (names of the departments each row hit) to ``rows``;
+    with ``hits`` also ``hits``: one dict per department with its
+    ``confidence`` and ``evidence``.
+    """
+    by_item: Dict[int, List[dict]] = {}
+    ids = [r["id"] for r in rows]
+    for start in range(0, len(ids), 500):
+        chunk = ids[start : start + 500]
+        for hit in conn.execute(
+            "SELECT item_id, department, confidence, evidence FROM item_departments "
+            f"WHERE item_id IN ({', '.join('?' for _ in chunk)}) ORDER BY department",
+            chunk,
+        ):
+            by_item.setdefault(hit["item_id"], []).append(
+                {"department": hit["department"], "confidence": hit["confidence"], "evidence": hit["evidence"]}
+            )
+    for r in rows:
+        item_hits = by_item.get(r["id"], [])
+        r["departments"] = [h["department"] for h in item_hits]
+        if hits:
+            r["hits"] = item_hits
+    return rows
+
+
+SNIPPET_CHARS = 160
+# Only the newest matches are scored: a common word can match most of the
+# history and ranking all of it would take seconds.
+SEARCH_RANK_WINDOW = 5000
+
+
+def search_items(query: str, limit: int = 100, department: Optional[str] = None, hits: bool = False) -> List[dict]:
+    """Items matching every word of ``query`` (prefix match), best first.
+
+    Titles/sections and stored detail texts are searched through the FTS5
+    index, ignoring Turkish casing and accents; the ``SEARCH_RANK_WINDOW``
+    newest matches are ranked by BM25. Each row gets a ``rank``
+    (lower is better) and a ``snippet`` of the detail text around the first
+    match ("" if only the title matched). ``department`` keeps only its
+    hits; ``hits`` as in ``get_items``. Falls back to a (slow) LIKE scan over titles when FTS5 is not available.
+    """
+    terms = re.findall(r"\w+", fold_tr(query))
+    if not terms:
+        return []
+    dept_filter = " AND {id} IN (SELECT item_id FROM item_departments WHERE department = ?)" if department else ""
+    dept_params = (department,) if department else ()
+    with _db() as conn:
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone() is not None
+        if has_fts:
+            match = " ".join(f'"{term}"*' for term in terms)
+            oldest = conn.execute(
+                "SELECT rowid FROM items_fts WHERE items_fts MATCH ? ORDER BY rowid DESC LIMIT 1 OFFSET ?",
+                (match, SEARCH_RANK_WINDOW - 1),
+            ).fetchone()
+            rows = conn.execute(
+                f"""
+                SELECT items.*, m.rank AS rank, item_artifacts.text AS detail_text
+                FROM (
+                    SELECT rowid, rank FROM items_fts WHERE items_fts MATCH ? AND rowid >= ?{dept_filter.format(id="rowid")}
+                    ORDER BY rank LIMIT ?
+                ) AS m
+                JOIN items ON items.id = m.rowid
+                LEFT JOIN item_artifacts ON item_artifacts.url = items.url
+                ORDER BY m.rank, items.run_date DESC, items.id DESC
+                """,
+                (match, oldest[0] if oldest else 0, *dept_params, limit),
+            ).fetchall()
+        else:
+            where = " AND ".join(
+                "fold_tr(title || ' ' || COALESCE(section, '') || ' ' || COALESCE(subsection, '')) LIKE ?"
+                for _ in terms
+            )
+            rows = conn.execute(
+                f"SELECT items.*, 0 AS rank, NULL AS detail_text FROM items WHERE {where}"
+                f"{dept_filter.format(id='id')} ORDER BY run_date DESC, id DESC LIMIT ?",
+                (*(f"%{term}%" for term in terms), *dept_params, limit),
+            ).fetchall()
+        results = []
+        for r in rows:
+            row = dict(r)
+            # Only the indexed prefix of the returned rows' texts is decompressed.
+            row["snippet"] = _snippet(unpack_text(row.pop("detail_text"), SEARCH_TEXT_CHARS), terms)
+            results.append(row)
+        return _with_departments(conn, results, hits=hits)
+
+
+def _snippet(text: str, terms: Sequence[str]) -> str:
+    """About ``SNIPPET_CHARS`` of ``text`` around the first term found, or "" if none is."""
+    folded = fold_tr(text)
+    hits = [pos for pos in (folded.find(term) for term in terms) if pos >= 0]
+    if not hits:
+        return ""
+    if len(folded) != len(text):
+        text = folded  # cannot map positions back to the original; show the folded text
+    start = max(0, min(hits) - SNIPPET_CHARS // 3)
+    end = min(len(text), start + SNIPPET_CHARS)
+    snippet = " ".join(text[start:end].split())
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+def get_last_check_time() -> Optional[str]:
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT check_time FROM run_log ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        return row["check_time"] if row else None
+
+
+def get_department_counts(start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, int]:
+    """Hits per department, optionally for days in ``[start, end]``; known departments default to 0."""
+    where, params = "", []
+    if start is not None:
+        where, params = " WHERE run_date >= ?", [start.isoformat()]
+    if end is not None:
+        where += " AND run_date <= ?" if where else " WHERE run_date <= ?"
+        params.append(end.isoformat())
+    with _db() as conn:
         rows = conn.execute(
-            "SELECT * FROM items WHERE title LIKE ? OR section LIKE ? OR subsection LIKE ? "
-            "ORDER BY run_date DESC, id DESC LIMIT ?",
-            (like, like, like, limit),
+            f"SELECT department, COUNT(*) AS n FROM item_departments{where} GROUP BY department", params
         ).fetchall()
-    else:
+    counts = dict.fromkeys(DEPARTMENT_COLUMNS, 0)
+    counts.update({r["department"]: r["n"] for r in rows})
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Mail outbox: one row per (department, item URL) ever queued for delivery
+# ---------------------------------------------------------------------------
+
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_CLAIM_TIMEOUT_MINUTES = 15
+
+
+def enqueue_mail(department: str, run_day: date, items: Iterable[GazetteItem]) -> Tuple[int, int]:
+    """Queue items for a department mail.
+
+    Returns ``(queued, deduplicated)``; items already queued or delivered to the
+    department earlier are not queued again.
+    """
+    with _db() as conn:
+        now = datetime.utcnow().isoformat()
+        queued = 0
+        deduplicated = 0
+        for it in items:
+            cur = conn.execute(
+                """
+                INSERT OR IGNORE INTO mail_outbox
+                    (department, url, run_date, title, section, subsection, status, queued_at)
+                VALUES (?, ?, ?, ?, ?, ?, 'queued', ?)
+                """,
+                (department, it.url, run_day.isoformat(), it.title, it.section or "", it.subsection or "", now),
+            )
+            if cur.rowcount:
+                queued += 1
+            else:
+                deduplicated += 1
+        return queued, deduplicated
+
+
+def claim_queued_mail(departments: Optional[Sequence[str]] = None) -> List[dict]:
+    """Atomically mark deliverable outbox rows as ``sending`` and return them.
+
+    Failed rows are retried until ``OUTBOX_MAX_ATTEMPTS``; rows stuck in
+    ``sending`` (e.g. the sender crashed) are reclaimed after a timeout.
+    Rows skipped for lack of recipients are retried too, so they go out once
+    recipients are configured.
+    """
+    with _db() as conn:
+        now = datetime.utcnow()
+        stale = (now - timedelta(minutes=OUTBOX_CLAIM_TIMEOUT_MINUTES)).isoformat()
+        where = (
+            "(status IN ('queued', 'failed', 'skipped_no_recipients') OR (status = 'sending' AND claimed_at < ?)) "
+            "AND attempts < ?"
+        )
+        params: list = [stale, OUTBOX_MAX_ATTEMPTS]
+        if departments is not None:
+            if not departments:
+                return []
+            where += f" AND department IN ({', '.join('?' for _ in departments)})"
+            params.extend(departments)
+
+        conn.execute("BEGIN IMMEDIATE")
         rows = conn.execute(
-            "SELECT * FROM items ORDER BY run_date DESC, id DESC LIMIT ?",
-            (limit,),
+            f"SELECT * FROM mail_outbox WHERE {where} ORDER BY department, run_date, id", params
         ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+        ids = [r["id"] for r in rows]
+        if ids:
+            conn.execute(
+                f"UPDATE mail_outbox SET status = 'sending', claimed_at = ?, attempts = attempts + 1 "
+                f"WHERE id IN ({', '.join('?' for _ in ids)})",
+                [now.isoformat(), *ids],
+            )
+        return [dict(r) for r in rows]
 
 
-def get_last_check_time() -> Optional[str]:
-    init_db()
-    conn = _connect()
-    row = conn.execute(
-        "SELECT check_time FROM run_log ORDER BY id DESC LIMIT 1"
-    ).fetchone()
-    conn.close()
-    return row["check_time"] if row else None
-
-
-def get_department_counts(items: List[dict]) -> dict:
-    counts = {"muhasebe": 0, "isg": 0, "ik": 0, "lojistik": 0, "it_siber": 0, "kvkk": 0}
-    for it in items:
-        if it.get("dept_muhasebe"):
-            counts["muhasebe"] += 1
-        if it.get("dept_isg"):
-            counts["isg"] += 1
-        if it.get("dept_ik"):
-            counts["ik"] += 1
-        if it.get("dept_lojistik"):
-            counts["lojistik"] += 1
-        if it.get("dept_it_siber"):
-            counts["it_siber"] += 1
-        if it.get("dept_kvkk"):
-            counts["kvkk"] += 1
-    return counts
+def mark_mail_status(ids: Sequence[int], status: str, error: str = "") -> None:
+    """Set the outbox status (``sent`` | ``failed`` | ``skipped_no_recipients``) for rows.
+
+    A skip was not a delivery attempt, so it does not count against
+    ``OUTBOX_MAX_ATTEMPTS``.
+    """
+    if not ids:
+        return
+    with _db() as conn:
+        sent_at = datetime.utcnow().isoformat() if status == "sent" else None
+        refund = 1 if status == "skipped_no_recipients" else 0
+        conn.execute(
+            f"UPDATE mail_outbox SET status = ?, error = ?, sent_at = COALESCE(?, sent_at), attempts = attempts - ? "
+            f"WHERE id IN ({', '.join('?' for _ in ids)})",
+            [status, error, sent_at, refund, *ids],
+        )
+
+
+def get_outbox_counts() -> Dict[str, int]:
+    with _db() as conn:
+        rows = conn.execute("SELECT status, COUNT(*) AS n FROM mail_outbox GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Fetch jobs: manual runs requested from the web process, executed by the worker
+# ---------------------------------------------------------------------------
+
+FETCH_JOB_ACTIVE = ("queued", "running")
+# A running job whose worker has not reported progress for this long is
+# treated as lost (worker crashed or was killed) and stops counting against
+# the concurrency limit.
+FETCH_JOB_STALE_MINUTES = 30
+
+
+def enqueue_fetch_job(run_day: date) -> Tuple[int, bool]:
+    """Queue a pipeline run for ``run_day``.
+
+    Returns ``(job_id, created)``. A request for a day that already has a
+    queued or running job is merged into that job instead of starting another.
+    """
+    with _db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT id FROM fetch_job WHERE run_date = ? AND status IN (?, ?) ORDER BY id LIMIT 1",
+            (run_day.isoformat(), *FETCH_JOB_ACTIVE),
+        ).fetchone()
+        if row is not None:
+            job_id, created = int(row["id"]), False
+            conn.execute("UPDATE fetch_job SET request_count = request_count + 1 WHERE id = ?", (job_id,))
+        else:
+            cur = conn.execute(
+                "INSERT INTO fetch_job (run_date, status, requested_at) VALUES (?, 'queued', ?)",
+                (run_day.isoformat(), datetime.utcnow().isoformat()),
+            )
+            job_id, created = int(cur.lastrowid), True
+        return job_id, created
+
+
+def claim_fetch_job(max_running: int = 1) -> Optional[dict]:
+    """Atomically move the oldest queued job to ``running`` and return it.
+
+    Returns ``None`` when nothing is queued or ``max_running`` jobs are
+    already running (across all worker processes sharing the database).
+    """
+    with _db() as conn:
+        now = datetime.utcnow()
+        stale = (now - timedelta(minutes=FETCH_JOB_STALE_MINUTES)).isoformat()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE fetch_job SET status = 'failed', error = 'worker lost', finished_at = ? "
+            "WHERE status = 'running' AND COALESCE(heartbeat_at, started_at) < ?",
+            (now.isoformat(), stale),
+        )
+        running = conn.execute("SELECT COUNT(*) AS n FROM fetch_job WHERE status = 'running'").fetchone()["n"]
+        row = None
+        if running < max_running:
+            # Days another worker currently holds a run lease for are left for later.
+            row = conn.execute(
+                "SELECT * FROM fetch_job WHERE status = 'queued' AND run_date NOT IN "
+                "(SELECT run_date FROM run_lease WHERE expires_at > ?) ORDER BY id LIMIT 1",
+                (now.isoformat(),),
+            ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE fetch_job SET status = 'running', started_at = ?, heartbeat_at = ? WHERE id = ?",
+                (now.isoformat(), now.isoformat(), row["id"]),
+            )
+        return dict(row) if row is not None else None
+
+
+def update_fetch_job_progress(job_id: int, done: int, total: int) -> bool:
+    """Record progress for a running job; returns whether cancellation was requested."""
+    with _db() as conn:
+        conn.execute(
+            "UPDATE fetch_job SET progress_done = ?, progress_total = ?, heartbeat_at = ? WHERE id = ?",
+            (done, total, datetime.utcnow().isoformat(), job_id),
+        )
+        row = conn.execute("SELECT cancel_requested FROM fetch_job WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+
+def cancel_fetch_job(job_id: int) -> Optional[str]:
+    """Cancel a job: queued jobs stop at once, running ones at the next item.
+
+    Returns the resulting status, or ``None`` if the job does not exist.
+    """
+    with _db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT status FROM fetch_job WHERE id = ?", (job_id,)).fetchone()
+        status: Optional[str] = row["status"] if row is not None else None
+        if status == "queued":
+            conn.execute(
+                "UPDATE fetch_job SET status = 'cancelled', cancel_requested = 1, finished_at = ? WHERE id = ?",
+                (datetime.utcnow().isoformat(), job_id),
+            )
+            status = "cancelled"
+        elif status == "running":
+            conn.execute("UPDATE fetch_job SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        return status
+
+
+def requeue_fetch_job(job_id: int, error: str = "") -> None:
+    """Put a claimed job back in the queue (e.g. its day is leased by another worker)."""
+    with _db() as conn:
+        conn.execute(
+            "UPDATE fetch_job SET status = 'queued', error = ?, started_at = NULL, heartbeat_at = NULL WHERE id = ?",
+            (error, job_id),
+        )
+
+
+def finish_fetch_job(job_id: int, status: str, error: str = "") -> None:
+    """Set the final job status (``done`` | ``failed`` | ``cancelled``)."""
+    with _db() as conn:
+        conn.execute(
+            "UPDATE fetch_job SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, error, datetime.utcnow().isoformat(), job_id),
+        )
+
+
+def get_fetch_jobs(limit: int = 20) -> List[dict]:
+    """Most recent jobs first."""
+    with _db() as conn:
+        rows = conn.execute("SELECT * FROM fetch_job ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# Backfill checkpoints: one row per day processed by a date-range backfill
+# ---------------------------------------------------------------------------
+
+
+def start_backfill_day(run_day: date) -> None:
+    with _db() as conn:
+        conn.execute(
+            """
+            INSERT INTO backfill_checkpoint (run_date, status, started_at) VALUES (?, 'running', ?)
+            ON CONFLICT(run_date) DO UPDATE SET
+                status = 'running', error = '', started_at = excluded.started_at, finished_at = NULL
+            """,
+            (run_day.isoformat(), datetime.utcnow().isoformat()),
+        )
+
+
+def finish_backfill_day(
+    run_day: date,
+    status: str,
+    items: int = 0,
+    hits: int = 0,
+    duration_s: float = 0.0,
+    error: str = "",
+) -> None:
+    """Set the final checkpoint status (``done`` | ``failed`` | ``busy``) for a day."""
+    with _db() as conn:
+        conn.execute(
+            """
+            UPDATE backfill_checkpoint
+            SET status = ?, items = ?, hits = ?, duration_s = ?, error = ?, finished_at = ?
+            WHERE run_date = ?
+            """,
+            (status, items, hits, duration_s, error, datetime.utcnow().isoformat(), run_day.isoformat()),
+        )
+
+
+def get_backfill_checkpoints(start: date, end: date) -> Dict[str, dict]:
+    """Checkpoints for days in ``[start, end]`` keyed by ISO date."""
+    with _db() as conn:
+        rows = conn.execute(
+            "SELECT * FROM backfill_checkpoint WHERE run_date BETWEEN ? AND ?",
+            (start.isoformat(), end.isoformat()),
+        ).fetchall()
+        return {r["run_date"]: dict(r) for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Run leases: at most one worker (process, container or thread) runs a day
+# ---------------------------------------------------------------------------
+
+
+def acquire_run_lease(run_day: date, owner: str, ttl_s: float) -> bool:
+    """Take the lease for ``run_day`` unless another owner holds an unexpired one."""
+    with _db() as conn:
+        now = datetime.utcnow()
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute("SELECT owner, expires_at FROM run_lease WHERE run_date = ?", (run_day.isoformat(),)).fetchone()
+        if row is not None and row["owner"] != owner and row["expires_at"] > now.isoformat():
+            return False
+        conn.execute(
+            "INSERT OR REPLACE INTO run_lease (run_date, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?)",
+            (run_day.isoformat(), owner, now.isoformat(), (now + timedelta(seconds=ttl_s)).isoformat()),
+        )
+        return True
+
+
+def renew_run_lease(run_day: date, owner: str, ttl_s: float) -> bool:
+    """Extend our lease; ``False`` means it expired and another owner took it."""
+    with _db() as conn:
+        expires = (datetime.utcnow() + timedelta(seconds=ttl_s)).isoformat()
+        cur = conn.execute(
+            "UPDATE run_lease SET expires_at = ? WHERE run_date = ? AND owner = ?",
+            (expires, run_day.isoformat(), owner),
+        )
+        return cur.rowcount > 0
+
+
+def release_run_lease(run_day: date, owner: str) -> None:
+    with _db() as conn:
+        conn.execute("DELETE FROM run_lease WHERE run_date = ? AND owner = ?", (run_day.isoformat(), owner))
+
+
+def get_run_lease(run_day: date) -> Optional[dict]:
+    """The unexpired lease for ``run_day``, if any."""
+    with _db() as conn:
+        row = conn.execute(
+            "SELECT * FROM run_lease WHERE run_date = ? AND expires_at > ?",
+            (run_day.isoformat(), datetime.utcnow().isoformat()),
+        ).fetchone()
+        return dict(row) if row is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Retention: yearly archive databases and compaction
+# ---------------------------------------------------------------------------
+
+# Tables copied to the archive, in dependency order; artifacts are keyed by URL.
+ARCHIVE_TABLES = ("items", "item_departments", "item_artifacts")
+
+
+def archive_path(year: int) -> Path:
+    return DB_DIR / "archive" / f"items-{year}.db"
+
+
+def archive_years() -> List[int]:
+    return sorted(int(p.stem.split("-")[1]) for p in (DB_DIR / "archive").glob("items-*.db"))
+
+
+@contextmanager
+def _attached(conn: sqlite3.Connection, path: Path, alias: str = "archive") -> Iterator[None]:
+    # ATTACH/DETACH are not allowed inside a transaction.
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS " + alias, (str(path),))
+    try:
+        yield
+    finally:
+        conn.rollback()
+        conn.execute("DETACH DATABASE " + alias)
+
+
+def _sync_archive_schema(conn: sqlite3.Connection) -> None:
+    """Create the archive tables like the main ones and add columns added since."""
+    for table in ARCHIVE_TABLES:
+        main_cols = [r["name"] for r in conn.execute(f"PRAGMA main.table_info({table})")]
+        conn.execute(f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.{table} WHERE 0")
+        archived = {r["name"] for r in conn.execute(f"PRAGMA archive.table_info({table})")}
+        for col in main_cols:
+            if col not in archived:
+                conn.execute(f"ALTER TABLE archive.{table} ADD COLUMN {col}")
+    _execute_script(
+        conn,
+        """
+        CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_items_id ON items(id);
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_items_date ON items(run_date);
+        CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_departments ON item_departments(item_id, department);
+        CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_archive_artifacts_url ON item_artifacts(url);
+        """,
+    )
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> str:
+    return ", ".join(r["name"] for r in conn.execute(f"PRAGMA main.table_info({table})"))
+
+
+def archive_items_before(cutoff: date) -> Dict[int, int]:
+    """
+    Move items older than ``cutoff`` (with their department hits and stored
+    artifacts) to yearly ``archive/items-YYYY.db`` files; returns moved rows per year.
+
+    Each year is copied and committed first, then deleted from the main
+    database, so an interrupted run leaves duplicates, never gaps; running it
+    again is safe. ``daily_stats`` is kept, so trends still cover archived days.
+    """
+    moved: Dict[int, int] = {}
+    with _db() as conn:
+        row = conn.execute("SELECT MIN(run_date) FROM items WHERE run_date < ?", (cutoff.isoformat(),)).fetchone()
+        if row[0] is None:
+            return moved
+        first_year = date.fromisoformat(row[0]).year
+        for year in range(first_year, cutoff.year + 1):
+            start, end = f"{year}-01-01", min(f"{year + 1}-01-01", cutoff.isoformat())
+            path = archive_path(year)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with _attached(conn, path):
+                _sync_archive_schema(conn)
+                in_range = "SELECT id FROM main.items WHERE run_date >= ? AND run_date < ?"
+                cur = conn.execute(
+                    f"INSERT OR REPLACE INTO archive.items ({_columns(conn, 'items')}) "
+                    f"SELECT {_columns(conn, 'items')} FROM main.items WHERE run_date >= ? AND run_date < ?",
+                    (start, end),
+                )
+                count = cur.rowcount
+                if count <= 0:
+                    continue
+                cols = _columns(conn, "item_departments")
+                conn.execute(
+                    f"INSERT OR REPLACE INTO archive.item_departments ({cols}) "
+                    f"SELECT {cols} FROM main.item_departments WHERE item_id IN ({in_range})",
+                    (start, end),
+                )
+                cols = _columns(conn, "item_artifacts")
+                conn.execute(
+                    f"INSERT OR REPLACE INTO archive.item_artifacts ({cols}) SELECT {cols} FROM main.item_artifacts "
+                    "WHERE url IN (SELECT url FROM main.items WHERE run_date >= ? AND run_date < ?)",
+                    (start, end),
+                )
+                conn.commit()
+            # Triggers drop the department hits and search index rows of deleted items.
+            urls = [r[0] for r in conn.execute(
+                "SELECT DISTINCT url FROM items WHERE run_date >= ? AND run_date < ?", (start, end)
+            )]
+            conn.execute("DELETE FROM items WHERE run_date >= ? AND run_date < ?", (start, end))
+            for i in range(0, len(urls), 500):
+                chunk = urls[i : i + 500]
+                # Artifacts stay while a newer (kept) item still points at the URL.
+                conn.execute(
+                    f"DELETE FROM item_artifacts WHERE url IN ({', '.join('?' for _ in chunk)}) "
+                    "AND NOT EXISTS (SELECT 1 FROM items WHERE items.url = item_artifacts.url)",
+                    chunk,
+                )
+            conn.commit()
+            moved[year] = count
+        _mark_maintenance(conn, "archive")
+    return moved
+
+
+def get_archived_items(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    department: Optional[str] = None,
+    limit: int = 100,
+) -> List[dict]:
+    """
+    Newest archived items in ``[start, end]``, read by attaching one yearly
+    archive at a time (newest year first, stopping once ``limit`` rows are found).
+    """
+    rows: List[dict] = []
+    years = [y for y in archive_years() if (start is None or y >= start.year) and (end is None or y <= end.year)]
+    with _db() as conn:
+        for year in reversed(years):
+            where, params = ["1"], []
+            if start is not None:
+                where.append("i.run_date >= ?")
+                params.append(start.isoformat())
+            if end is not None:
+                where.append("i.run_date <= ?")
+                params.append(end.isoformat())
+            if department:
+                where.append("i.id IN (SELECT item_id FROM archive.item_departments WHERE department = ?)")
+                params.append(department)
+            with _attached(conn, archive_path(year)):
+                found = [
+                    dict(r)
+                    for r in conn.execute(
+                        f"SELECT i.* FROM archive.items i WHERE {' AND '.join(where)} "
+                        "ORDER BY i.run_date DESC, i.id DESC LIMIT ?",
+                        (*params, limit - len(rows)),
+                    )
+                ]
+                by_item: Dict[int, List[str]] = {}
+                ids = [r["id"] for r in found]
+                for i in range(0, len(ids), 500):
+                    chunk = ids[i : i + 500]
+                    for hit in conn.execute(
+                        "SELECT item_id, department FROM archive.item_departments "
+                        f"WHERE item_id IN ({', '.join('?' for _ in chunk)}) ORDER BY department",
+                        chunk,
+                    ):
+                        by_item.setdefault(hit["item_id"], []).append(hit["department"])
+            for r in found:
+                r["departments"] = by_item.get(r["id"], [])
+            rows.extend(found)
+            if len(rows) >= limit:
+                break
+    return rows
+
+
+def maintenance_due(task: str, interval_days: int, now: Optional[datetime] = None) -> bool:
+    """
+    Whether ``task`` last ran at least ``interval_days`` ago (or never); ``interval_days <= 0``
+    disables it. ``now`` is UTC, like every stored timestamp.
+    """
+    if interval_days <= 0:
+        return False
+    with _db() as conn:
+        row = conn.execute("SELECT last_run FROM maintenance WHERE task = ?", (task,)).fetchone()
+    if row is None:
+        return True
+    return (now or datetime.utcnow()) - datetime.fromisoformat(row["last_run"]) >= timedelta(days=interval_days)
+
+
+def _mark_maintenance(conn: sqlite3.Connection, task: str) -> None:
+    conn.execute(
+        "INSERT INTO maintenance (task, last_run) VALUES (?, ?) "
+        "ON CONFLICT(task) DO UPDATE SET last_run = excluded.last_run",
+        (task, datetime.utcnow().isoformat()),
+    )
+    conn.commit()
+
+
+# compact_db works in short write transactions of this many pages (4 KB each), so
+# the web process' writes (fetch job enqueue/cancel) wait milliseconds, not the
+# whole compaction.
+VACUUM_STEP_PAGES = 1024
+FTS_MERGE_PAGES = 256
+
+
+def incremental_vacuum_enabled() -> bool:
+    with _db() as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def compact_db(full: bool = False) -> Tuple[int, int]:
+    """
+    Merge the search index segments, give free pages back to the file system
+    and refresh the planner statistics; returns the size in bytes (database +
+    WAL file) before and after.
+
+    By default every step is a short write transaction: ``merge`` steps of
+    ``FTS_MERGE_PAGES`` for the index and ``incremental_vacuum`` steps of
+    ``VACUUM_STEP_PAGES`` (databases in ``auto_vacuum = INCREMENTAL`` mode).
+    Each holds the write lock for milliseconds, well under ``BUSY_TIMEOUT_S``,
+    so it is safe in the worker loop.
+
+    ``full=True`` runs one VACUUM instead. It rewrites the whole file and holds
+    the write lock throughout (roughly a second per 100 MB; longer than
+    ``BUSY_TIMEOUT_S`` on large files, failing concurrent writers), so it is
+    only for known-idle times with the worker stopped. It also converts a
+    database created before incremental mode.
+    """
+    before = _db_size()
+    with _db() as conn:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone() is not None:
+            while True:
+                changes = conn.total_changes
+                conn.execute("INSERT INTO items_fts (items_fts, rank) VALUES ('merge', ?)", (FTS_MERGE_PAGES,))
+                conn.commit()
+                # Fewer than 2 changes: nothing left to merge (see the FTS5 docs).
+                if conn.total_changes - changes < 2:
+                    break
+        if full:
+            # VACUUM cannot run inside a transaction; it waits for readers via busy_timeout.
+            conn.execute("VACUUM")
+        elif conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while free:
+                conn.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+                conn.commit()
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if remaining >= free:
+                    break
+                free = remaining
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        _mark_maintenance(conn, "vacuum")
+    return before, _db_size()
+
+
+def _db_size() -> int:
+    wal = DB_PATH.with_name(DB_PATH.name + "-wal")
+    return sum(p.stat().st_size for p in (DB_PATH, wal) if p.exists())
@@ -1,9 +1,12 @@
 ﻿from __future__ import annotations
 
+import re
+from dataclasses import dataclass
 from datetime import date
-from typing import Optional
+from typing import List, Optional
 
 import requests
+from bs4 import BeautifulSoup
 #günün sayfasını cekmek
 
 BASE = "https://www.resmigazete.gov.tr"
@@ -19,3 +22,41 @@ def fetch_daily_html(session: requests.Session, day: date, timeout_s: int = 30)
     resp = session.get(url, timeout=timeout_s)
     resp.raise_for_status()
     return resp.text
+
+
+# Mükerrer (ek) sayılar: eski site düzeninde yayımlanır, ör.
+# https://www.resmigazete.gov.tr/eskiler/2026/03/20260305M1.htm
+MAX_EXTRA_EDITIONS = 5
+_MUKERRER_HREF = re.compile(r"(\d{8})M(\d+)\.htm$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class Edition:
+    day: date
+    name: str  # "" = asıl sayı, "M1", "M2", ...
+    url: str
+
+
+def mukerrer_url(day: date, number: int) -> str:
+    return f"{BASE}/eskiler/{day:%Y}/{day:%m}/{day:%Y%m%d}M{number}.htm"
+
+
+def editions_from_index(day: date, html: str) -> List[Edition]:
+    """Mükerrer sayılar ana fihristte linklenmişse onları döner (asıl sayı hariç)."""
+    found: dict[str, Edition] = {}
+    soup = BeautifulSoup(html or "", "html.parser")
+    for a in soup.select("a[href]"):
+        m = _MUKERRER_HREF.search(a["href"])
+        if m and m.group(1) == f"{day:%Y%m%d}":
+            name = f"M{int(m.group(2))}"
+            found.setdefault(name, Edition(day=day, name=name, url=mukerrer_url(day, int(m.group(2)))))
+    return sorted(found.values(), key=lambda e: int(e.name[1:]))
+
+
+def fetch_edition_html(session: requests.Session, edition: Edition, timeout_s: int = 30) -> str:
+    resp = session.get(edition.url, timeout=timeout_s)
+    resp.raise_for_status()
+    # Eski sayfalar windows-1254 kodlu olabilir.
+    if resp.encoding and resp.encoding.lower() == "iso-8859-1":
+        resp.encoding = resp.apparent_encoding
+    return resp.text
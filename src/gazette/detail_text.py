@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import io
 import re
+from typing import Iterator
+
 import requests
 from bs4 import BeautifulSoup
 
@@ -23,10 +25,10 @@ except Exception:  # pragma: no cover - optional dependency
     pytesseract = None  # type: ignore[assignment]
 
 
-def fetch_detail_text(session: requests.Session, url: str, timeout_s: int = 40) -> str:
+def fetch_detail_text(session: requests.Session, url: str, timeout_s: int = 40, ocr: bool = True) -> str:
     if url.lower().endswith(".pdf"):
         pdf_bytes = _download_bytes(session, url, timeout_s)
-        text = _extract_pdf_text_with_ocr(pdf_bytes, dpi=250)
+        text = _extract_pdf_text_with_ocr(pdf_bytes, dpi=250, ocr=ocr)
         if _looks_like_real_text(text):
             return text
         if PdfReader is not None:
@@ -37,6 +39,30 @@ def fetch_detail_text(session: requests.Session, url: str, timeout_s: int = 40)
     return _extract_text_from_html(html)
 
 
+def iter_detail_text(
+    session: requests.Session,
+    url: str,
+    timeout_s: int = 40,
+    dpi: int = 250,
+    ocr: bool = True,
+) -> Iterator[str]:
+    """
+    Yield the detail text page by page instead of joining it into one string.
+
+    PDFs are read per page: the text layer is used when it looks real, the
+    page is OCR'd otherwise and pypdf's text layer is the last resort, so long
+    documents never sit in memory as text.
+    With ``ocr=False`` only the text layer is used.
+    """
+    if url.lower().endswith(".pdf"):
+        pdf_bytes = _download_bytes(session, url, timeout_s)
+        yield from _iter_pdf_pages(pdf_bytes, dpi=dpi, ocr=ocr)
+        return
+
+    html = _download_text(session, url, timeout_s)
+    yield _extract_text_from_html(html)
+
+
 def _download_bytes(session: requests.Session, url: str, timeout_s: int) -> bytes:
     r = session.get(url, timeout=timeout_s)
     r.raise_for_status()
@@ -57,7 +83,7 @@ def _extract_text_from_html(html: str) -> str:
     return soup.get_text("\n", strip=True)
 
 
-def _extract_pdf_text_with_ocr(pdf_bytes: bytes, dpi: int = 250) -> str:
+def _extract_pdf_text_with_ocr(pdf_bytes: bytes, dpi: int = 250, ocr: bool = True) -> str:
     if fitz is None:
         return ""
 
@@ -70,7 +96,7 @@ def _extract_pdf_text_with_ocr(pdf_bytes: bytes, dpi: int = 250) -> str:
         if t:
             parts.append(t)
     text = "\n\n".join(parts).strip()
-    if _looks_like_real_text(text):
+    if _looks_like_real_text(text) or not ocr:
         return text
 
     if Image is None or pytesseract is None:
@@ -88,6 +114,35 @@ def _extract_pdf_text_with_ocr(pdf_bytes: bytes, dpi: int = 250) -> str:
     return "\n\n".join(ocr_parts).strip()
 
 
+def _iter_pdf_pages(pdf_bytes: bytes, dpi: int = 250, ocr: bool = True) -> Iterator[str]:
+    if fitz is None:
+        if PdfReader is None:
+            return
+        for page in PdfReader(io.BytesIO(pdf_bytes)).pages:
+            t = (page.extract_text() or "").strip()
+            if t:
+                yield t
+        return
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    pypdf_pages = None
+    for number, page in enumerate(doc):
+        t = (page.get_text("text") or "").strip()
+        if ocr and not _looks_like_real_text(t) and Image is not None and pytesseract is not None:
+            pix = page.get_pixmap(dpi=dpi)
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            t = (pytesseract.image_to_string(img, lang="tur") or "").strip() or t
+        # Still no real text (no OCR, or OCR failed): pypdf, as fetch_detail_text does.
+        if not _looks_like_real_text(t) and PdfReader is not None:
+            if pypdf_pages is None:
+                pypdf_pages = PdfReader(io.BytesIO(pdf_bytes)).pages
+            alt = (pypdf_pages[number].extract_text() or "").strip() if number < len(pypdf_pages) else ""
+            if alt and (_looks_like_real_text(alt) or not t):
+                t = alt
+        if t:
+            yield t
+
+
 def _extract_pdf_text_with_pypdf(pdf_bytes: bytes) -> str:
     if PdfReader is None:
         return ""
@@ -1,13 +1,14 @@
 ﻿from __future__ import annotations
 
-from bs4 import BeautifulSoup
+import re
+from bs4 import BeautifulSoup, NavigableString, Tag
 from urllib.parse import urljoin
 from typing import List, Optional
 
 from src.core.models import GazetteItem
 
 
-def parse_daily_items(html: str, base_url: str) -> List[GazetteItem]:
+def parse_daily_items(html: str, base_url: str, edition: str = "") -> List[GazetteItem]:
     soup = BeautifulSoup(html, "html.parser")
 
     items: List[GazetteItem] = []
@@ -16,7 +17,11 @@ def parse_daily_items(html: str, base_url: str) -> List[GazetteItem]:
 
     content = soup.select_one("#html-content")
     if not content:
-        return items
+        # Mükerrer sayılar yeni şablonu kullanmıyor. Asıl sayıda #html-content yoksa
+        # (hata sayfası, henüz yayımlanmamış gün) menü linkleri kayıt sayılmasın.
+        if edition:
+            return parse_legacy_items(soup, base_url, edition)
+        return []
 
     # Sayfada “card-title html-title” ve “html-subtitle” blokları var.
     # Ardından “fihrist-item”’lar geliyor.
@@ -47,7 +52,55 @@ def parse_daily_items(html: str, base_url: str) -> List[GazetteItem]:
                         url=url,
                         section=current_section,
                         subsection=current_subsection,
+                        edition=edition,
                     )
                 )
 
     return items
+
+
+_LEGACY_DOC_HREF = re.compile(r"\.(htm|html|pdf)$", re.IGNORECASE)
+_TITLE_DASHES = "–—-− \u00a0"
+
+
+def parse_legacy_items(soup: BeautifulSoup, base_url: str, edition: str = "") -> List[GazetteItem]:
+    """
+    Eski düzen fihrist (eskiler/YYYY/MM/YYYYMMDD[Mn].htm): bölüm ve alt başlıklar
+    düz metin, kayıtlar "–" ile başlayan linkler olarak sırayla gelir.
+    """
+    items: List[GazetteItem] = []
+    seen: set[str] = set()
+    current_section: Optional[str] = None
+    current_subsection: Optional[str] = None
+    root = soup.body or soup
+
+    for node in root.descendants:
+        if isinstance(node, Tag) and node.name == "a":
+            href = (node.get("href") or "").strip()
+            title = node.get_text(" ", strip=True).strip(_TITLE_DASHES)
+            if not title or not _LEGACY_DOC_HREF.search(href):
+                continue
+            url = urljoin(base_url, href)
+            if url == base_url or url in seen:
+                continue
+            seen.add(url)
+            items.append(
+                GazetteItem(
+                    title=title,
+                    url=url,
+                    section=current_section,
+                    subsection=current_subsection,
+                    edition=edition,
+                )
+            )
+        elif isinstance(node, NavigableString) and node.find_parent("a") is None:
+            text = " ".join(str(node).split())
+            if not text or text != text.upper() or not any(ch.isalpha() for ch in text):
+                continue
+            if "BÖLÜMÜ" in text:
+                current_section = text
+                current_subsection = None
+            elif len(text) <= 60:
+                current_subsection = text
+
+    return items
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import base64
 from datetime import datetime
+import gzip
 from html import escape
 import json
+import os
 from pathlib import Path
 import re
 from typing import Iterable
@@ -59,6 +61,29 @@ def append_mail_event(
     write_dashboard_from_events()
 
 
+def rotate_mail_log(max_bytes: int, keep_files: int) -> Path | None:
+    """
+    Once the JSONL log reaches ``max_bytes``, move it to a gzipped
+    ``mail_events-<timestamp>.jsonl.gz`` and start a new one; only the
+    ``keep_files`` newest archives are kept (``<= 0`` keeps all). Returns the new archive, if any.
+    """
+    if max_bytes <= 0 or not JSONL_PATH.exists() or JSONL_PATH.stat().st_size < max_bytes:
+        return None
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    rotated = LOG_DIR / f"mail_events-{stamp}.jsonl"
+    # Renaming first means new events go to a fresh file while the old one is compressed.
+    os.replace(JSONL_PATH, rotated)
+    archive = rotated.with_name(rotated.name + ".gz")
+    with rotated.open("rb") as src, gzip.open(archive, "wb") as dst:
+        while chunk := src.read(1 << 20):
+            dst.write(chunk)
+    rotated.unlink()
+    if keep_files > 0:
+        for old in sorted(LOG_DIR.glob("mail_events-*.jsonl.gz"))[:-keep_files]:
+            old.unlink()
+    return archive
+
+
 def _read_events(max_rows: int = 1000) -> list[dict]:
     if not JSONL_PATH.exists():
         return []
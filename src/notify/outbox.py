@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from src.app.config import Settings
+from src.core.models import GazetteItem
+from src.db.storage import claim_queued_mail, mark_mail_status
+from src.notify.emailer import send_html_email
+from src.notify.templates import build_generic_email_html, build_generic_email_subject
+
+# One drain at a time per process; rows are also claimed in the database so a
+# second process cannot pick up the same rows.
+_DRAIN_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class OutboxDelivery:
+    department: str
+    day: date
+    items: Tuple[GazetteItem, ...]
+    recipients: Tuple[str, ...]
+    subject: str
+    status: str  # sent | failed | skipped_no_recipients
+    error: str = ""
+
+
+def drain_outbox(
+    settings: Settings,
+    recipients_by_dept: Mapping[str, Sequence[str]],
+    departments: Optional[Sequence[str]] = None,
+) -> List[OutboxDelivery]:
+    """
+    Send every deliverable outbox row, one mail per (department, run date).
+    """
+    with _DRAIN_LOCK:
+        rows = claim_queued_mail(departments)
+        batches: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        for row in rows:
+            batches[(row["department"], row["run_date"])].append(row)
+
+        deliveries: List[OutboxDelivery] = []
+        for (dept, run_date), batch in batches.items():
+            deliveries.append(_deliver(settings, dept, date.fromisoformat(run_date), batch, recipients_by_dept))
+        return deliveries
+
+
+def send_now(
+    settings: Settings,
+    recipients_by_dept: Mapping[str, Sequence[str]],
+    day: date,
+    items_by_dept: Mapping[str, Sequence[GazetteItem]],
+) -> List[OutboxDelivery]:
+    """
+    Send exactly ``items_by_dept`` right away, one mail per department,
+    without queueing them. For manual resends: the outbox would deduplicate
+    items already delivered and also pick up unrelated leftover rows.
+    """
+    return [
+        _send(settings, dept, day, tuple(items), recipients_by_dept)
+        for dept, items in items_by_dept.items()
+        if items
+    ]
+
+
+def _deliver(
+    settings: Settings,
+    dept: str,
+    day: date,
+    rows: List[dict],
+    recipients_by_dept: Mapping[str, Sequence[str]],
+) -> OutboxDelivery:
+    items = tuple(
+        GazetteItem(
+            title=row["title"],
+            url=row["url"],
+            section=row["section"] or None,
+            subsection=row["subsection"] or None,
+        )
+        for row in rows
+    )
+    delivery = _send(settings, dept, day, items, recipients_by_dept)
+    mark_mail_status([row["id"] for row in rows], delivery.status, delivery.error)
+    return delivery
+
+
+def _send(
+    settings: Settings,
+    dept: str,
+    day: date,
+    items: Tuple[GazetteItem, ...],
+    recipients_by_dept: Mapping[str, Sequence[str]],
+) -> OutboxDelivery:
+    subject = build_generic_email_subject(dept, day, len(items))
+    recipients = tuple(recipients_by_dept.get(dept, ()))
+
+    if not recipients:
+        print(f"[WARN] {dept.upper()}: no recipients configured")
+        return OutboxDelivery(dept, day, items, (), subject, "skipped_no_recipients", "No recipients configured")
+
+    try:
+        send_html_email(
+            smtp_host=settings.smtp_host,
+            smtp_port=settings.smtp_port,
+            smtp_user=settings.smtp_user,
+            smtp_password=settings.smtp_password,
+            smtp_secure=settings.smtp_secure,
+            smtp_auth=settings.smtp_auth,
+            smtp_tls_reject_unauthorized=settings.smtp_tls_reject_unauthorized,
+            smtp_enabled=settings.smtp_enabled,
+            mail_from=settings.mail_from,
+            recipients=list(recipients),
+            subject=subject,
+            html_body=build_generic_email_html(dept, day, items),
+        )
+    except Exception as exc:  # pragma: no cover - network dependent
+        print(f"[ERROR] {dept.upper()}: email failed -> {exc}")
+        return OutboxDelivery(dept, day, items, recipients, subject, "failed", str(exc))
+
+    print(f"[INFO] {dept.upper()}: email sent to {', '.join(recipients)}")
+    return OutboxDelivery(dept, day, items, recipients, subject, "sent")
+
+
+class OutboxSender(threading.Thread):
+    """
+    Background thread that drains the outbox every ``interval_s`` seconds,
+    or immediately after ``wake()``. It retries rows whose delivery failed.
+    """
+
+    def __init__(
+        self,
+        settings_factory: Callable[[], Settings],
+        recipients_factory: Callable[[Settings], Mapping[str, Sequence[str]]],
+        interval_s: float = 300.0,
+    ) -> None:
+        super().__init__(name="outbox-sender", daemon=True)
+        self.settings_factory = settings_factory
+        self.recipients_factory = recipients_factory
+        self.interval_s = interval_s
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                settings = self.settings_factory()
+                deliveries = drain_outbox(settings, self.recipients_factory(settings))
+                if deliveries:
+                    print(f"[OUTBOX] delivered {len(deliveries)} batch(es)")
+            except Exception as exc:
+                print(f"[ERROR] OUTBOX: drain failed -> {exc}")
@@ -67,6 +67,11 @@ def build_admin_status_email_html(
     rows: Sequence[Mapping[str, str]],
     error_message: str = "",
     traceback_text: str = "",
+    new_items: int | None = None,
+    skipped_items: int | None = None,
+    outbox_counts: Mapping[str, int] | None = None,
+    timing_rows: Sequence[Mapping[str, str]] = (),
+    trend_rows: Sequence[Mapping[str, str]] = (),
 ) -> str:
     status_text = "Calisti" if success else "Calismadi"
     status_color = "#166534" if success else "#991b1b"
@@ -86,6 +91,16 @@ def build_admin_status_email_html(
     )
 
     total_items_text = str(total_items) if total_items is not None else "-"
+    incremental_line = ""
+    if new_items is not None and skipped_items is not None:
+        incremental_line = f"Yeni/tekrar islenen: <b>{new_items}</b> | Onceden islenmis (atlandi): <b>{skipped_items}</b><br/>"
+    outbox_line = ""
+    if outbox_counts is not None:
+        outbox_line = (
+            f"Mail kuyrugu: kuyruga alinan <b>{outbox_counts.get('queued', 0)}</b> | "
+            f"gonderilen <b>{outbox_counts.get('sent', 0)}</b> | "
+            f"tekrar engellenen <b>{outbox_counts.get('deduplicated', 0)}</b><br/>"
+        )
     error_block = ""
     if error_message:
         error_block = (
@@ -93,6 +108,68 @@ def build_admin_status_email_html(
             f"<div style='background:#fee2e2;border:1px solid #fecaca;padding:10px;color:#7f1d1d;'>{_escape(error_message)}</div>"
         )
 
+    timing_block = ""
+    if timing_rows:
+        timing_body = "".join(
+            f"""
+        <tr>
+          <td style="padding:6px;border-bottom:1px solid #eee;">{_escape(r.get('stage', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('total', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('count', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('p50', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('p95', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('cache', '-'))}</td>
+        </tr>
+        """
+            for r in timing_rows
+        )
+        timing_block = f"""
+      <h3 style='margin:14px 0 8px 0;'>Asama Sureleri</h3>
+      <table style="border-collapse:collapse; border:1px solid #eee;">
+        <thead>
+          <tr style="background:#f8fafc;">
+            <th style="padding:6px;text-align:left;">Asama</th>
+            <th style="padding:6px;text-align:right;">Toplam</th>
+            <th style="padding:6px;text-align:right;">Adet</th>
+            <th style="padding:6px;text-align:right;">p50</th>
+            <th style="padding:6px;text-align:right;">p95</th>
+            <th style="padding:6px;text-align:right;">Cache</th>
+          </tr>
+        </thead>
+        <tbody>{timing_body}</tbody>
+      </table>
+        """
+
+    trend_block = ""
+    if trend_rows:
+        trend_body = "".join(
+            f"""
+        <tr>
+          <td style="padding:6px;border-bottom:1px solid #eee;">{_escape(r.get('date', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('items', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('candidates', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;text-align:right;">{_escape(r.get('llm_calls', '-'))}</td>
+          <td style="padding:6px;border-bottom:1px solid #eee;">{_escape(r.get('hits', '-'))}</td>
+        </tr>
+        """
+            for r in trend_rows
+        )
+        trend_block = f"""
+      <h3 style='margin:14px 0 8px 0;'>Son Gunler</h3>
+      <table style="border-collapse:collapse; border:1px solid #eee;">
+        <thead>
+          <tr style="background:#f8fafc;">
+            <th style="padding:6px;text-align:left;">Tarih</th>
+            <th style="padding:6px;text-align:right;">Kayit</th>
+            <th style="padding:6px;text-align:right;">Aday</th>
+            <th style="padding:6px;text-align:right;">LLM</th>
+            <th style="padding:6px;text-align:left;">Departman Hit</th>
+          </tr>
+        </thead>
+        <tbody>{trend_body}</tbody>
+      </table>
+        """
+
     traceback_block = ""
     if traceback_text:
         traceback_block = (
@@ -106,7 +183,9 @@ def build_admin_status_email_html(
       <div style="margin-bottom:12px;">
         Tarih: <b>{day:%d.%m.%Y}</b><br/>
         Durum: <b style="color:{status_color};">{status_text}</b><br/>
-        Toplam fihrist kaydi: <b>{total_items_text}</b>
+        Toplam fihrist kaydi: <b>{total_items_text}</b><br/>
+        {incremental_line}
+        {outbox_line}
       </div>
 
       <table style="width:100%; border-collapse:collapse; border:1px solid #eee;">
@@ -126,6 +205,8 @@ def build_admin_status_email_html(
         </tbody>
       </table>
 
+      {timing_block}
+      {trend_block}
       {error_block}
       {traceback_block}
     </div>
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from time import monotonic
+from typing import Callable
+
+# Degradation levels, cheapest last. Each one applies from its share of the budget on.
+LEVEL_FULL = "full"
+LEVEL_TEXT_LAYER = "text_layer"  # PDFs: text layer only, no OCR
+LEVEL_TITLE_ONLY = "title_only"  # no detail text, LLM sees the title only
+LEVEL_DEFER = "defer"  # remaining items are left for the next run
+
+TEXT_LAYER_AT = 0.6
+TITLE_ONLY_AT = 0.8
+DEFER_AT = 0.95
+
+
+class RunBudget:
+    """
+    Wall-clock budget of one run. ``level()`` tells the engine how much work
+    an item may still cost; ``seconds <= 0`` means no budget (always full).
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = monotonic) -> None:
+        self.seconds = seconds
+        self.clock = clock
+        self.started = clock()
+        self._last_level = LEVEL_FULL
+
+    @property
+    def elapsed_s(self) -> float:
+        return self.clock() - self.started
+
+    def level(self) -> str:
+        if self.seconds <= 0:
+            return LEVEL_FULL
+        elapsed = self.elapsed_s
+        used = elapsed / self.seconds
+        if used >= DEFER_AT:
+            level = LEVEL_DEFER
+        elif used >= TITLE_ONLY_AT:
+            level = LEVEL_TITLE_ONLY
+        elif used >= TEXT_LAYER_AT:
+            level = LEVEL_TEXT_LAYER
+        else:
+            level = LEVEL_FULL
+        if level != self._last_level:
+            print(f"[BUDGET] {elapsed:.0f}s of {self.seconds:.0f}s used -> {level}")
+            self._last_level = level
+        return level
+
@@ -0,0 +1,814 @@
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from time import monotonic
+from typing import Callable, Dict, Iterable, List, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import requests
+
+from src.app.config import Settings, get_settings
+from src.core.http import build_session
+from src.core.models import GazetteItem
+from src.core.ratelimit import RateLimiter
+from src.core.timing import StageTimer
+from src.db.storage import (
+    enqueue_mail,
+    get_stored_decisions,
+    refresh_daily_stats,
+    save_item_outcomes,
+    save_parsed_items,
+    save_run_log,
+)
+from src.gazette.client import (
+    MAX_EXTRA_EDITIONS,
+    Edition,
+    daily_index_url,
+    editions_from_index,
+    fetch_daily_html,
+    fetch_edition_html,
+    mukerrer_url,
+)
+from src.gazette.detail_text import fetch_detail_text, iter_detail_text
+from src.gazette.parser import parse_daily_items
+from src.llm.ollama_client import MultiDeptDecision, OllamaClient
+from src.notify.outbox import OutboxDelivery, drain_outbox
+from src.pipeline.budget import LEVEL_DEFER, LEVEL_FULL, LEVEL_TEXT_LAYER, LEVEL_TITLE_ONLY, RunBudget
+from src.policies.base import DepartmentPolicy, PolicyDecision
+from src.policies.common_negative_rules import NEGATIVE_RULES
+from src.policies.factory_signals import has_factory_override
+from src.policies.lexical import LexicalScore, LexicalScorer, score_text, top_score
+from src.policies.negative_filter import apply_negative_rules
+from src.policies.utils import build_haystack, contains_financial_keywords, is_excluded_section, is_ilan_url
+
+REQUEST_DELAY_SECONDS = 0.35
+LLM_TEXT_CHARS = 2500
+DEPT_ORDER = ("isg", "ik", "muhasebe", "lojistik", "it_siber", "kvkk")
+# Item results are written in small transactions: every N items or every few seconds.
+ITEM_WRITE_BATCH = 10
+ITEM_WRITE_MAX_DELAY_S = 2.0
+# Detail text kept (compressed) in the database for search and offline audits.
+STORED_TEXT_CHARS = 500_000
+# A mükerrer edition that returned 404 is not probed again for this long; it may
+# still be published later in the day.
+EDITION_MISS_TTL_SECONDS = 1800.0
+
+# Called after every item with (done, total); may raise RunCancelled to stop the run.
+ProgressCallback = Callable[[int, int], None]
+
+
+class RunCancelled(Exception):
+    """Raised from a progress callback to stop a run before persist/notify."""
+
+
+@dataclass(frozen=True)
+class CandidateDecision:
+    """
+    Decide whether an item should go to LLM or should be skipped.
+    """
+
+    status: str  # "SKIP_ILAN" | "SKIP_NEG_HARD" | "CANDIDATE_LLM"
+    neg_penalty: int = 0
+    neg_reasons: Tuple[str, ...] = ()
+    override_factory: bool = False
+
+
+@dataclass(frozen=True)
+class PolicyHit:
+    item: GazetteItem
+    decision: PolicyDecision
+    llm: MultiDeptDecision
+    lexical: Optional[LexicalScore] = None
+    department: str = ""
+
+
+@dataclass(frozen=True)
+class DepartmentMailResult:
+    department: str
+    hit_count: int
+    recipients: Tuple[str, ...]
+    subject: str
+    status: str  # sent | failed | skipped_no_hits | skipped_no_recipients | skipped_duplicate
+    sample_titles: Tuple[str, ...] = ()
+    error: str = ""
+    queued: int = 0
+    sent: int = 0
+    deduplicated: int = 0
+
+
+@dataclass
+class PipelineCaches:
+    """
+    Per-URL caches shared by the stages. Any ``MutableMapping`` works, so a
+    caller can keep them across runs or back them with something persistent.
+    """
+
+    index: MutableMapping[str, str] = field(default_factory=dict)
+    text: MutableMapping[str, str] = field(default_factory=dict)
+    lexical: MutableMapping[str, Dict[str, LexicalScore]] = field(default_factory=dict)
+    llm: MutableMapping[str, MultiDeptDecision] = field(default_factory=dict)
+    # Edition URL -> monotonic time of its last 404 (see ``discover_editions``).
+    missing_editions: MutableMapping[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class IndexPage:
+    day: date
+    url: str
+    html: str
+    edition: str = ""
+
+
+@dataclass(frozen=True)
+class DetailText:
+    url: str
+    text: str
+    lexical: Mapping[str, LexicalScore] = field(default_factory=dict)
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class ItemOutcome:
+    item: GazetteItem
+    candidate: CandidateDecision
+    status: str  # skipped | no_text | lexical_gate | classified | failed | deferred
+    text: Optional[DetailText] = None
+    llm: Optional[MultiDeptDecision] = None
+    hits: Tuple[PolicyHit, ...] = ()
+    error: str = ""
+    # Budget level the item was handled at if cheaper than full ("text_layer" | "title_only").
+    degraded: str = ""
+    # The decision came from the LLM cache (this engine's, or restored from the database).
+    cached: bool = False
+
+
+class OutcomeWriter:
+    """
+    Buffers item outcomes and writes them to the database in small batches,
+    so a crash loses at most one batch and the dashboard sees live progress.
+    """
+
+    def __init__(
+        self,
+        day: date,
+        timer: Optional[StageTimer] = None,
+        batch_size: int = ITEM_WRITE_BATCH,
+        max_delay_s: float = ITEM_WRITE_MAX_DELAY_S,
+    ) -> None:
+        self.day = day
+        self.timer = timer or StageTimer()
+        self.batch_size = batch_size
+        self.max_delay_s = max_delay_s
+        self.written = 0
+        self._pending: List[dict] = []
+        self._last_flush = monotonic()
+
+    def add(self, outcome: ItemOutcome) -> None:
+        if outcome.status == "deferred":
+            return  # stays "parsed" until a later run handles it
+        # Degraded decisions are not stored for reuse, so the next run classifies the full text.
+        keep_decision = outcome.llm is not None and not outcome.degraded
+        decision = asdict(outcome.llm) if outcome.llm else {}
+        self._pending.append(
+            {
+                "item": outcome.item,
+                "stage": outcome.status,
+                "degraded": outcome.degraded,
+                "departments": {hit.department for hit in outcome.hits},
+                "confidence": outcome.llm.confidence if outcome.llm else None,
+                "evidence": outcome.llm.evidence if outcome.llm else "",
+                # The raw LLM output only goes to the compressed artifact.
+                "llm_decision": json.dumps({**decision, "raw": ""}, ensure_ascii=False) if keep_decision else "",
+                # Only decisions made in this run: restored ones lack the raw output.
+                "decision": (
+                    json.dumps({**decision, "degraded": outcome.degraded}, ensure_ascii=False)
+                    if decision and not outcome.cached
+                    else ""
+                ),
+                "text": outcome.text.text[:STORED_TEXT_CHARS] if outcome.text else "",
+            }
+        )
+        if len(self._pending) >= self.batch_size or monotonic() - self._last_flush >= self.max_delay_s:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = monotonic()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            with self.timer.measure("persist_items"):
+                save_item_outcomes(self.day, batch)
+            self.written += len(batch)
+        except Exception as exc:
+            print(f"[WARN] Failed to save {len(batch)} item result(s) -> {exc}")
+
+
+class EarlyDispatcher:
+    """
+    Mails hits with ``confidence >= min_confidence`` before the slow tail of
+    the run ends. Urgent hits are queued as they come; ``window_s`` after a
+    department's first urgent hit, everything queued for it goes out in one
+    mail. Each department gets at most one early mail per run: later urgent
+    hits stay queued for the final ``notify``, which does not mail anything twice.
+    """
+
+    def __init__(
+        self,
+        engine: PipelineEngine,
+        day: date,
+        min_confidence: int,
+        window_s: float = 0.0,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.engine = engine
+        self.day = day
+        self.min_confidence = min_confidence
+        self.window_s = window_s
+        self.clock = clock
+        self.queued: Dict[str, int] = {}
+        self.deliveries: List[OutboxDelivery] = []
+        # Department -> time its first urgent hit was queued; removed once its mail went out.
+        self._pending_since: Dict[str, float] = {}
+        self._dispatched: set[str] = set()
+
+    def add(self, outcome: ItemOutcome) -> None:
+        urgent = [
+            hit
+            for hit in outcome.hits
+            if hit.llm.confidence >= self.min_confidence and hit.department not in self._dispatched
+        ]
+        try:
+            if urgent:
+                with self.engine.timer.measure("notify_early"):
+                    for hit in urgent:
+                        queued, _ = enqueue_mail(hit.department, self.day, [hit.item])
+                        if queued:
+                            self.queued[hit.department] = self.queued.get(hit.department, 0) + queued
+                            self._pending_since.setdefault(hit.department, self.clock())
+            self.dispatch_due()
+        except Exception as exc:
+            # The final notify retries anything still queued.
+            print(f"[WARN] Early dispatch failed for {outcome.item.url} -> {exc}")
+
+    def dispatch_due(self) -> None:
+        """Send the departments whose window since their first urgent hit has passed."""
+        now = self.clock()
+        due = [dept for dept, since in self._pending_since.items() if now - since >= self.window_s]
+        if not due:
+            return
+        for dept in due:
+            del self._pending_since[dept]
+            self._dispatched.add(dept)
+        with self.engine.timer.measure("notify_early"):
+            settings = self.engine.settings
+            self.deliveries.extend(drain_outbox(settings, recipients_map(settings), departments=due))
+
+
+@dataclass(frozen=True)
+class DayResult:
+    index: IndexPage
+    items: Tuple[GazetteItem, ...]
+    outcomes: Tuple[ItemOutcome, ...]
+    hits_by_dept: Dict[str, List[PolicyHit]]
+
+    @property
+    def day(self) -> date:
+        return self.index.day
+
+    @property
+    def candidate_map(self) -> Dict[str, CandidateDecision]:
+        return {o.item.url: o.candidate for o in self.outcomes}
+
+
+def decide_candidate(item: GazetteItem) -> CandidateDecision:
+    # 1) If section (or URL) is ilan, skip directly.
+    if is_excluded_section(item) or is_ilan_url(item.url):
+        return CandidateDecision(status="SKIP_ILAN")
+
+    haystack = build_haystack(item)
+
+    # 2) Negative rules.
+    neg_penalty, neg_reasons, hard_excluded = apply_negative_rules(haystack, NEGATIVE_RULES)
+    override = has_factory_override(haystack)
+
+    # 3) Hard negative and no override means skip.
+    if hard_excluded and not override:
+        return CandidateDecision(
+            status="SKIP_NEG_HARD",
+            neg_penalty=neg_penalty,
+            neg_reasons=tuple(neg_reasons),
+            override_factory=False,
+        )
+
+    # 4) Remaining records are LLM candidates.
+    return CandidateDecision(
+        status="CANDIDATE_LLM",
+        neg_penalty=neg_penalty,
+        neg_reasons=tuple(neg_reasons),
+        override_factory=override,
+    )
+
+
+def fetch_text_with_lexical_scores(
+    session: requests.Session,
+    url: str,
+    ocr: bool = True,
+) -> Tuple[str, Dict[str, LexicalScore]]:
+    """
+    Stream the full detail text through the keyword scorer.
+
+    Only the head the LLM needs is kept; once it is filled and every rule has
+    matched, the remaining pages are not read at all.
+    """
+    scorer = LexicalScorer()
+    head = ""
+    for chunk in iter_detail_text(session, url, ocr=ocr):
+        if len(head) < LLM_TEXT_CHARS:
+            head = f"{head}\n\n{chunk}" if head else chunk
+        scorer.feed(chunk)
+        if scorer.exhausted and len(head) >= LLM_TEXT_CHARS:
+            break
+    return head[:LLM_TEXT_CHARS], scorer.scores()
+
+
+def passes_lexical_gate(scores: Optional[Mapping[str, LexicalScore]], min_score: int, is_financial: bool) -> bool:
+    if not scores or min_score <= 0 or is_financial:
+        return True
+    return top_score(scores) >= min_score
+
+
+def section_rank(item: GazetteItem) -> int:
+    section = (item.section or "").upper()
+    if "YASAMA" in section:
+        return 0
+    if "YÜRÜTME" in section:
+        return 1
+    return 2
+
+
+def item_priority(item: GazetteItem, caches: PipelineCaches) -> Tuple[int, int, int, int]:
+    """
+    Cheap sort key for the work queue (lower runs first): already cached
+    items, then higher title lexical score, YASAMA/YÜRÜTME before other
+    sections, and HTML pages before PDFs (download + OCR, often annexes).
+    """
+    cached = item.url in caches.llm or item.url in caches.text
+    title_score = top_score(score_text(build_haystack(item)))
+    is_pdf = item.url.lower().endswith(".pdf")
+    return (0 if cached else 1, -title_score, section_rank(item), 1 if is_pdf else 0)
+
+
+def split_recipients(raw: str) -> List[str]:
+    return [v.strip() for v in (raw or "").split(",") if v and v.strip()]
+
+
+def recipients_map(settings: Settings) -> Dict[str, List[str]]:
+    return {dept: split_recipients(getattr(settings, f"{dept}_recipients", "")) for dept in DEPT_ORDER}
+
+
+def _is_not_found(exc: requests.RequestException) -> bool:
+    response = getattr(exc, "response", None)
+    return response is not None and response.status_code in (404, 410)
+
+
+class PipelineEngine:
+    """
+    The daily pipeline as explicit stages:
+
+        fetch_index (+ mükerrer editions) -> parse -> gate -> fetch_text -> classify -> route -> persist -> notify
+
+    ``process_day`` drives the stages up to routing; persisting and notifying
+    are left to the caller so debug tools can stop before side effects.
+    ``run()`` streams each item outcome to the database via ``OutcomeWriter``.
+    """
+
+    def __init__(
+        self,
+        policies: Sequence[DepartmentPolicy],
+        *,
+        settings: Optional[Settings] = None,
+        session: Optional[requests.Session] = None,
+        ollama: Optional[OllamaClient] = None,
+        caches: Optional[PipelineCaches] = None,
+        request_delay_s: float = REQUEST_DELAY_SECONDS,
+        timer: Optional[StageTimer] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.settings = settings or get_settings()
+        self.session = session or build_session()
+        self.ollama = ollama or OllamaClient(self.settings.ollama_base_url, self.settings.ollama_model)
+        self.caches = caches or PipelineCaches()
+        self.request_delay_s = request_delay_s
+        # Engines running in parallel (e.g. a backfill) pass one shared limiter.
+        self.rate_limiter = rate_limiter or RateLimiter(request_delay_s)
+        self.timer = timer or StageTimer()
+        self.policy_map: Dict[str, DepartmentPolicy] = {pol.name: pol for pol in policies}
+
+    # -- stages --------------------------------------------------------------
+
+    def fetch_index(self, day: date) -> IndexPage:
+        url = daily_index_url(day)
+        html = self.caches.index.get(url)
+        self.timer.cache("index_fetch", hit=html is not None)
+        if html is None:
+            self.rate_limiter.wait()
+            with self.timer.measure("index_fetch"):
+                html = fetch_daily_html(session=self.session, day=day)
+            self.caches.index[url] = html
+        return IndexPage(day=day, url=url, html=html)
+
+    def fetch_edition(self, edition: Edition) -> IndexPage:
+        html = self.caches.index.get(edition.url)
+        self.timer.cache("index_fetch", hit=html is not None)
+        if html is None:
+            self.rate_limiter.wait()
+            with self.timer.measure("index_fetch"):
+                html = fetch_edition_html(self.session, edition)
+            self.caches.index[edition.url] = html
+        return IndexPage(day=edition.day, url=edition.url, html=html, edition=edition.name)
+
+    def discover_editions(self, main: IndexPage) -> List[Edition]:
+        """
+        Mükerrer editions of ``main.day``: linked from the main index, else
+        probed M1, M2, ... one after the other until the first 404. A 404 is
+        remembered for ``EDITION_MISS_TTL_SECONDS``, so dense polling does not
+        repeat it every run; other errors are logged and the next number is
+        tried, the failed one is probed again by the next run.
+        """
+        linked = editions_from_index(main.day, main.html)
+        if linked:
+            return linked
+        found: List[Edition] = []
+        for number in range(1, MAX_EXTRA_EDITIONS + 1):
+            edition = Edition(day=main.day, name=f"M{number}", url=mukerrer_url(main.day, number))
+            missed_at = self.caches.missing_editions.get(edition.url)
+            if missed_at is not None and monotonic() - missed_at < EDITION_MISS_TTL_SECONDS:
+                break
+            try:
+                self.fetch_edition(edition)  # cached for collect_items
+            except requests.RequestException as exc:
+                if _is_not_found(exc):
+                    self.caches.missing_editions[edition.url] = monotonic()
+                    break
+                print(f"[WARN] Edition {edition.name} probe ({edition.url}) failed -> {exc}")
+                continue
+            self.caches.missing_editions.pop(edition.url, None)
+            found.append(edition)
+        return found
+
+    def parse(self, page: IndexPage) -> List[GazetteItem]:
+        with self.timer.measure("parse"):
+            return parse_daily_items(html=page.html, base_url=page.url, edition=page.edition)
+
+    def collect_items(self, day: date) -> Tuple[IndexPage, List[GazetteItem]]:
+        """
+        Fetch and parse the main edition and every mükerrer edition of ``day``
+        into one list, deduplicated by URL. Linked extras are fetched and parsed
+        concurrently; probed ones were already fetched by ``discover_editions``.
+        """
+        main = self.fetch_index(day)
+        parsed: List[List[GazetteItem]] = [self.parse(main)]
+        editions = self.discover_editions(main) if self.settings.mukerrer_editions_enabled else []
+        if editions:
+            with ThreadPoolExecutor(max_workers=min(4, len(editions)), thread_name_prefix="edition") as pool:
+                parsed.extend(pool.map(self._fetch_and_parse, editions))
+
+        items: List[GazetteItem] = []
+        seen: set[str] = set()
+        for edition_items in parsed:
+            for item in edition_items:
+                if item.url not in seen:
+                    seen.add(item.url)
+                    items.append(item)
+        return main, items
+
+    def _fetch_and_parse(self, edition: Edition) -> List[GazetteItem]:
+        try:
+            return self.parse(self.fetch_edition(edition))
+        except Exception as exc:
+            print(f"[WARN] Edition {edition.name} ({edition.url}) failed -> {exc}")
+            return []
+
+    def gate(self, item: GazetteItem) -> CandidateDecision:
+        with self.timer.measure("gate"):
+            return decide_candidate(item)
+
+    def fetch_text(self, item: GazetteItem, ocr: bool = True) -> DetailText:
+        text = self.caches.text.get(item.url)
+        # PDF (download + OCR) and HTML pages have very different costs, so time them apart.
+        is_pdf = item.url.lower().endswith(".pdf")
+        stage = "text_pdf" if is_pdf else "text_html"
+        self.timer.cache(stage, hit=text is not None)
+        if text is None:
+            # Soft throttle to avoid hitting the source too aggressively.
+            self.rate_limiter.wait()
+            try:
+                with self.timer.measure(stage):
+                    if self.settings.lexical_scoring_enabled:
+                        text, self.caches.lexical[item.url] = fetch_text_with_lexical_scores(
+                            self.session, item.url, ocr=ocr
+                        )
+                    else:
+                        text = fetch_detail_text(self.session, item.url, ocr=ocr)
+            except Exception as exc:
+                # Not cached, so a later run retries the download.
+                return DetailText(url=item.url, text="", error=str(exc) or exc.__class__.__name__)
+            if ocr or not is_pdf:
+                # A text-layer-only PDF text is not cached, so a later run can still OCR it.
+                self.caches.text[item.url] = text
+        return DetailText(url=item.url, text=(text or "").strip(), lexical=self.caches.lexical.get(item.url, {}))
+
+    def classify(self, item: GazetteItem, text: DetailText, remember: bool = True) -> MultiDeptDecision:
+        md = self.caches.llm.get(item.url)
+        self.timer.cache("classify", hit=md is not None)
+        if md is None:
+            with self.timer.measure("classify"):
+                md = self.ollama.classify_multi(title=item.title, url=item.url, text=text.text[:LLM_TEXT_CHARS])
+            if remember:
+                self.caches.llm[item.url] = md
+        return md
+
+    def route(self, item: GazetteItem, md: MultiDeptDecision, text: DetailText) -> Tuple[PolicyHit, ...]:
+        # Confidence gate: lower threshold for financial-like titles
+        is_financial = contains_financial_keywords(build_haystack(item))
+        threshold = 20 if is_financial else 40
+        if md.confidence < threshold:
+            return ()
+
+        flags = {
+            "isg": md.isg,
+            "ik": md.ik,
+            # Pre-mark muhasebe if title contains financial keywords even if LLM didn't
+            "muhasebe": md.muhasebe or is_financial,
+            "lojistik": md.lojistik,
+            "it_siber": md.it_siber,
+            "kvkk": md.kvkk,
+        }
+        hits: List[PolicyHit] = []
+        for dept in DEPT_ORDER:
+            policy = self.policy_map.get(dept)
+            if not flags[dept] or policy is None:
+                continue
+            hits.append(
+                PolicyHit(
+                    item=item,
+                    decision=policy.evaluate_title(item),
+                    llm=md,
+                    lexical=text.lexical.get(dept),
+                    department=dept,
+                )
+            )
+        return tuple(hits)
+
+    def persist_parsed(self, day: date, items: Sequence[GazetteItem]) -> int:
+        """Store parsed items right away so the dashboard shows them before classification."""
+        try:
+            with self.timer.measure("persist"):
+                return save_parsed_items(day, items)
+        except Exception as exc:
+            print(f"[WARN] Failed to save parsed items -> {exc}")
+            return 0
+
+    def restore_decisions(self, day: date) -> int:
+        """
+        Seed the LLM cache with decisions stored by an earlier (possibly crashed)
+        run of ``day``, so those items are neither refetched nor reclassified.
+        """
+        try:
+            stored = get_stored_decisions(day)
+        except Exception as exc:
+            print(f"[WARN] Failed to load stored decisions -> {exc}")
+            return 0
+        restored = 0
+        for url, payload in stored.items():
+            if url in self.caches.llm:
+                continue
+            try:
+                self.caches.llm[url] = MultiDeptDecision(**json.loads(payload))
+            except (TypeError, ValueError):
+                continue
+            restored += 1
+        return restored
+
+    def outcome_writer(self, day: date) -> OutcomeWriter:
+        return OutcomeWriter(day, timer=self.timer)
+
+    def early_dispatcher(self, day: date) -> Optional[EarlyDispatcher]:
+        """An ``EarlyDispatcher`` if ``EARLY_DISPATCH_MIN_CONFIDENCE`` is set, else ``None``."""
+        min_confidence = self.settings.early_dispatch_min_confidence
+        if min_confidence <= 0:
+            return None
+        return EarlyDispatcher(self, day, min_confidence, window_s=self.settings.early_dispatch_window_seconds)
+
+    def persist(self, day: date, items_found: int) -> Optional[int]:
+        """
+        Log the run and refresh the day's ``daily_stats`` (items are written
+        while processing); returns the run_log id.
+        """
+        try:
+            with self.timer.measure("persist"):
+                run_id = save_run_log(day, items_found)
+        except Exception:
+            print("[WARN] Failed to save run log to database")
+            return None
+        # Every LLM request of this run is one "classify" sample; cache hits are not timed.
+        llm_calls = next((t.count for t in self.timer.summary() if t.stage == "classify"), 0)
+        try:
+            refresh_daily_stats(day, llm_calls=llm_calls)
+        except Exception as exc:
+            print(f"[WARN] Failed to update daily stats -> {exc}")
+        return run_id
+
+    def notify(
+        self,
+        day: date,
+        hits_by_dept: Mapping[str, List[PolicyHit]],
+        early: Optional[EarlyDispatcher] = None,
+    ) -> Tuple[DepartmentMailResult, ...]:
+        """
+        Queue only the (department, URL) pairs not queued before, then drain the
+        outbox. Leftovers from earlier runs (e.g. failed sends) go out too.
+        Mails already sent by ``early`` are included in the results.
+        """
+        queue_counts: Dict[str, Tuple[int, int]] = {}
+        with self.timer.measure("notify_queue"):
+            for dept in DEPT_ORDER:
+                hits = hits_by_dept.get(dept)
+                if hits:
+                    queue_counts[dept] = enqueue_mail(dept, day, [hit.item for hit in hits])
+
+        deliveries: Dict[str, List[OutboxDelivery]] = {}
+        with self.timer.measure("notify_send"):
+            drained = drain_outbox(self.settings, recipients_map(self.settings), departments=list(hits_by_dept))
+        if early is not None:
+            drained = early.deliveries + drained
+            for dept, early_queued in early.queued.items():
+                queued, deduplicated = queue_counts.get(dept, (0, 0))
+                queue_counts[dept] = (queued + early_queued, max(0, deduplicated - early_queued))
+        for delivery in drained:
+            deliveries.setdefault(delivery.department, []).append(delivery)
+
+        results: List[DepartmentMailResult] = []
+        for dept in DEPT_ORDER:
+            if dept not in hits_by_dept:
+                continue
+            queued, deduplicated = queue_counts.get(dept, (0, 0))
+            results.append(
+                _department_result(dept, len(hits_by_dept[dept]), queued, deduplicated, deliveries.get(dept, []))
+            )
+        return tuple(results)
+
+    # -- drivers -------------------------------------------------------------
+
+    def process_item(
+        self,
+        item: GazetteItem,
+        candidate: Optional[CandidateDecision] = None,
+        level: str = LEVEL_FULL,
+    ) -> ItemOutcome:
+        """
+        Run one item through gate -> fetch_text -> classify -> route.
+
+        ``level`` is the run budget's degradation level: ``text_layer`` skips
+        OCR for PDFs, ``title_only`` classifies on the title without fetching
+        the text, ``defer`` leaves the item for the next run. Degraded results
+        are not cached, so the next run processes the item in full.
+        """
+        cand = candidate or self.gate(item)
+        if cand.status != "CANDIDATE_LLM":
+            return ItemOutcome(item=item, candidate=cand, status="skipped")
+
+        if item.url in self.caches.llm:
+            # Already decided (earlier run or stored decision): no need to refetch the text.
+            text = DetailText(
+                url=item.url,
+                text=(self.caches.text.get(item.url) or "").strip(),
+                lexical=self.caches.lexical.get(item.url, {}),
+            )
+            md = self.classify(item, text)
+            with self.timer.measure("route"):
+                hits = self.route(item, md, text)
+            return ItemOutcome(
+                item=item, candidate=cand, status="classified", text=text, llm=md, hits=hits, cached=True
+            )
+
+        if level == LEVEL_DEFER:
+            return ItemOutcome(item=item, candidate=cand, status="deferred")
+        if level == LEVEL_TITLE_ONLY:
+            return self._classify_title_only(item, cand)
+
+        is_pdf = item.url.lower().endswith(".pdf")
+        degraded = LEVEL_TEXT_LAYER if level == LEVEL_TEXT_LAYER and is_pdf and item.url not in self.caches.text else ""
+        text = self.fetch_text(item, ocr=not degraded)
+        is_financial = contains_financial_keywords(build_haystack(item))
+
+        # If no detail text (e.g., PDF), allow proceeding when title/haystack looks financial
+        if not text.text and not is_financial:
+            if text.error:
+                return ItemOutcome(item=item, candidate=cand, status="failed", text=text, error=text.error)
+            return ItemOutcome(item=item, candidate=cand, status="no_text", text=text, degraded=degraded)
+
+        if not passes_lexical_gate(text.lexical, self.settings.lexical_min_score, is_financial):
+            return ItemOutcome(item=item, candidate=cand, status="lexical_gate", text=text, degraded=degraded)
+
+        try:
+            md = self.classify(item, text, remember=not degraded)
+        except Exception as exc:
+            return ItemOutcome(item=item, candidate=cand, status="failed", text=text, error=str(exc))
+
+        with self.timer.measure("route"):
+            hits = self.route(item, md, text)
+        return ItemOutcome(
+            item=item, candidate=cand, status="classified", text=text, llm=md, hits=hits, degraded=degraded
+        )
+
+    def _classify_title_only(self, item: GazetteItem, cand: CandidateDecision) -> ItemOutcome:
+        text = DetailText(url=item.url, text="")
+        try:
+            md = self.classify(item, text, remember=False)
+        except Exception as exc:
+            return ItemOutcome(item=item, candidate=cand, status="failed", text=text, error=str(exc))
+        with self.timer.measure("route"):
+            hits = self.route(item, md, text)
+        return ItemOutcome(
+            item=item, candidate=cand, status="classified", text=text, llm=md, hits=hits, degraded=LEVEL_TITLE_ONLY
+        )
+
+    def prioritize(self, items: Sequence[GazetteItem]) -> List[GazetteItem]:
+        """Order candidates so likely hits are classified first (stable for ties)."""
+        if not self.settings.priority_scheduling_enabled:
+            return list(items)
+        return sorted(items, key=lambda it: item_priority(it, self.caches))
+
+    def process_day(self, day: date, progress: Optional[ProgressCallback] = None) -> DayResult:
+        page, items = self.collect_items(day)
+        return self.process_items(page, items, progress=progress)
+
+    def process_items(
+        self,
+        page: IndexPage,
+        items: Iterable[GazetteItem],
+        progress: Optional[ProgressCallback] = None,
+        on_outcome: Optional[Callable[[ItemOutcome], None]] = None,
+        budget: Optional[RunBudget] = None,
+    ) -> DayResult:
+        items = tuple(items)
+        outcomes: List[ItemOutcome] = []
+        hits_by_dept: Dict[str, List[PolicyHit]] = {name: [] for name in self.policy_map}
+        if progress is not None:
+            progress(0, len(items))
+        for item in self.prioritize(items):
+            level = budget.level() if budget is not None else LEVEL_FULL
+            with self.timer.measure("item"):
+                outcome = self.process_item(item, level=level)
+            outcomes.append(outcome)
+            for hit in outcome.hits:
+                hits_by_dept[hit.department].append(hit)
+            if on_outcome is not None:
+                on_outcome(outcome)
+            if progress is not None:
+                progress(len(outcomes), len(items))
+        # Mails and reports list hits in page order regardless of processing order.
+        position = {item.url: n for n, item in enumerate(items)}
+        for dept_hits in hits_by_dept.values():
+            dept_hits.sort(key=lambda hit: position.get(hit.item.url, len(position)))
+        return DayResult(index=page, items=items, outcomes=tuple(outcomes), hits_by_dept=hits_by_dept)
+
+
+def _department_result(
+    dept: str,
+    hit_count: int,
+    queued: int,
+    deduplicated: int,
+    deliveries: Sequence[OutboxDelivery],
+) -> DepartmentMailResult:
+    if not hit_count and not deliveries:
+        return DepartmentMailResult(department=dept, hit_count=0, recipients=(), subject="", status="skipped_no_hits")
+    if not deliveries:
+        return DepartmentMailResult(
+            department=dept,
+            hit_count=hit_count,
+            recipients=(),
+            subject="",
+            status="skipped_duplicate",
+            deduplicated=deduplicated,
+        )
+
+    # A failed batch wins over a sent one so the admin mail surfaces it.
+    worst = next((d for d in deliveries if d.status == "failed"), None) or deliveries[-1]
+    delivered_items = [item for d in deliveries for item in d.items]
+    return DepartmentMailResult(
+        department=dept,
+        hit_count=hit_count,
+        recipients=worst.recipients,
+        subject=" | ".join(d.subject for d in deliveries),
+        status=worst.status,
+        sample_titles=tuple(item.title for item in delivered_items[:5]),
+        error="; ".join(d.error for d in deliveries if d.error),
+        queued=queued,
+        sent=sum(len(d.items) for d in deliveries if d.status == "sent"),
+        deduplicated=deduplicated,
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import uuid
+from datetime import date
+from typing import Optional
+
+from src.db.storage import acquire_run_lease, get_run_lease, release_run_lease, renew_run_lease
+from src.pipeline.engine import RunCancelled
+
+LEASE_TTL_SECONDS = 120.0
+LEASE_RENEW_SECONDS = 30.0
+
+
+class LeaseHeld(RuntimeError):
+    """Another worker is already running this day."""
+
+
+class LeaseLost(RunCancelled):
+    """Our lease expired (e.g. the process stalled) and another worker may have taken the day."""
+
+
+class RunLease:
+    """
+    Exclusive, expiring claim on a day, stored in the shared SQLite database so
+    it holds across threads, processes and containers using the same ``data/``.
+
+    A heartbeat thread renews the lease while the run is alive; a crashed
+    worker's lease simply expires after ``ttl_s``.
+    """
+
+    def __init__(
+        self,
+        day: date,
+        ttl_s: float = LEASE_TTL_SECONDS,
+        renew_s: float = LEASE_RENEW_SECONDS,
+        owner: Optional[str] = None,
+    ) -> None:
+        self.day = day
+        self.ttl_s = ttl_s
+        self.renew_s = renew_s
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lost = False
+        self._stopped = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def acquire(self) -> None:
+        if not acquire_run_lease(self.day, self.owner, self.ttl_s):
+            holder = get_run_lease(self.day)
+            raise LeaseHeld(f"{self.day.isoformat()} is being processed by {holder['owner'] if holder else 'another worker'}")
+        self._stopped.clear()
+        self._heartbeat = threading.Thread(target=self._renew_loop, name=f"lease-{self.day}", daemon=True)
+        self._heartbeat.start()
+
+    def release(self) -> None:
+        self._stopped.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join(timeout=5)
+        try:
+            release_run_lease(self.day, self.owner)
+        except Exception as exc:
+            print(f"[WARN] Failed to release run lease for {self.day} -> {exc}")
+
+    def check(self) -> None:
+        """Raise ``LeaseLost`` if the lease could not be renewed."""
+        if self.lost:
+            raise LeaseLost(f"run lease for {self.day.isoformat()} lost")
+
+    def _renew_loop(self) -> None:
+        while not self._stopped.wait(self.renew_s):
+            try:
+                if not renew_run_lease(self.day, self.owner, self.ttl_s):
+                    self.lost = True
+                    return
+            except Exception as exc:
+                # Keep trying; the lease only lapses once ttl_s passes without a renewal.
+                print(f"[WARN] Run lease renewal failed for {self.day} -> {exc}")
+
+    def __enter__(self) -> "RunLease":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
@@ -1,64 +1,36 @@
 from __future__ import annotations
 
-from collections import defaultdict
 from dataclasses import dataclass
 from datetime import date
-from time import sleep
-from typing import Dict, List, Tuple
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from src.app.config import get_settings
-from src.core.http import build_session
 from src.core.models import GazetteItem
-from src.gazette.client import daily_index_url, fetch_daily_html
-from src.gazette.detail_text import fetch_detail_text
-from src.gazette.parser import parse_daily_items
-from src.llm.ollama_client import MultiDeptDecision, OllamaClient
-from src.notify.emailer import send_html_email
-from src.notify.templates import build_generic_email_html, build_generic_email_subject
-from src.policies.base import DepartmentPolicy, PolicyDecision
-from src.policies.common_negative_rules import NEGATIVE_RULES
-from src.policies.factory_signals import has_factory_override
+from src.core.timing import StageTiming
+from src.db.storage import get_handled_urls, save_stage_timings
+from src.pipeline.engine import (
+    DEPT_ORDER,
+    CandidateDecision,
+    DepartmentMailResult,
+    ItemOutcome,
+    PipelineEngine,
+    PolicyHit,
+    ProgressCallback,
+)
+from src.pipeline.budget import RunBudget
+from src.pipeline.lease import RunLease
+from src.policies.base import DepartmentPolicy
 from src.policies.ik import IkPolicy
 from src.policies.isg import IsgPolicy
 from src.policies.it_siber import ItSiberPolicy
 from src.policies.kvkk import KvkkPolicy
 from src.policies.lojistik import LojistikPolicy
 from src.policies.muhasebe import MuhasebePolicy
-from src.policies.negative_filter import apply_negative_rules
-from src.policies.utils import build_haystack, is_excluded_section, is_ilan_url, contains_financial_keywords
-from src.db.storage import save_items, save_run_log
 
-REQUEST_DELAY_SECONDS = 0.35
-
-
-@dataclass(frozen=True)
-class CandidateDecision:
-    """
-    Decide whether an item should go to LLM or should be skipped.
-    """
-
-    status: str  # "SKIP_ILAN" | "SKIP_NEG_HARD" | "CANDIDATE_LLM"
-    neg_penalty: int = 0
-    neg_reasons: Tuple[str, ...] = ()
-    override_factory: bool = False
-
-
-@dataclass(frozen=True)
-class PolicyHit:
-    item: GazetteItem
-    decision: PolicyDecision
-    llm: MultiDeptDecision
-
-
-@dataclass(frozen=True)
-class DepartmentMailResult:
-    department: str
-    hit_count: int
-    recipients: Tuple[str, ...]
-    subject: str
-    status: str  # sent | failed | skipped_no_hits | skipped_no_recipients
-    sample_titles: Tuple[str, ...] = ()
-    error: str = ""
+# Item states that need no more work; "hit" (mail not queued or failed), "failed",
+# "deferred" and "degraded" (handled cheaper than normal under the run budget) are
+# retried. Incremental runs read the same rule from the database (get_handled_urls).
+DONE_STATES = frozenset({"skipped", "fetched", "classified", "mailed"})
 
 
 @dataclass(frozen=True)
@@ -67,331 +39,211 @@ class RunReport:
     total_items: int
     hit_counts: Dict[str, int]
     department_results: Tuple[DepartmentMailResult, ...]
-
-
-def decide_candidate(item: GazetteItem) -> CandidateDecision:
-    # 1) If section is ilan, skip directly.
-    if is_excluded_section(item):
-        return CandidateDecision(status="SKIP_ILAN")
-
-    haystack = build_haystack(item)
-
-    # 2) Negative rules.
-    neg_penalty, neg_reasons, hard_excluded = apply_negative_rules(haystack, NEGATIVE_RULES)
-    override = has_factory_override(haystack)
-
-    # 3) Hard negative and no override means skip.
-    if hard_excluded and not override:
-        return CandidateDecision(
-            status="SKIP_NEG_HARD",
-            neg_penalty=neg_penalty,
-            neg_reasons=tuple(neg_reasons),
-            override_factory=False,
-        )
-
-    # 4) Remaining records are LLM candidates.
-    return CandidateDecision(
-        status="CANDIDATE_LLM",
-        neg_penalty=neg_penalty,
-        neg_reasons=tuple(neg_reasons),
-        override_factory=override,
-    )
+    new_items: int = 0
+    skipped_items: int = 0
+    stage_timings: Tuple[StageTiming, ...] = ()
+    # Items a later run has to retry: processing failed or their mail did not go out.
+    retry_items: int = 0
+    # Items the run budget left for the next run / handled without OCR or text.
+    deferred_items: int = 0
+    degraded_items: int = 0
+
+    @property
+    def mail_queued(self) -> int:
+        return sum(r.queued for r in self.department_results)
+
+    @property
+    def mail_sent(self) -> int:
+        return sum(r.sent for r in self.department_results)
+
+    @property
+    def mail_deduplicated(self) -> int:
+        return sum(r.deduplicated for r in self.department_results)
+
+
+def item_state(
+    outcome: ItemOutcome,
+    failed_departments: Sequence[str] = (),
+    mailed_departments: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    Processing state of an item after the run. ``mailed_departments`` are the
+    departments notify handled (``None``: all of them); a hit for any other
+    department, or one whose mail failed, stays ``hit`` and is retried.
+    """
+    if outcome.hits and any(
+        hit.department in failed_departments
+        or (mailed_departments is not None and hit.department not in mailed_departments)
+        for hit in outcome.hits
+    ):
+        return "hit"
+    if outcome.degraded:
+        return "degraded"
+    if outcome.status in ("no_text", "lexical_gate"):
+        return "fetched"
+    if outcome.status != "classified" or not outcome.hits:
+        return outcome.status
+    return "mailed"
 
 
 def collect_daily_hits(
     day: date,
     policies: List[DepartmentPolicy],
+    engine: Optional[PipelineEngine] = None,
 ) -> Tuple[List[GazetteItem], Dict[str, CandidateDecision], Dict[str, List[PolicyHit]]]:
-    session = build_session()
+    engine = engine or PipelineEngine(policies)
+    result = engine.process_day(day)
+    return list(result.items), result.candidate_map, result.hits_by_dept
 
-    html = fetch_daily_html(session=session, day=day)
-    items = parse_daily_items(html=html, base_url=daily_index_url(day))
 
-    candidate_map: Dict[str, CandidateDecision] = {}
-    for it in items:
-        candidate_map[it.url] = decide_candidate(it)
+def run(
+    day: date,
+    policies: List[DepartmentPolicy],
+    engine: Optional[PipelineEngine] = None,
+    incremental: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    notify: bool = True,
+    lease: bool = True,
+) -> RunReport:
+    """
+    Run the daily pipeline for ``day``.
 
-    settings = get_settings()
-    ollama = OllamaClient(
-        base_url=settings.ollama_base_url,
-        model=settings.ollama_model,
-    )
+    With ``lease=True`` the run holds the day's ``RunLease``; if another worker
+    is running the same day ``LeaseHeld`` is raised before any work is done.
 
-    policy_map: Dict[str, DepartmentPolicy] = {pol.name: pol for pol in policies}
-
-    text_cache: Dict[str, str] = {}
-    llm_cache: Dict[str, MultiDeptDecision] = {}
-    printed_debug: set[str] = set()
-    hits_by_policy: Dict[str, List[PolicyHit]] = {pol.name: [] for pol in policies}
-
-    for item in items:
-        if is_ilan_url(item.url):
-            continue
-
-        cand = candidate_map[item.url]
-        if cand.status != "CANDIDATE_LLM":
-            continue
-
-        text = text_cache.get(item.url)
-        if text is None:
-            # Soft throttle to avoid hitting the source too aggressively.
-            sleep(REQUEST_DELAY_SECONDS)
-            try:
-                text = fetch_detail_text(session, item.url)
-            except Exception:
-                text = ""
-            text_cache[item.url] = text
-
-        text = (text or "").strip()
-        if "20250621-18" in item.url and item.url not in printed_debug:
-            printed_debug.add(item.url)
-            print("\n[DEBUG] TARGET ITEM:", item.title)
-            print("[DEBUG] URL:", item.url)
-            print("[DEBUG] TEXT_LEN:", len(text))
-            print("[DEBUG] TEXT_HEAD:", text[:300].replace("\n", " "))
-
-        # If no detail text, allow proceeding for financial-like titles
-        if not text and not contains_financial_keywords(build_haystack(item)):
-            continue
-
-        md = llm_cache.get(item.url)
-        if md is None:
-            try:
-                md = ollama.classify_multi(title=item.title, url=item.url, text=text[:2500])
-            except Exception:
-                continue
-            if "20250621-18" in item.url:
-                print("\n[DEBUG] LLM_RAW:", md.raw)
-                print("[DEBUG] LLM_PARSED:", md.isg, md.ik, md.muhasebe, md.lojistik, md.it_siber, md.kvkk, md.confidence)
-                print("[DEBUG] LLM_EVIDENCE:", md.evidence)
-            llm_cache[item.url] = md
-
-        # Confidence gate with financial keyword handling
-        haystack_local = build_haystack(item)
-        is_financial_local = contains_financial_keywords(haystack_local)
-        threshold_local = 20 if is_financial_local else 40
-        if md.confidence < threshold_local:
-            continue
-
-        if md.isg and "isg" in policy_map:
-            decision = policy_map["isg"].evaluate_title(item)
-            hits_by_policy["isg"].append(PolicyHit(item=item, decision=decision, llm=md))
-        if md.ik and "ik" in policy_map:
-            decision = policy_map["ik"].evaluate_title(item)
-            hits_by_policy["ik"].append(PolicyHit(item=item, decision=decision, llm=md))
-        if md.muhasebe and "muhasebe" in policy_map:
-            decision = policy_map["muhasebe"].evaluate_title(item)
-            hits_by_policy["muhasebe"].append(PolicyHit(item=item, decision=decision, llm=md))
-        elif is_financial_local and "muhasebe" in policy_map:
-            # pre-mark muhasebe for financial-like titles
-            decision = policy_map["muhasebe"].evaluate_title(item)
-            hits_by_policy["muhasebe"].append(PolicyHit(item=item, decision=decision, llm=md))
-        if md.lojistik and "lojistik" in policy_map:
-            decision = policy_map["lojistik"].evaluate_title(item)
-            hits_by_policy["lojistik"].append(PolicyHit(item=item, decision=decision, llm=md))
-        if md.it_siber and "it_siber" in policy_map:
-            decision = policy_map["it_siber"].evaluate_title(item)
-            hits_by_policy["it_siber"].append(PolicyHit(item=item, decision=decision, llm=md))
-        if md.kvkk and "kvkk" in policy_map:
-            decision = policy_map["kvkk"].evaluate_title(item)
-            hits_by_policy["kvkk"].append(PolicyHit(item=item, decision=decision, llm=md))
-
-    return items, candidate_map, hits_by_policy
-
-
-def run(day: date, policies: List[DepartmentPolicy]) -> RunReport:
-    _ = policies
-    settings = get_settings()
-    session = build_session()
-
-    html = fetch_daily_html(session=session, day=day)
-    items = parse_daily_items(html=html, base_url=daily_index_url(day))
+    With ``incremental=True`` items already handled by an earlier run of the
+    same day (see ``get_handled_urls``) are skipped; only new or previously
+    failed items and hits never queued for mail go through text fetch, LLM and mail.
+
+    The run is bounded by ``RUN_BUDGET_SECONDS`` (see ``RunBudget``): close to
+    the budget PDFs are read without OCR, then items are classified on their
+    title only, and finally the remaining items are deferred to the next run.
+    Hits found so far are stored and mailed as usual.
+
+    ``progress`` is called after every processed item; if it raises
+    ``RunCancelled`` the item results stored so far are kept (and reused by
+    the next run), but nothing is mailed or marked as handled.
+    With ``notify=False`` hits are only stored, no department mail is queued.
+    """
+    if not lease:
+        return _run(day, policies, engine, incremental, progress, notify, None)
+    with RunLease(day) as run_lease:
+        return _run(day, policies, engine, incremental, progress, notify, run_lease)
+
+
+def _run(
+    day: date,
+    policies: List[DepartmentPolicy],
+    engine: Optional[PipelineEngine],
+    incremental: bool,
+    progress: Optional[ProgressCallback],
+    notify: bool,
+    run_lease: Optional[RunLease],
+) -> RunReport:
+    engine = engine or PipelineEngine(policies)
+    engine.timer.reset()
+    started = perf_counter()
+    budget = RunBudget(engine.settings.run_budget_seconds)
+
+    page, items = engine.collect_items(day)
     print(f"[INFO] items found: {len(items)}")
+    new_rows = engine.persist_parsed(day, items)
+    restored = engine.restore_decisions(day)
+    if restored:
+        print(f"[INFO] {restored} stored decision(s) reused, {new_rows} new item(s) stored")
+
+    handled = get_handled_urls(day) if incremental else set()
+    pending = [it for it in items if it.url not in handled]
+    if incremental:
+        print(f"[INFO] incremental: {len(pending)} new/retry, {len(items) - len(pending)} already handled")
 
     # Print parsed items so they are visible in terminal output
-    for it in items:
-        print(f"- {it.title}")
+    for it in pending:
+        print(f"- {it.title}" + (f" [{it.edition}]" if it.edition else ""))
         print(f"  {it.url}")
         if it.section:
             print(f"  section: {it.section}")
         if it.subsection:
             print(f"  subsection: {it.subsection}")
 
-    ollama = OllamaClient(settings.ollama_base_url, settings.ollama_model)
-
-    hits_by_dept = defaultdict(list)  # dept -> list[(item, md)]
-    text_cache = {}
-    llm_cache = {}
-
-    for item in items:
-        # 1) Candidate gate
-        if is_ilan_url(item.url):
-            continue
-
-        if is_excluded_section(item):
-            continue
-
-        haystack = build_haystack(item)
-        _, _, hard_excluded = apply_negative_rules(haystack, NEGATIVE_RULES)
-        override = has_factory_override(haystack)
-        if hard_excluded and not override:
-            continue
-
-        # 2) Text cache
-        text = text_cache.get(item.url)
-        if text is None:
-            text = fetch_detail_text(session, item.url)
-            text_cache[item.url] = text
-        text = (text or "").strip()
-
-        # If no detail text (e.g., PDF), allow proceeding when title/haystack looks financial
-        if not text and not contains_financial_keywords(haystack):
-            continue
-
-        # 3) LLM cache (multi-label)
-        md = llm_cache.get(item.url)
-        if md is None:
-            md = ollama.classify_multi(title=item.title, url=item.url, text=text[:2500])
-            llm_cache[item.url] = md
-
-        # 4) Confidence gate
-        # Confidence gate: lower threshold for financial-like titles
-        haystack = build_haystack(item)
-        is_financial = contains_financial_keywords(haystack)
-        threshold = 20 if is_financial else 40
-        if md.confidence < threshold:
-            continue
-
-        if md.isg:
-            hits_by_dept["isg"].append((item, md))
-        if md.ik:
-            hits_by_dept["ik"].append((item, md))
-        # Pre-mark muhasebe if title contains financial keywords even if LLM didn't
-        if md.muhasebe:
-            hits_by_dept["muhasebe"].append((item, md))
-        elif is_financial:
-            hits_by_dept["muhasebe"].append((item, md))
-        if md.lojistik:
-            hits_by_dept["lojistik"].append((item, md))
-        if md.it_siber:
-            hits_by_dept["it_siber"].append((item, md))
-        if md.kvkk:
-            hits_by_dept["kvkk"].append((item, md))
-
-    # --- Persist items + department flags to SQLite ---
-    dept_map: dict[str, set[str]] = {}
-    for dept_name, dept_hits in hits_by_dept.items():
-        for hit_item, _ in dept_hits:
-            dept_map.setdefault(hit_item.url, set()).add(dept_name)
+    # Item results (stage, decision, department flags) are written in small
+    # batches while processing; a crash or cancellation keeps what was done.
+    writer = engine.outcome_writer(day)
+    early = engine.early_dispatcher(day) if notify else None
+
+    def on_outcome(outcome: ItemOutcome) -> None:
+        writer.add(outcome)
+        if early is not None:
+            early.add(outcome)
+
+    def checked_progress(done: int, total: int) -> None:
+        # Stop before persist/notify if our lease lapsed and another worker may own the day.
+        if run_lease is not None:
+            run_lease.check()
+        if progress is not None:
+            progress(done, total)
 
     try:
-        save_items(day, items, dept_map=dept_map)
-        save_run_log(day, len(items))
-    except Exception:
-        print("[WARN] Failed to save items to database")
-
-    recipients_map = {
-        "isg": [v.strip() for v in settings.isg_recipients.split(",") if v and v.strip()],
-        "ik": [v.strip() for v in settings.ik_recipients.split(",") if v and v.strip()],
-        "muhasebe": [v.strip() for v in settings.muhasebe_recipients.split(",") if v and v.strip()],
-        "lojistik": [v.strip() for v in settings.lojistik_recipients.split(",") if v and v.strip()],
-        "it_siber": [v.strip() for v in settings.it_siber_recipients.split(",") if v and v.strip()],
-        "kvkk": [v.strip() for v in settings.kvkk_recipients.split(",") if v and v.strip()],
-    }
-    dept_order = ("isg", "ik", "muhasebe", "lojistik", "it_siber", "kvkk")
-    department_results: list[DepartmentMailResult] = []
+        result = engine.process_items(
+            page, pending, progress=checked_progress, on_outcome=on_outcome, budget=budget
+        )
+    finally:
+        writer.flush()
+    hits_by_dept = result.hits_by_dept
 
-    for dept in dept_order:
-        hits = hits_by_dept.get(dept, [])
-        if not hits:
-            department_results.append(
-                DepartmentMailResult(
-                    department=dept,
-                    hit_count=0,
-                    recipients=(),
-                    subject="",
-                    status="skipped_no_hits",
-                )
-            )
-            continue
-
-        hit_items = [item for item, _ in hits]
-        sample_titles = tuple(item.title for item in hit_items[:5])
-        subject = build_generic_email_subject(dept, day, len(hit_items))
-        recipients = recipients_map.get(dept, [])
-        if not recipients:
-            print(f"[WARN] {dept.upper()}: no recipients configured")
-            department_results.append(
-                DepartmentMailResult(
-                    department=dept,
-                    hit_count=len(hit_items),
-                    recipients=(),
-                    subject=subject,
-                    status="skipped_no_recipients",
-                    sample_titles=sample_titles,
-                    error="No recipients configured",
-                )
-            )
-            continue
-
-        html_body = build_generic_email_html(dept, day, hit_items)
+    run_id = engine.persist(day, items_found=len(items))
+
+    department_results = engine.notify(day, hits_by_dept, early=early) if notify else ()
 
+    failed_departments = [r.department for r in department_results if r.status == "failed"]
+    mailed_departments = [r.department for r in department_results]
+    item_states = {
+        outcome.item.url: item_state(outcome, failed_departments, mailed_departments) for outcome in result.outcomes
+    }
+
+    engine.timer.record("run", perf_counter() - started)
+    stage_timings = engine.timer.summary()
+    if run_id is not None:
         try:
-            send_html_email(
-                smtp_host=settings.smtp_host,
-                smtp_port=settings.smtp_port,
-                smtp_user=settings.smtp_user,
-                smtp_password=settings.smtp_password,
-                smtp_secure=settings.smtp_secure,
-                smtp_auth=settings.smtp_auth,
-                smtp_tls_reject_unauthorized=settings.smtp_tls_reject_unauthorized,
-                smtp_enabled=settings.smtp_enabled,
-                mail_from=settings.mail_from,
-                recipients=recipients,
-                subject=subject,
-                html_body=html_body,
-            )
-            print(f"[INFO] {dept.upper()}: email sent to {', '.join(recipients)}")
-            department_results.append(
-                DepartmentMailResult(
-                    department=dept,
-                    hit_count=len(hit_items),
-                    recipients=tuple(recipients),
-                    subject=subject,
-                    status="sent",
-                    sample_titles=sample_titles,
-                )
-            )
-        except Exception as exc:  # pragma: no cover - network dependent
-            print(f"[ERROR] {dept.upper()}: email failed -> {exc}")
-            department_results.append(
-                DepartmentMailResult(
-                    department=dept,
-                    hit_count=len(hit_items),
-                    recipients=tuple(recipients),
-                    subject=subject,
-                    status="failed",
-                    sample_titles=sample_titles,
-                    error=str(exc),
-                )
-            )
-
-    # 5) Print results
-    for dept in dept_order:
+            save_stage_timings(run_id, stage_timings)
+        except Exception:
+            print("[WARN] Failed to save stage timings to database")
+
+    # Print results
+    for dept in DEPT_ORDER:
         hits = hits_by_dept.get(dept, [])
         print(f"\n=== Department: {dept} | hits: {len(hits)} ===")
-        for item, md in hits[:10]:
-            print(f"- ({md.confidence}) {item.title}")
-            print(f"  {item.url}")
-            if md.evidence:
-                print(f"  evidence: {md.evidence}")
+        for hit in hits[:10]:
+            print(f"- ({hit.llm.confidence}) {hit.item.title}")
+            print(f"  {hit.item.url}")
+            if hit.llm.evidence:
+                print(f"  evidence: {hit.llm.evidence}")
 
-    return RunReport(
+    report = RunReport(
         day=day,
         total_items=len(items),
-        hit_counts={dept: len(hits_by_dept.get(dept, [])) for dept in dept_order},
-        department_results=tuple(department_results),
+        hit_counts={dept: len(hits_by_dept.get(dept, [])) for dept in DEPT_ORDER},
+        department_results=department_results,
+        new_items=len(pending),
+        skipped_items=len(items) - len(pending),
+        stage_timings=stage_timings,
+        retry_items=sum(1 for status in item_states.values() if status not in DONE_STATES),
+        deferred_items=sum(1 for o in result.outcomes if o.status == "deferred"),
+        degraded_items=sum(1 for o in result.outcomes if o.degraded),
+    )
+    if report.deferred_items or report.degraded_items:
+        print(
+            f"[BUDGET] {report.degraded_items} item(s) degraded, {report.deferred_items} deferred "
+            f"to the next run ({budget.seconds:.0f}s budget)"
+        )
+    for t in stage_timings:
+        hit_rate = f" cache {t.cache_hit_rate:.0%}" if t.cache_hit_rate is not None else ""
+        print(f"[TIMING] {t.stage}: {t.total_s:.2f}s n={t.count} p50={t.p50_s:.2f}s p95={t.p95_s:.2f}s{hit_rate}")
+    print(
+        f"\n[INFO] outbox: queued {report.mail_queued}, sent {report.mail_sent}, "
+        f"deduplicated {report.mail_deduplicated}"
     )
+    return report
 
 
 def default_policies() -> List[DepartmentPolicy]:
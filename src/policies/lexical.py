@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Pattern, Tuple
+
+from src.policies import ik, isg, it_siber, kvkk, lojistik, muhasebe
+
+HIGH_WEIGHT = 10
+MID_WEIGHT = 3
+
+DEFAULT_CHUNK_SIZE = 8192
+# Must stay longer than the longest phrase a signal regex can match.
+DEFAULT_OVERLAP = 256
+
+
+@dataclass(frozen=True)
+class KeywordRule:
+    pattern: Pattern[str]
+    weight: int
+    label: str
+
+
+@dataclass(frozen=True)
+class LexicalScore:
+    department: str
+    score: int
+    reasons: Tuple[str, ...] = ()
+
+
+def compile_keyword_rules(high: Iterable[str], mid: Iterable[str]) -> List[KeywordRule]:
+    """
+    Compile a policy's HIGH_SIGNAL / MID_SIGNAL lists once, with the same
+    weights and reason labels the title scorers use.
+    """
+    compiled: List[KeywordRule] = []
+    for rx in high:
+        compiled.append(KeywordRule(re.compile(rx, flags=re.IGNORECASE), HIGH_WEIGHT, f"high:{rx}"))
+    for rx in mid:
+        compiled.append(KeywordRule(re.compile(rx, flags=re.IGNORECASE), MID_WEIGHT, f"mid:{rx}"))
+    return compiled
+
+
+DEPARTMENT_RULES: Dict[str, List[KeywordRule]] = {
+    "isg": compile_keyword_rules(isg.HIGH_SIGNAL, isg.MID_SIGNAL),
+    "ik": compile_keyword_rules(ik.HIGH_SIGNAL, ik.MID_SIGNAL),
+    "muhasebe": compile_keyword_rules(muhasebe.HIGH_SIGNAL, muhasebe.MID_SIGNAL),
+    "lojistik": compile_keyword_rules(lojistik.HIGH_SIGNAL, lojistik.MID_SIGNAL),
+    "it_siber": compile_keyword_rules(it_siber.HIGH_SIGNAL, it_siber.MID_SIGNAL),
+    "kvkk": compile_keyword_rules(kvkk.HIGH_SIGNAL, kvkk.MID_SIGNAL),
+}
+
+
+class LexicalScorer:
+    """
+    Streaming keyword scorer over the full detail text.
+
+    Chunks are fed one by one; only ``overlap`` characters of the previous
+    chunk are kept so that a phrase split across a chunk boundary is still
+    found. Like the title scorers, each rule counts at most once, so a rule
+    is dropped from the search as soon as it matches.
+    """
+
+    def __init__(
+        self,
+        rules: Optional[Mapping[str, List[KeywordRule]]] = None,
+        overlap: int = DEFAULT_OVERLAP,
+    ) -> None:
+        rules = DEPARTMENT_RULES if rules is None else rules
+        self.overlap = overlap
+        self._pending: Dict[str, List[KeywordRule]] = {dept: list(r) for dept, r in rules.items()}
+        self._matched: Dict[str, List[KeywordRule]] = {dept: [] for dept in rules}
+        self._tail = ""
+        self.chars_seen = 0
+
+    @property
+    def exhausted(self) -> bool:
+        return not any(self._pending.values())
+
+    def feed(self, chunk: str) -> None:
+        if not chunk:
+            return
+        self.chars_seen += len(chunk)
+        if self.exhausted:
+            return
+
+        window = self._tail + chunk
+        for dept, pending in self._pending.items():
+            if not pending:
+                continue
+            remaining: List[KeywordRule] = []
+            for rule in pending:
+                if rule.pattern.search(window):
+                    self._matched[dept].append(rule)
+                else:
+                    remaining.append(rule)
+            self._pending[dept] = remaining
+
+        self._tail = _tail_on_word_boundary(window, self.overlap)
+
+    def scores(self) -> Dict[str, LexicalScore]:
+        return {
+            dept: LexicalScore(
+                department=dept,
+                score=sum(rule.weight for rule in matched),
+                reasons=tuple(rule.label for rule in matched),
+            )
+            for dept, matched in self._matched.items()
+        }
+
+
+def iter_text_chunks(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    for start in range(0, len(text or ""), chunk_size):
+        yield text[start : start + chunk_size]
+
+
+def score_chunks(
+    chunks: Iterable[str],
+    rules: Optional[Mapping[str, List[KeywordRule]]] = None,
+    overlap: int = DEFAULT_OVERLAP,
+) -> Dict[str, LexicalScore]:
+    scorer = LexicalScorer(rules=rules, overlap=overlap)
+    for chunk in chunks:
+        scorer.feed(chunk)
+        if scorer.exhausted:
+            break
+    return scorer.scores()
+
+
+def score_text(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, LexicalScore]:
+    return score_chunks(iter_text_chunks(text, chunk_size))
+
+
+def top_score(scores: Mapping[str, LexicalScore]) -> int:
+    return max((s.score for s in scores.values()), default=0)
+
+
+def _tail_on_word_boundary(window: str, overlap: int) -> str:
+    # Start the carried tail on a whitespace boundary so a word cut in half
+    # cannot satisfy a leading ``\b`` on the next search.
+    if overlap <= 0 or len(window) <= overlap:
+        return window if overlap > 0 else ""
+    tail = window[-overlap:]
+    cut = re.search(r"\s", tail)
+    return tail[cut.end() :] if cut else ""
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Callable, List, Optional, Sequence
+
+from src.app.config import Settings, get_settings
+from src.core.ratelimit import RateLimiter
+from src.db.storage import finish_backfill_day, get_backfill_checkpoints, start_backfill_day
+from src.pipeline.engine import REQUEST_DELAY_SECONDS, PipelineCaches, PipelineEngine
+from src.pipeline.lease import LeaseHeld
+from src.pipeline.run_daily import default_policies, run
+from src.policies.base import DepartmentPolicy
+
+DEFAULT_WORKERS = 3
+
+
+@dataclass(frozen=True)
+class BackfillDay:
+    day: date
+    status: str  # done | failed | busy
+    items: int = 0
+    hits: int = 0
+    duration_s: float = 0.0
+    error: str = ""
+
+
+@dataclass(frozen=True)
+class BackfillReport:
+    days_total: int
+    days_skipped: int
+    results: tuple[BackfillDay, ...]
+    elapsed_s: float
+
+    @property
+    def days_done(self) -> int:
+        return sum(1 for r in self.results if r.status == "done")
+
+    @property
+    def days_failed(self) -> int:
+        return sum(1 for r in self.results if r.status == "failed")
+
+    @property
+    def days_busy(self) -> int:
+        return sum(1 for r in self.results if r.status == "busy")
+
+    @property
+    def items(self) -> int:
+        return sum(r.items for r in self.results)
+
+    @property
+    def days_per_hour(self) -> float:
+        return len(self.results) / self.elapsed_s * 3600 if self.elapsed_s > 0 else 0.0
+
+    @property
+    def items_per_minute(self) -> float:
+        return self.items / self.elapsed_s * 60 if self.elapsed_s > 0 else 0.0
+
+
+def date_range(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=n) for n in range((end - start).days + 1)]
+
+
+def backfill(
+    start: date,
+    end: date,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    notify: bool = False,
+    force: bool = False,
+    policies: Optional[Sequence[DepartmentPolicy]] = None,
+    settings: Optional[Settings] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    engine_factory: Optional[Callable[[], PipelineEngine]] = None,
+) -> BackfillReport:
+    """
+    Run the pipeline for every day in ``[start, end]``, ``workers`` days at a time.
+
+    All engines share one rate limiter, so parallel days never exceed the
+    request rate of a single run. Days with a ``done`` checkpoint are skipped
+    unless ``force`` is set; interrupted or failed days are retried. Days another
+    worker holds the run lease for are reported as ``busy`` and left for a later run.
+    """
+    if end < start:
+        raise ValueError("--to must not be before --from")
+
+    days = date_range(start, end)
+    checkpoints = get_backfill_checkpoints(start, end)
+    pending = [d for d in days if force or checkpoints.get(d.isoformat(), {}).get("status") != "done"]
+    skipped = len(days) - len(pending)
+    print(f"[BACKFILL] {start} .. {end}: {len(pending)} day(s) to run, {skipped} already done, {workers} worker(s)")
+
+    policies = list(policies or default_policies())
+    if engine_factory is None:
+        settings = settings or get_settings()
+        rate_limiter = rate_limiter or RateLimiter(REQUEST_DELAY_SECONDS)
+
+        def engine_factory() -> PipelineEngine:
+            return PipelineEngine(policies, settings=settings, rate_limiter=rate_limiter)
+
+    # Engines (HTTP session, caches, timer) are not shared between threads.
+    # Their caches only help within a day, so they are emptied after each one;
+    # otherwise a long backfill keeps every text it ever fetched in memory.
+    local = threading.local()
+
+    def run_day(day: date) -> BackfillDay:
+        if not hasattr(local, "engine"):
+            local.engine = engine_factory()
+        start_backfill_day(day)
+        started = perf_counter()
+        try:
+            report = run(day=day, policies=policies, engine=local.engine, notify=notify)
+        except LeaseHeld as exc:
+            # Another worker (the hourly one, another backfill) owns the day: move on.
+            result = BackfillDay(day, "busy", error=str(exc))
+        except Exception as exc:
+            result = BackfillDay(day, "failed", duration_s=perf_counter() - started, error=str(exc))
+        else:
+            # Items deferred by the run budget keep the day open for the next backfill.
+            deferred = f"{report.deferred_items} item(s) deferred by the run budget" if report.deferred_items else ""
+            result = BackfillDay(
+                day,
+                "failed" if deferred else "done",
+                items=report.total_items,
+                hits=sum(report.hit_counts.values()),
+                duration_s=perf_counter() - started,
+                error=deferred,
+            )
+        finally:
+            local.engine.caches = PipelineCaches()
+        finish_backfill_day(day, result.status, result.items, result.hits, result.duration_s, result.error)
+        return result
+
+    results: List[BackfillDay] = []
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as pool:
+        futures = [pool.submit(run_day, day) for day in pending]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            progress = BackfillReport(len(days), skipped, tuple(results), perf_counter() - started)
+            remaining = len(pending) - len(results)
+            eta_h = remaining / progress.days_per_hour if progress.days_per_hour else 0.0
+            print(
+                f"[BACKFILL] {result.day} {result.status} ({result.items} items, {result.duration_s:.1f}s"
+                f"{', ' + result.error if result.error else ''}) | {len(results)}/{len(pending)} days, "
+                f"{progress.days_per_hour:.1f} days/h, {progress.items_per_minute:.1f} items/min, "
+                f"ETA {eta_h:.2f}h"
+            )
+
+    results.sort(key=lambda r: r.day)
+    return BackfillReport(len(days), skipped, tuple(results), perf_counter() - started)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Run the pipeline for a range of past days")
+    p.add_argument("--from", dest="start", required=True, help="First day, YYYY-MM-DD")
+    p.add_argument("--to", dest="end", required=True, help="Last day (inclusive), YYYY-MM-DD")
+    p.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Days processed in parallel")
+    p.add_argument("--notify", action="store_true", help="Queue department mails for hits (default: off)")
+    p.add_argument("--force", action="store_true", help="Re-run days already checkpointed as done")
+    args = p.parse_args()
+
+    report = backfill(
+        date.fromisoformat(args.start),
+        date.fromisoformat(args.end),
+        workers=args.workers,
+        notify=args.notify,
+        force=args.force,
+    )
+    print(
+        f"\n[BACKFILL] finished: {report.days_done} done, {report.days_failed} failed, {report.days_busy} busy, "
+        f"{report.days_skipped} skipped of {report.days_total} day(s); {report.items} items in "
+        f"{report.elapsed_s / 60:.1f} min ({report.days_per_hour:.1f} days/h, "
+        f"{report.items_per_minute:.1f} items/min)"
+    )
+    for result in report.results:
+        if result.status == "failed":
+            print(f"  - {result.day}: {result.error}")
+    raise SystemExit(1 if report.days_failed else 0)
+
+
+if __name__ == '__main__':
+    main()
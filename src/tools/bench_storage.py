@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, List, Tuple
+
+from src.core.models import GazetteItem
+from src.db import storage
+
+DEFAULT_SIZES = "10000,100000,1000000"
+ITEMS_PER_DAY = 60  # about one gazette day
+
+
+def synthetic_rows(n: int, departments: Tuple[str, ...] = ()) -> Iterator[Tuple[date, GazetteItem, Tuple[str, ...]]]:
+    """``n`` items spread over consecutive days, like a multi-year backfill."""
+    first = date(2000, 1, 1)
+    for k in range(n):
+        day = first + timedelta(days=k // ITEMS_PER_DAY)
+        url = f"https://www.resmigazete.gov.tr/eskiler/{day:%Y/%m/%Y%m%d}-{k % ITEMS_PER_DAY}.htm"
+        item = GazetteItem(title=f"Yönetmelik {k}", url=url, section="YÜRÜTME VE İDARE BÖLÜMÜ")
+        yield day, item, departments
+
+
+def legacy_loop(n: int) -> None:
+    """The previous ``save_items`` write path: one ``execute`` per item, for comparison."""
+    with storage._db() as conn:
+        for day, it, departments in synthetic_rows(n):
+            depts = set(departments)
+            conn.execute(
+                f"""
+                INSERT INTO items
+                    (run_date, title, url, section, subsection, is_pdf,
+                     {", ".join(f"dept_{d}" for d in storage.DEPARTMENT_COLUMNS)}, inserted_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(run_date, url) DO UPDATE SET
+                    {", ".join(f"dept_{d} = excluded.dept_{d}" for d in storage.DEPARTMENT_COLUMNS)},
+                    inserted_at = excluded.inserted_at
+                """,
+                (
+                    day.isoformat(),
+                    it.title,
+                    it.url,
+                    it.section or "",
+                    it.subsection or "",
+                    1 if it.url.lower().endswith(".pdf") else 0,
+                    *(1 if d in depts else 0 for d in storage.DEPARTMENT_COLUMNS),
+                    "",
+                ),
+            )
+
+
+def bench(n: int, legacy: bool) -> List[str]:
+    lines: List[str] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.DB_DIR = Path(tmp)
+        storage.DB_PATH = Path(tmp) / "items.db"
+        storage.init_db()
+
+        started = perf_counter()
+        inserted, _ = storage.upsert_items(synthetic_rows(n))
+        lines.append(_line(n, "bulk insert", perf_counter() - started, f"{inserted} inserted"))
+
+        started = perf_counter()
+        _, updated = storage.upsert_items(synthetic_rows(n, departments=("isg",)))
+        lines.append(_line(n, "bulk update", perf_counter() - started, f"{updated} updated"))
+
+        if legacy:
+            storage.close_connections()
+            storage.DB_PATH = Path(tmp) / "legacy.db"
+            storage.init_db()
+            started = perf_counter()
+            legacy_loop(n)
+            lines.append(_line(n, "per-row loop", perf_counter() - started, ""))
+        storage.close_connections()
+    return lines
+
+
+def _line(n: int, label: str, elapsed_s: float, note: str) -> str:
+    rate = n / elapsed_s if elapsed_s > 0 else 0.0
+    return f"{n:>9} rows  {label:<12} {elapsed_s:8.2f}s  {rate:>10.0f} rows/s  {note}"
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark bulk item writes against a temporary database")
+    p.add_argument("--rows", default=DEFAULT_SIZES, help=f"Comma-separated row counts (default {DEFAULT_SIZES})")
+    p.add_argument("--legacy", action="store_true", help="Also time the old one-execute-per-item loop")
+    args = p.parse_args()
+
+    for n in (int(v) for v in args.rows.split(",") if v.strip()):
+        for line in bench(n, args.legacy):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,15 @@ from __future__ import annotations
 import argparse
 from datetime import date
 
-from src.app.config import get_settings
-from src.core.http import build_session
-from src.gazette.client import daily_index_url, fetch_daily_html
-from src.gazette.detail_text import fetch_detail_text
-from src.gazette.parser import parse_daily_items
-from src.pipeline.run_daily import decide_candidate
+from src.core.models import GazetteItem
+from src.db.storage import get_artifacts, get_day_items
+from src.pipeline.engine import DEPT_ORDER, LLM_TEXT_CHARS, PipelineEngine
+from src.policies.lexical import score_text
+from src.pipeline.run_daily import default_policies
 from src.policies.negative_filter import apply_negative_rules
 from src.policies.common_negative_rules import NEGATIVE_RULES
 from src.policies.factory_signals import has_factory_override
 from src.policies.utils import build_haystack
-from src.llm.ollama_client import OllamaClient
 
 
 def find_item(items, match):
@@ -23,10 +21,74 @@ def find_item(items, match):
     return None
 
 
+def find_stored_item(day, match):
+    for row in get_day_items(day):
+        if match in row["url"] or match in row["title"]:
+            return row
+    return None
+
+
+def diagnose_stored(day, match, reclassify):
+    """Audit a stored item from its compressed artifact; nothing is downloaded."""
+    row = find_stored_item(day, match)
+    if not row:
+        print("No stored item matched the given substring.")
+        return
+    artifact = get_artifacts([row["url"]]).get(row["url"])
+    if artifact is None:
+        print(f"Item found but no stored text/decision: {row['url']}")
+        return
+
+    print("STORED ITEM:")
+    print(f"title: {row['title']}")
+    print(f"url: {row['url']}")
+    print(f"stage: {row['stage']}")
+    print(f"departments: {row['departments']}")
+    print(f"stored: {artifact.stored_bytes} bytes for {artifact.text_chars} chars ({artifact.updated_at})")
+
+    decision = artifact.decision
+    print("\nSTORED LLM DECISION:")
+    for key, value in decision.items():
+        print(f"{key}:", value)
+
+    text = artifact.text
+    print(f"\nDETAIL_TEXT_LEN: {len(text)}")
+    print('TEXT_HEAD:', text[:500].replace('\n', ' '))
+    for dept, score in score_text(text).items():
+        print(f'LEXICAL[{dept}]:', score.score, list(score.reasons))
+
+    if not reclassify:
+        return
+    engine = PipelineEngine(default_policies())
+    it = GazetteItem(
+        title=row["title"],
+        url=row["url"],
+        section=row["section"],
+        subsection=row["subsection"],
+        edition=row["edition"],
+    )
+    # Seeding the text cache keeps fetch_text offline; the LLM is called again.
+    engine.caches.text[it.url] = text
+    detail = engine.fetch_text(it)
+    try:
+        md = engine.classify(it, detail, remember=False)
+    except Exception as exc:
+        print('\nLLM classify failed:', exc)
+        return
+    print('\nLLM RECLASSIFY:')
+    print('raw:', md.raw)
+    print('confidence:', md.confidence, 'was', decision.get("confidence"))
+    print('evidence:', md.evidence)
+    print('routed:', [hit.department for hit in engine.route(it, md, detail)], 'was', row["departments"])
+    print('changed flags:', [d for d in DEPT_ORDER if d in decision and getattr(md, d) != decision[d]])
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("--date", required=False, help="YYYY-MM-DD (default: today)")
     p.add_argument("--match", required=True, help="Substring to match in title or url")
+    p.add_argument("--stored", action="store_true", help="Use the stored text/decision instead of fetching")
+    p.add_argument("--reclassify", action="store_true", help="With --stored: run the LLM again on the stored text")
     args = p.parse_args()
 
     if args.date:
@@ -34,11 +96,12 @@ def main():
     else:
         day = date.today()
 
-    settings = get_settings()
-    session = build_session()
+    if args.stored:
+        diagnose_stored(day, args.match, args.reclassify)
+        return
 
-    html = fetch_daily_html(session=session, day=day)
-    items = parse_daily_items(html=html, base_url=daily_index_url(day))
+    engine = PipelineEngine(default_policies())
+    _, items = engine.collect_items(day)
 
     it = find_item(items, args.match)
     if not it:
@@ -50,9 +113,10 @@ def main():
     print(f"url: {it.url}")
     print(f"section: {it.section}")
     print(f"subsection: {it.subsection}")
+    print(f"edition: {it.edition or 'asil'}")
 
     # Candidate decision
-    cand = decide_candidate(it)
+    cand = engine.gate(it)
     print("\nCANDIDATE_DECISION:")
     print(cand)
 
@@ -69,24 +133,24 @@ def main():
     print('override_factory=', override)
 
     # Fetch detail text
-    try:
-        text = fetch_detail_text(session, it.url) or ""
-    except Exception as exc:
-        print('\nFailed to fetch detail text:', exc)
-        text = ""
+    detail = engine.fetch_text(it)
+    text = detail.text
 
     print(f"\nDETAIL_TEXT_LEN: {len(text)}")
     print('TEXT_HEAD:', text[:500].replace('\n', ' '))
+    for dept, score in detail.lexical.items():
+        print(f'LEXICAL[{dept}]:', score.score, list(score.reasons))
 
     # Call LLM classify_multi
     try:
-        ollama = OllamaClient(settings.ollama_base_url, settings.ollama_model)
-        md = ollama.classify_multi(title=it.title, url=it.url, text=text[:2500])
+        md = engine.classify(it, detail)
         print('\nLLM MULTI DECISION:')
         print('raw:', md.raw)
         print('isg:', md.isg, 'ik:', md.ik, 'muhasebe:', md.muhasebe, 'lojistik:', md.lojistik)
         print('confidence:', md.confidence)
         print('evidence:', md.evidence)
+        print(f'text_chars_sent: {min(len(text), LLM_TEXT_CHARS)}')
+        print('routed:', [hit.department for hit in engine.route(it, md, detail)])
     except Exception as exc:
         print('\nLLM classify failed:', exc)
 
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date
+from pathlib import Path
+
+from src.db.history_export import EXPORT_DIR, export_history
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Export items, department hits and run metrics as partitioned Parquet")
+    p.add_argument("--out", default=str(EXPORT_DIR), help=f"Export directory (default {EXPORT_DIR})")
+    p.add_argument("--through", help="Last day to export, YYYY-MM-DD (default: yesterday)")
+    p.add_argument("--since", help="Re-export from this day on, YYYY-MM-DD (replaces the parts holding it)")
+    args = p.parse_args()
+
+    result = export_history(
+        root=Path(args.out),
+        through=date.fromisoformat(args.through) if args.through else None,
+        since=date.fromisoformat(args.since) if args.since else None,
+    )
+    if result.first_day is None:
+        print("[EXPORT] nothing new to export")
+        return
+    rows = ", ".join(f"{table} {n}" for table, n in result.rows.items())
+    print(f"[EXPORT] {result.first_day} .. {result.last_day}: {result.files} file(s), rows: {rows} -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import argparse
+
+from src.app.config import get_settings
+from src.daemon.maintenance import run_maintenance
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Archive old items, compact items.db and rotate the mail log")
+    p.add_argument("--force", action="store_true", help="Run every enabled task now, ignoring their intervals")
+    p.add_argument(
+        "--full-vacuum",
+        action="store_true",
+        help="Compact with one full VACUUM (locks the database throughout; stop the worker first)",
+    )
+    args = p.parse_args()
+
+    run_maintenance(get_settings(), force=args.force, full_vacuum=args.full_vacuum)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+from datetime import date
+
+from src.core.ratelimit import RateLimiter
+from src.llm.ollama_client import MultiDeptDecision
+from src.pipeline.engine import PipelineCaches, PipelineEngine
+from src.pipeline.run_daily import default_policies
+
+from tests.test_pipeline_engine import _StubOllama, _settings
+
+_HTML = (
+    '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+    '<div class="fihrist-item"><a href="/a">İş Sağlığı Yönetmeliği</a></div></div>'
+)
+
+
+def test_backfill_checkpoints_days_and_resumes_only_unfinished_ones(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.tools import backfill as backfill_mod
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+    indexes = {"https://www.resmigazete.gov.tr/05.03.2026": _HTML}
+    built: list[PipelineEngine] = []
+
+    def factory() -> PipelineEngine:
+        # The 06.03 index is missing from the cache, so fetching it fails.
+        engine = PipelineEngine(
+            default_policies(),
+            settings=_settings(),
+            session=object(),  # type: ignore[arg-type]
+            ollama=_StubOllama(md),  # type: ignore[arg-type]
+            caches=PipelineCaches(index=dict(indexes), text={"https://www.resmigazete.gov.tr/a": "metin"}),
+            rate_limiter=RateLimiter(0),
+        )
+        built.append(engine)
+        return engine
+
+    first = backfill_mod.backfill(date(2026, 3, 5), date(2026, 3, 6), workers=2, engine_factory=factory)
+
+    assert (first.days_done, first.days_failed, first.items) == (1, 1, 1)
+    checkpoints = storage.get_backfill_checkpoints(date(2026, 3, 5), date(2026, 3, 6))
+    assert checkpoints["2026-03-05"]["status"] == "done"
+    assert checkpoints["2026-03-05"]["hits"] == 1
+    assert checkpoints["2026-03-06"]["status"] == "failed"
+
+    indexes["https://www.resmigazete.gov.tr/06.03.2026"] = _HTML
+    second = backfill_mod.backfill(date(2026, 3, 5), date(2026, 3, 6), workers=2, engine_factory=factory)
+
+    assert second.days_skipped == 1
+    assert [r.day for r in second.results] == [date(2026, 3, 6)]
+    assert second.days_done == 1
+
+
+def test_backfill_empties_engine_caches_between_days(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.pipeline.run_daily import RunReport
+    from src.tools import backfill as backfill_mod
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    cached_at_start: list[int] = []
+
+    def fake_run(*, day, engine, **kwargs) -> RunReport:
+        caches = engine.caches
+        cached_at_start.append(len(caches.index) + len(caches.text) + len(caches.lexical) + len(caches.llm))
+        caches.index[f"index-{day}"] = "<html/>"
+        caches.text[f"text-{day}"] = "metin"
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(backfill_mod, "run", fake_run)
+    engines: list[PipelineEngine] = []
+
+    def factory() -> PipelineEngine:
+        engines.append(PipelineEngine(default_policies(), settings=_settings(), session=object()))  # type: ignore[arg-type]
+        return engines[-1]
+
+    report = backfill_mod.backfill(date(2026, 3, 2), date(2026, 3, 4), workers=1, engine_factory=factory)
+
+    assert report.days_failed == 3
+    assert len(engines) == 1
+    assert cached_at_start == [0, 0, 0]
+    assert engines[0].caches == PipelineCaches()
+
+
+def test_backfill_leaves_days_with_deferred_items_open(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.pipeline.run_daily import RunReport
+    from src.tools import backfill as backfill_mod
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    deferred = {date(2026, 3, 2): 2, date(2026, 3, 3): 0}
+
+    def fake_run(*, day, **kwargs) -> RunReport:
+        return RunReport(day, 3, {"ISG": 1}, (), deferred_items=deferred[day])
+
+    monkeypatch.setattr(backfill_mod, "run", fake_run)
+
+    def factory() -> PipelineEngine:
+        return PipelineEngine(default_policies(), settings=_settings(), session=object())  # type: ignore[arg-type]
+
+    first = backfill_mod.backfill(date(2026, 3, 2), date(2026, 3, 3), workers=1, engine_factory=factory)
+
+    assert (first.days_done, first.days_failed) == (1, 1)
+    checkpoints = storage.get_backfill_checkpoints(date(2026, 3, 2), date(2026, 3, 3))
+    assert checkpoints["2026-03-02"]["status"] == "failed"
+    assert "2 item(s) deferred" in checkpoints["2026-03-02"]["error"]
+    assert checkpoints["2026-03-03"]["status"] == "done"
+
+    deferred[date(2026, 3, 2)] = 0
+    second = backfill_mod.backfill(date(2026, 3, 2), date(2026, 3, 3), workers=1, engine_factory=factory)
+
+    assert second.days_skipped == 1
+    assert [(r.day, r.status) for r in second.results] == [(date(2026, 3, 2), "done")]
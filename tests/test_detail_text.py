@@ -0,0 +1,39 @@
+from src.gazette import detail_text
+
+_REAL = "İş sağlığı ve güvenliği kurulları bu yönetmelik ile yeniden düzenlenmiştir ve işverenler kurul kurar. " * 2
+
+
+class _FitzPage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def get_text(self, kind: str) -> str:
+        return self.text
+
+
+class _PypdfPage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+    def extract_text(self) -> str:
+        return self.text
+
+
+def test_pdf_pages_with_a_poor_text_layer_fall_back_to_pypdf_without_ocr(monkeypatch) -> None:
+    fitz_pages = [_FitzPage(_REAL), _FitzPage("~~ 12 ~~"), _FitzPage("")]
+    pypdf_pages = [_PypdfPage("unused"), _PypdfPage(_REAL + "2"), _PypdfPage("")]
+
+    class _Fitz:
+        @staticmethod
+        def open(stream: bytes, filetype: str) -> list:
+            return fitz_pages
+
+    class _Reader:
+        def __init__(self, stream) -> None:
+            self.pages = pypdf_pages
+
+    monkeypatch.setattr(detail_text, "fitz", _Fitz)
+    monkeypatch.setattr(detail_text, "PdfReader", _Reader)
+    monkeypatch.setattr(detail_text, "pytesseract", None)
+
+    assert list(detail_text._iter_pdf_pages(b"%PDF", ocr=True)) == [_REAL.strip(), (_REAL + "2").strip()]
@@ -0,0 +1,50 @@
+from datetime import date
+
+import pytest
+
+from src.core.models import GazetteItem
+
+pytest.importorskip("pyarrow")
+
+
+def _use_tmp_db(tmp_path, monkeypatch):
+    from src.db import storage
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    return storage
+
+
+def _save_day(storage, day: date, n: int) -> None:
+    items = [GazetteItem(title=f"{day} madde {k}", url=f"https://example.com/{day}/{k}") for k in range(n)]
+    storage.save_items(day, items, {items[0].url: {"isg", "ik"}})
+    storage.save_run_log(day, n)
+
+
+def test_export_appends_new_days_into_month_partitions(tmp_path, monkeypatch) -> None:
+    from src.db.history_export import export_history, load_manifest, read_history
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    root = tmp_path / "parquet"
+    _save_day(storage, date(2026, 2, 27), 2)
+    _save_day(storage, date(2026, 3, 2), 3)
+
+    first = export_history(root, through=date(2026, 3, 2))
+    assert (first.files, first.rows) == (6, {"items": 5, "item_departments": 4, "runs": 2})
+    assert (root / "items" / "year=2026" / "month=02" / "part-20260227-20260228.parquet").exists()
+
+    _save_day(storage, date(2026, 3, 3), 1)
+    second = export_history(root, through=date(2026, 3, 3))
+    assert (second.first_day, second.rows["items"]) == (date(2026, 3, 3), 1)
+    assert export_history(root, through=date(2026, 3, 3)).first_day is None
+    assert load_manifest(root)["exported_through"] == "2026-03-03"
+
+    march = read_history("items", columns=["run_date", "title"], start=date(2026, 3, 1), root=root)
+    assert march.column_names == ["run_date", "title"]
+    assert sorted(march.column("run_date").to_pylist()) == [date(2026, 3, 2)] * 3 + [date(2026, 3, 3)]
+    hits = read_history("item_departments", department="isg", end=date(2026, 3, 2), root=root)
+    assert hits.num_rows == 2
+
+    # Re-exporting a day replaces the parts holding it instead of duplicating rows.
+    export_history(root, through=date(2026, 3, 3), since=date(2026, 3, 3))
+    assert read_history("items", root=root).num_rows == 6
@@ -0,0 +1,121 @@
+from datetime import date
+
+from src.pipeline.engine import RunCancelled
+
+
+class _StubWorker:
+    def __init__(self, fail: bool = False, items: int = 0) -> None:
+        self.days: list[date] = []
+        self.fail = fail
+        self.items = items
+        self.last_error = None
+
+    def run_job(self, day, progress=None):
+        self.days.append(day)
+        self.last_error = RuntimeError("boom") if self.fail else None
+        try:
+            for done in range(self.items + 1):
+                if progress is not None:
+                    progress(done, self.items)
+        except RunCancelled as exc:
+            self.last_error = exc
+            return None
+        return None if self.fail else object()
+
+
+def _use_tmp_db(tmp_path, monkeypatch):
+    from src.db import storage
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    return storage
+
+
+def _jobs(storage) -> dict:
+    return {job["id"]: job for job in storage.get_fetch_jobs()}
+
+
+def test_worker_runs_fetch_jobs_queued_by_the_web_process(tmp_path, monkeypatch) -> None:
+    from src.daemon.worker import run_next_fetch_job
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    first, _ = storage.enqueue_fetch_job(date(2026, 3, 5))
+    second, _ = storage.enqueue_fetch_job(date(2026, 3, 6))
+    worker = _StubWorker(items=3)
+
+    assert run_next_fetch_job(worker)  # type: ignore[arg-type]
+    assert run_next_fetch_job(_StubWorker(fail=True))  # type: ignore[arg-type]
+    assert not run_next_fetch_job(worker)  # type: ignore[arg-type]
+
+    assert worker.days == [date(2026, 3, 5)]
+    rows = _jobs(storage)
+    assert rows[first]["status"] == "done"
+    assert (rows[first]["progress_done"], rows[first]["progress_total"]) == (3, 3)
+    assert rows[second]["status"] == "failed"
+    assert rows[second]["error"] == "boom"
+
+
+def test_duplicate_day_requests_merge_and_running_jobs_are_capped(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    job_id, created = storage.enqueue_fetch_job(date(2026, 3, 5))
+    again, created_again = storage.enqueue_fetch_job(date(2026, 3, 5))
+    other, _ = storage.enqueue_fetch_job(date(2026, 3, 6))
+
+    assert created and not created_again
+    assert again == job_id
+    assert _jobs(storage)[job_id]["request_count"] == 2
+
+    assert storage.claim_fetch_job(max_running=1)["id"] == job_id
+    assert storage.claim_fetch_job(max_running=1) is None
+    # Still merged while running.
+    assert storage.enqueue_fetch_job(date(2026, 3, 5)) == (job_id, False)
+    assert storage.claim_fetch_job(max_running=2)["id"] == other
+
+
+def test_cancel_stops_queued_jobs_and_running_jobs_at_the_next_item(tmp_path, monkeypatch) -> None:
+    from src.daemon.worker import run_next_fetch_job
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    queued, _ = storage.enqueue_fetch_job(date(2026, 3, 5))
+    assert storage.cancel_fetch_job(queued) == "cancelled"
+    assert storage.claim_fetch_job() is None
+
+    running, _ = storage.enqueue_fetch_job(date(2026, 3, 5))
+    assert running != queued
+
+    class _CancellingWorker(_StubWorker):
+        def run_job(self, day, progress=None):
+            def cancel_midway(done: int, total: int) -> None:
+                if done == 2:
+                    storage.cancel_fetch_job(running)
+                progress(done, total)
+
+            return super().run_job(day, cancel_midway)
+
+    assert run_next_fetch_job(_CancellingWorker(items=5))  # type: ignore[arg-type]
+    job = _jobs(storage)[running]
+    assert job["status"] == "cancelled"
+    assert job["progress_done"] == 2
+
+
+def test_fetch_jobs_reprocess_every_item_without_touching_the_scheduled_caches(monkeypatch) -> None:
+    from src.daemon import worker as worker_module
+    from src.pipeline.engine import PipelineEngine
+    from src.pipeline.run_daily import default_policies
+
+    calls: list[tuple[PipelineEngine, bool]] = []
+    monkeypatch.setattr(
+        worker_module, "run", lambda *, engine, incremental, **kwargs: calls.append((engine, incremental)) or object()
+    )
+    worker = worker_module.PipelineWorker(PipelineEngine(default_policies()))
+
+    worker.run_once(date(2026, 3, 6), admin_email=False)
+    scheduled_caches = worker.engine.caches
+    worker.run_job(date(2026, 3, 5))
+    worker.run_once(date(2026, 3, 6), admin_email=False)
+
+    (first, first_incremental), (job, job_incremental), (second, _) = calls
+    assert first is second is worker.engine and job is not worker.engine
+    assert (first_incremental, job_incremental) == (True, False)
+    assert job.session is worker.engine.session
+    assert worker.engine.caches is scheduled_caches
@@ -0,0 +1,36 @@
+from src.policies.lexical import LexicalScorer, iter_text_chunks, score_chunks, score_text
+
+
+def test_score_text_uses_policy_weights() -> None:
+    scores = score_text("Bu yönetmelik iş sağlığı ve iş güvenliği hakkındadır.")
+
+    assert scores["isg"].score == 20
+    assert any("sağlığı" in reason for reason in scores["isg"].reasons)
+    assert scores["kvkk"].score == 3  # mid: yönetmelik
+
+
+def test_match_split_across_chunk_boundary_is_found() -> None:
+    text = ("dolgu metni " * 50) + "kişisel verilerin korunması kanunu"
+    split_at = text.index("verilerin") + 3
+
+    scores = score_chunks([text[:split_at], text[split_at:]])
+
+    assert "high:\\bkişisel\\s*verilerin\\s*korunması\\b" in scores["kvkk"].reasons
+
+
+def test_cut_word_does_not_create_false_boundary_match() -> None:
+    # "xvergi" must not match \bvergi\b even when the chunk boundary falls after "x".
+    text = ("dolgu " * 60) + "xvergi"
+    split_at = text.index("vergi")
+
+    scores = score_chunks([text[:split_at], text[split_at:]], overlap=16)
+
+    assert scores["muhasebe"].score == 0
+
+
+def test_scorer_counts_each_rule_once() -> None:
+    scorer = LexicalScorer()
+    for chunk in iter_text_chunks("gümrük " * 2000, chunk_size=100):
+        scorer.feed(chunk)
+
+    assert scorer.scores()["lojistik"].score == 10
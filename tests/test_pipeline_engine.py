@@ -0,0 +1,506 @@
+from datetime import date
+
+from src.app.config import Settings
+from src.core.models import GazetteItem
+from src.llm.ollama_client import MultiDeptDecision
+from src.pipeline.engine import DetailText, IndexPage, PipelineCaches, PipelineEngine
+from src.pipeline.run_daily import default_policies
+
+
+def _settings(**overrides) -> Settings:
+    values = dict(
+        SMTP_HOST="localhost",
+        SMTP_USER="",
+        SMTP_PASSWORD="",
+        MAIL_FROM="test@example.com",
+        ISG_RECIPIENTS="",
+        IK_RECIPIENTS="",
+        MUHASEBE_RECIPIENTS="",
+        LOJISTIK_RECIPIENTS="",
+        MUKERRER_EDITIONS_ENABLED=False,
+    )
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+class _StubOllama:
+    def __init__(self, decision: MultiDeptDecision) -> None:
+        self.decision = decision
+        self.calls = 0
+
+    def classify_multi(self, *, title: str, text: str, url: str = "") -> MultiDeptDecision:
+        self.calls += 1
+        return self.decision
+
+
+def _engine(decision: MultiDeptDecision, texts: dict[str, str]) -> tuple[PipelineEngine, _StubOllama]:
+    ollama = _StubOllama(decision)
+    engine = PipelineEngine(
+        default_policies(),
+        settings=_settings(),
+        session=object(),  # type: ignore[arg-type]
+        ollama=ollama,  # type: ignore[arg-type]
+        caches=PipelineCaches(text=dict(texts)),
+        request_delay_s=0,
+    )
+    return engine, ollama
+
+
+def _page() -> IndexPage:
+    return IndexPage(day=date(2026, 3, 5), url="https://example.com/05.03.2026", html="")
+
+
+def test_engine_routes_confident_llm_decision_to_departments() -> None:
+    item = GazetteItem(title="İş Sağlığı ve Güvenliği Yönetmeliği", url="https://example.com/a", section="YÜRÜTME")
+    md = MultiDeptDecision(True, True, False, False, False, False, 80, "kanıt", "{}")
+    engine, ollama = _engine(md, {item.url: "metin"})
+
+    result = engine.process_items(_page(), [item])
+
+    assert [hit.item for hit in result.hits_by_dept["isg"]] == [item]
+    assert [hit.item for hit in result.hits_by_dept["ik"]] == [item]
+    assert result.hits_by_dept["muhasebe"] == []
+    assert ollama.calls == 1
+
+
+def test_engine_skips_ilan_and_low_confidence_items() -> None:
+    ilan = GazetteItem(title="İhale", url="https://example.com/ilanlar/x", section="İLAN BÖLÜMÜ")
+    weak = GazetteItem(title="Yönetmelik", url="https://example.com/b", section="YÜRÜTME")
+    md = MultiDeptDecision(True, False, False, False, False, False, 10, "", "{}")
+    engine, ollama = _engine(md, {weak.url: "metin"})
+
+    result = engine.process_items(_page(), [ilan, weak])
+
+    assert result.candidate_map[ilan.url].status == "SKIP_ILAN"
+    assert all(not hits for hits in result.hits_by_dept.values())
+    assert ollama.calls == 1
+
+
+def test_incremental_run_skips_items_handled_earlier_the_same_day(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.pipeline import run_daily
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+
+    day = date(2026, 3, 5)
+    html = (
+        '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+        '<div class="fihrist-item"><a href="/a">İş Sağlığı Yönetmeliği</a></div></div>'
+    )
+    md = MultiDeptDecision(False, False, False, False, False, False, 80, "", "{}")
+    engine, ollama = _engine(md, {"https://www.resmigazete.gov.tr/a": "metin"})
+    engine.caches.index["https://www.resmigazete.gov.tr/05.03.2026"] = html
+
+    first = run_daily.run(day, default_policies(), engine=engine, incremental=True)
+    engine.caches.llm.clear()
+    second = run_daily.run(day, default_policies(), engine=engine, incremental=True)
+
+    assert (first.new_items, first.skipped_items) == (1, 0)
+    assert (second.new_items, second.skipped_items) == (0, 1)
+    assert ollama.calls == 1
+    first_stages = {t.stage: t for t in first.stage_timings}
+    assert first_stages["classify"].count == 1
+    assert first_stages["index_fetch"].cache_hits == 1
+    assert storage.get_latest_stage_timings()
+
+
+def test_hits_stored_without_mail_are_mailed_by_a_later_incremental_run(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+    from src.pipeline import run_daily
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["subject"]))
+
+    day = date(2026, 3, 5)
+    html = (
+        '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+        '<div class="fihrist-item"><a href="/a">İş Sağlığı Yönetmeliği</a></div></div>'
+    )
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+    engine, ollama = _engine(md, {"https://www.resmigazete.gov.tr/a": "metin"})
+    engine.settings = _settings(ISG_RECIPIENTS="isg@example.com")
+    engine.caches.index["https://www.resmigazete.gov.tr/05.03.2026"] = html
+
+    stored = run_daily.run(day, default_policies(), engine=engine, incremental=True, notify=False)
+    assert stored.retry_items == 1
+    mailed = run_daily.run(day, default_policies(), engine=engine, incremental=True)
+    again = run_daily.run(day, default_policies(), engine=engine, incremental=True)
+
+    assert (mailed.new_items, mailed.mail_sent, mailed.retry_items) == (1, 1, 0)
+    assert (again.new_items, again.skipped_items) == (0, 1)
+    assert len(sent) == 1 and ollama.calls == 1
+
+
+def test_notify_does_not_resend_items_already_delivered(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["subject"]))
+
+    item = GazetteItem(title="İSG Yönetmeliği", url="https://example.com/a")
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+    engine, _ = _engine(md, {})
+    engine.settings = _settings(ISG_RECIPIENTS="isg@example.com")
+    hits = {"isg": list(engine.route(item, md, DetailText(url=item.url, text="metin")))}
+    day = date(2026, 3, 5)
+
+    first = {r.department: r for r in engine.notify(day, hits)}
+    second = {r.department: r for r in engine.notify(day, hits)}
+
+    assert (first["isg"].status, first["isg"].queued, first["isg"].sent) == ("sent", 1, 1)
+    assert (second["isg"].status, second["isg"].deduplicated) == ("skipped_duplicate", 1)
+    assert len(sent) == 1
+
+
+def test_mail_skipped_for_missing_recipients_goes_out_once_configured(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["subject"]))
+
+    day = date(2026, 3, 5)
+    storage.enqueue_mail("isg", day, [GazetteItem(title="İSG Yönetmeliği", url="https://example.com/a")])
+    for _ in range(storage.OUTBOX_MAX_ATTEMPTS + 1):
+        skipped = outbox.drain_outbox(_settings(), {})
+        assert [d.status for d in skipped] == ["skipped_no_recipients"]
+
+    delivered = outbox.drain_outbox(_settings(), {"isg": ["isg@example.com"]})
+
+    assert [d.status for d in delivered] == ["sent"]
+    assert len(sent) == 1
+    assert storage.get_outbox_counts() == {"sent": 1}
+
+
+def test_send_now_sends_only_the_given_items_even_if_delivered_before(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["subject"]))
+
+    day = date(2026, 3, 5)
+    item = GazetteItem(title="İSG Yönetmeliği", url="https://example.com/a")
+    recipients = {"isg": ["isg@example.com"]}
+    storage.enqueue_mail("isg", day, [item])
+    outbox.drain_outbox(_settings(), recipients)
+    storage.enqueue_mail("isg", date(2026, 3, 4), [GazetteItem(title="Eski", url="https://example.com/old")])
+
+    deliveries = outbox.send_now(_settings(), recipients, day, {"isg": [item]})
+
+    assert [(d.status, len(d.items)) for d in deliveries] == [("sent", 1)]
+    assert len(sent) == 2
+    assert storage.get_outbox_counts() == {"sent": 1, "queued": 1}
+
+
+def test_run_streams_item_results_and_a_restart_reuses_stored_decisions(tmp_path, monkeypatch) -> None:
+    import pytest
+
+    from src.db import storage
+    from src.pipeline import run_daily
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+
+    day = date(2026, 3, 5)
+    html = (
+        '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+        '<div class="fihrist-item"><a href="/a">İş Sağlığı Yönetmeliği</a></div>'
+        '<div class="fihrist-item"><a href="/b">Çalışma Süreleri Yönetmeliği</a></div></div>'
+    )
+    texts = {"https://www.resmigazete.gov.tr/a": "metin", "https://www.resmigazete.gov.tr/b": "metin"}
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+
+    def crash_after_first(done: int, total: int) -> None:
+        if done == 1:
+            raise RuntimeError("worker killed")
+
+    crashed, _ = _engine(md, texts)
+    crashed.caches.index["https://www.resmigazete.gov.tr/05.03.2026"] = html
+    with pytest.raises(RuntimeError):
+        run_daily.run(day, default_policies(), engine=crashed, progress=crash_after_first)
+
+    assert storage.get_day_progress(day) == {"classified": 1, "parsed": 1}
+
+    restarted, ollama = _engine(md, texts)
+    restarted.caches.index["https://www.resmigazete.gov.tr/05.03.2026"] = html
+    report = run_daily.run(day, default_policies(), engine=restarted, notify=False)
+
+    assert ollama.calls == 1
+    assert report.hit_counts["isg"] == 2
+    assert storage.get_day_progress(day) == {"classified": 2}
+
+
+def test_a_later_run_keeps_the_stored_raw_llm_output(tmp_path, monkeypatch) -> None:
+    import json
+
+    from src.db import storage
+    from src.pipeline import run_daily
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    day = date(2026, 3, 5)
+    url = "https://www.resmigazete.gov.tr/a"
+    html = (
+        '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+        '<div class="fihrist-item"><a href="/a">İş Sağlığı Yönetmeliği</a></div></div>'
+    )
+    raw = '{"isg": true, "confidence": 80}'
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "6331", raw)
+
+    # Two runs on fresh engines (a restart, a manual fetch job): the second restores the decision.
+    for _ in range(2):
+        engine, _ = _engine(md, {url: "metin"})
+        engine.caches.index["https://www.resmigazete.gov.tr/05.03.2026"] = html
+        run_daily.run(day, default_policies(), engine=engine, notify=False)
+
+    assert storage.get_artifacts([url])[url].decision["raw"] == raw
+    # The upsert also never replaces a full decision with a raw-less one.
+    item = GazetteItem(title="İş Sağlığı Yönetmeliği", url=url)
+    restored = json.dumps({**json.loads(storage.get_stored_decisions(day)[url]), "degraded": ""})
+    storage.save_item_outcomes(day, [{"item": item, "stage": "classified", "departments": {"isg"}, "decision": restored}])
+    assert storage.get_artifacts([url])[url].decision["raw"] == raw
+
+
+def test_likely_hits_are_classified_first_but_reported_in_page_order() -> None:
+    annex = GazetteItem(title="Ek Liste", url="https://example.com/ek.pdf", section="İLAN DIŞI")
+    plain = GazetteItem(title="Yönetmelik", url="https://example.com/b", section="YÜRÜTME VE İDARE BÖLÜMÜ")
+    isg = GazetteItem(title="İş Sağlığı ve Güvenliği Yönetmeliği", url="https://example.com/c", section="YÜRÜTME")
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+    engine, _ = _engine(md, {plain.url: "metin"})
+    seen: list[str] = []
+
+    assert engine.prioritize([annex, plain, isg]) == [plain, isg, annex]  # cached first
+    engine.caches.text[isg.url] = "metin"
+    assert engine.prioritize([annex, plain, isg]) == [isg, plain, annex]
+
+    result = engine.process_items(_page(), [annex, plain, isg], on_outcome=lambda o: seen.append(o.item.url))
+
+    assert seen[0] == isg.url
+    assert [hit.item for hit in result.hits_by_dept["isg"]] == [plain, isg]
+
+
+def test_early_dispatch_mails_confident_hits_before_the_run_ends(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["subject"]))
+
+    item = GazetteItem(title="İSG Yönetmeliği", url="https://example.com/a")
+    md = MultiDeptDecision(True, False, False, False, False, False, 90, "", "{}")
+    engine, _ = _engine(md, {item.url: "metin"})
+    engine.settings = _settings(
+        ISG_RECIPIENTS="isg@example.com", EARLY_DISPATCH_MIN_CONFIDENCE=85, EARLY_DISPATCH_WINDOW_SECONDS=0
+    )
+    day = date(2026, 3, 5)
+    early = engine.early_dispatcher(day)
+    assert early is not None
+
+    result = engine.process_items(_page(), [item], on_outcome=early.add)
+    assert len(sent) == 1  # before notify
+
+    results = {r.department: r for r in engine.notify(day, result.hits_by_dept, early=early)}
+    assert len(sent) == 1
+    assert (results["isg"].status, results["isg"].queued, results["isg"].sent) == ("sent", 1, 1)
+
+
+def test_early_dispatch_batches_urgent_hits_into_one_mail_per_department(tmp_path, monkeypatch) -> None:
+    from src.db import storage
+    from src.notify import outbox
+    from src.pipeline.engine import EarlyDispatcher
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    sent: list[str] = []
+    monkeypatch.setattr(outbox, "send_html_email", lambda **kwargs: sent.append(kwargs["recipients"][0]))
+
+    items = [GazetteItem(title=f"İSG Yönetmeliği {k}", url=f"https://example.com/{k}") for k in range(5)]
+    md = MultiDeptDecision(True, True, False, False, False, False, 90, "", "{}")
+    engine, _ = _engine(md, {it.url: "metin" for it in items})
+    engine.settings = _settings(ISG_RECIPIENTS="isg@example.com", IK_RECIPIENTS="ik@example.com")
+    now = [0.0]
+    day = date(2026, 3, 5)
+    early = EarlyDispatcher(engine, day, min_confidence=85, window_s=10, clock=lambda: now[0])
+
+    outcomes = []
+    for k, item in enumerate(items):
+        now[0] = [0, 1, 2, 12, 13][k]  # the fourth outcome closes the window
+        outcome = engine.process_item(item)
+        outcomes.append(outcome)
+        early.add(outcome)
+
+    # One early mail per department with the four hits queued so far, not one per hit.
+    assert sorted(sent) == ["ik@example.com", "isg@example.com"]
+    assert [len(d.items) for d in early.deliveries] == [4, 4]
+
+    hits = {dept: [h for o in outcomes for h in o.hits if h.department == dept] for dept in ("isg", "ik")}
+    results = {r.department: r for r in engine.notify(day, hits, early=early)}
+    assert len(sent) == 4  # the final digest carries only the fifth hit
+    assert (results["isg"].queued, results["isg"].deduplicated) == (5, 0)
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.encoding = "utf-8"
+
+    def raise_for_status(self) -> None:
+        import requests
+
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)  # type: ignore[arg-type]
+
+
+class _FakeSession:
+    def __init__(self, pages: dict[str, str], statuses: dict[str, int] | None = None) -> None:
+        self.pages = pages
+        self.statuses = statuses or {}
+        self.requested: list[str] = []
+
+    def get(self, url: str, timeout: int = 30) -> _FakeResponse:
+        self.requested.append(url)
+        if url in self.statuses:
+            return _FakeResponse(self.statuses[url])
+        return _FakeResponse(200, self.pages[url]) if url in self.pages else _FakeResponse(404)
+
+
+def test_collect_items_merges_mukerrer_editions_without_duplicates() -> None:
+    day = date(2026, 3, 5)
+    main_html = (
+        '<div id="html-content"><div class="html-title">YÜRÜTME BÖLÜMÜ</div>'
+        '<div class="fihrist-item"><a href="/a">Ana Sayı Yönetmeliği</a></div></div>'
+    )
+    m1_html = (
+        "<html><body><p>YÜRÜTME VE İDARE BÖLÜMÜ</p><p>YÖNETMELİKLER</p>"
+        '<p>–– <a href="20260305M1-1.htm">Mükerrer Yönetmelik</a></p>'
+        '<p>–– <a href="https://www.resmigazete.gov.tr/a">Ana Sayı Yönetmeliği</a></p></body></html>'
+    )
+    session = _FakeSession(
+        {
+            "https://www.resmigazete.gov.tr/05.03.2026": main_html,
+            "https://www.resmigazete.gov.tr/eskiler/2026/03/20260305M1.htm": m1_html,
+        }
+    )
+    md = MultiDeptDecision(False, False, False, False, False, False, 0, "", "{}")
+    engine = PipelineEngine(
+        default_policies(),
+        settings=_settings(MUKERRER_EDITIONS_ENABLED=True),
+        session=session,  # type: ignore[arg-type]
+        ollama=_StubOllama(md),  # type: ignore[arg-type]
+        request_delay_s=0,
+    )
+
+    page, items = engine.collect_items(day)
+
+    assert page.edition == ""
+    assert [(it.title, it.edition) for it in items] == [
+        ("Ana Sayı Yönetmeliği", ""),
+        ("Mükerrer Yönetmelik", "M1"),
+    ]
+    assert items[1].section == "YÜRÜTME VE İDARE BÖLÜMÜ"
+    # M1 found by probing, M2 missing; M1 was fetched once and served from the cache.
+    assert session.requested.count("https://www.resmigazete.gov.tr/eskiler/2026/03/20260305M1.htm") == 1
+    assert session.requested[-1].endswith("20260305M2.htm")
+
+
+def test_main_index_without_content_block_yields_no_items() -> None:
+    from src.gazette.parser import parse_daily_items
+
+    html = (
+        '<html><body><p><a href="/kvkk.htm">KVKK Aydınlatma Metni</a></p>'
+        '<p><a href="/eskiler/2026/03/20260304.pdf">Önceki Sayı</a></p></body></html>'
+    )
+
+    assert parse_daily_items(html, "https://www.resmigazete.gov.tr/05.03.2026") == []
+    assert [it.edition for it in parse_daily_items(html, "https://www.resmigazete.gov.tr/x", edition="M1")]
+
+
+def test_edition_probes_skip_errors_and_remember_misses(monkeypatch) -> None:
+    from src.pipeline import engine as engine_module
+
+    day = date(2026, 3, 5)
+    m = "https://www.resmigazete.gov.tr/eskiler/2026/03/20260305M{}.htm"
+    session = _FakeSession(
+        {"https://www.resmigazete.gov.tr/05.03.2026": "<html></html>", m.format(2): "<html></html>"},
+        statuses={m.format(1): 503},
+    )
+    engine = PipelineEngine(
+        default_policies(),
+        settings=_settings(MUKERRER_EDITIONS_ENABLED=True),
+        session=session,  # type: ignore[arg-type]
+        request_delay_s=0,
+    )
+    now = [1000.0]
+    monkeypatch.setattr(engine_module, "monotonic", lambda: now[0])
+    main = engine.fetch_index(day)
+
+    # M1 failed with a server error, so probing went on to M2 (found) and M3 (404).
+    assert [e.name for e in engine.discover_editions(main)] == ["M2"]
+    assert session.requested[1:] == [m.format(1), m.format(2), m.format(3)]
+
+    # The next run probes M1 again but not the M3 that was missing minutes ago.
+    del session.statuses[m.format(1)]
+    session.pages[m.format(1)] = "<html></html>"
+    session.requested.clear()
+    now[0] += 60
+    engine.caches.index.clear()
+    assert [e.name for e in engine.discover_editions(main)] == ["M1", "M2"]
+    assert session.requested == [m.format(1), m.format(2)]
+
+    now[0] += engine_module.EDITION_MISS_TTL_SECONDS
+    session.requested.clear()
+    engine.discover_editions(main)
+    assert session.requested[-1] == m.format(3)
+
+
+def test_run_budget_degrades_then_defers_remaining_items(monkeypatch) -> None:
+    from src.pipeline import engine as engine_module
+    from src.pipeline.budget import RunBudget
+    from src.pipeline.run_daily import item_state
+
+    ocr_flags: list[bool] = []
+    monkeypatch.setattr(
+        engine_module, "fetch_detail_text", lambda session, url, ocr=True: ocr_flags.append(ocr) or "metin"
+    )
+    full = GazetteItem(title="İSG Yönetmeliği", url="https://example.com/a", section="YÜRÜTME")
+    scanned = GazetteItem(title="İSG Tebliği", url="https://example.com/b.pdf", section="YÜRÜTME")
+    title_only = GazetteItem(title="İSG Genelgesi", url="https://example.com/c", section="YÜRÜTME")
+    deferred = GazetteItem(title="İSG Kararı", url="https://example.com/d", section="YÜRÜTME")
+    md = MultiDeptDecision(True, False, False, False, False, False, 80, "", "{}")
+    engine, ollama = _engine(md, {full.url: "metin", title_only.url: "metin"})
+    engine.settings.priority_scheduling_enabled = False
+    # Start, then one reading per item: 0%, 65%, 85%, 96% of a 100s budget.
+    budget = RunBudget(100, clock=iter([0, 0, 65, 85, 96]).__next__)
+
+    result = engine.process_items(_page(), [full, scanned, title_only, deferred], budget=budget)
+
+    by_url = {o.item.url: o for o in result.outcomes}
+    assert [by_url[it.url].degraded for it in (full, scanned, title_only)] == ["", "text_layer", "title_only"]
+    assert by_url[deferred.url].status == "deferred"
+    assert ocr_flags == [False]
+    assert ollama.calls == 3
+    # Hits found so far are still routed (and mailed); degraded ones are retried next run.
+    assert [hit.item for hit in result.hits_by_dept["isg"]] == [full, scanned, title_only]
+    assert set(engine.caches.llm) == {full.url}
+    assert scanned.url not in engine.caches.text
+    assert [item_state(by_url[it.url]) for it in (full, scanned, title_only, deferred)] == [
+        "mailed",
+        "degraded",
+        "degraded",
+        "deferred",
+    ]
@@ -0,0 +1,46 @@
+from datetime import date
+
+import pytest
+
+from src.pipeline.lease import LeaseHeld, LeaseLost, RunLease
+
+
+def _use_tmp_db(tmp_path, monkeypatch):
+    from src.db import storage
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    return storage
+
+
+def test_only_one_worker_holds_a_day_and_expired_leases_are_taken_over(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    day = date(2026, 3, 5)
+
+    with RunLease(day, owner="a"):
+        with pytest.raises(LeaseHeld):
+            RunLease(day, owner="b").acquire()
+        with RunLease(date(2026, 3, 6), owner="b"):
+            pass  # other days are free
+    assert storage.get_run_lease(day) is None
+
+    stalled = RunLease(day, ttl_s=-1, owner="a")
+    stalled.acquire()
+    assert storage.acquire_run_lease(day, "b", ttl_s=60)
+    assert not storage.renew_run_lease(day, "a", ttl_s=60)
+    stalled.lost = True  # what the heartbeat sets when its renewal fails
+    with pytest.raises(LeaseLost):
+        stalled.check()
+    stalled.release()
+    assert storage.get_run_lease(day)["owner"] == "b"
+
+
+def test_queued_jobs_for_a_leased_day_wait_while_other_days_run(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    busy, _ = storage.enqueue_fetch_job(date(2026, 3, 5))
+    free, _ = storage.enqueue_fetch_job(date(2026, 3, 6))
+
+    with RunLease(date(2026, 3, 5), owner="hourly"):
+        assert storage.claim_fetch_job(max_running=2)["id"] == free
+        assert storage.claim_fetch_job(max_running=2) is None
+    assert storage.claim_fetch_job(max_running=2)["id"] == busy
@@ -0,0 +1,34 @@
+from datetime import date, datetime, time, timedelta
+
+from src.daemon.schedule import AdaptiveSchedule, ScheduleConfig
+
+
+def test_schedule_polls_densely_until_published_then_backs_off() -> None:
+    schedule = AdaptiveSchedule(ScheduleConfig(window_start=time(0, 0), window_end=time(3, 0)))
+    day = date(2026, 3, 5)
+    in_window = datetime(2026, 3, 5, 0, 10)
+
+    assert schedule.next_run_at(in_window) == in_window + timedelta(minutes=5)
+
+    schedule.record(day, None)  # index not online yet
+    assert schedule.next_run_at(in_window) == in_window + timedelta(minutes=5)
+
+    schedule.record(day, 40, retry_items=2)
+    assert schedule.status(day).published and not schedule.status(day).complete
+    assert schedule.next_run_at(datetime(2026, 3, 5, 9, 0)) == datetime(2026, 3, 5, 9, 15)
+
+    schedule.record(day, 40, retry_items=0)
+    assert schedule.next_run_at(datetime(2026, 3, 5, 9, 0)) == datetime(2026, 3, 5, 11, 0)
+    # Sparse checks never run past the next publication window.
+    assert schedule.next_run_at(datetime(2026, 3, 5, 23, 0)) == datetime(2026, 3, 6, 0, 0)
+    # A failed run later in the day does not undo the publication.
+    schedule.record(day, None)
+    assert schedule.status(day).published
+
+
+def test_window_spanning_midnight() -> None:
+    schedule = AdaptiveSchedule(ScheduleConfig(window_start=time(23, 50), window_end=time(2, 0)))
+
+    assert schedule.in_window(datetime(2026, 3, 5, 23, 55))
+    assert schedule.in_window(datetime(2026, 3, 6, 1, 0))
+    assert not schedule.in_window(datetime(2026, 3, 6, 2, 0))
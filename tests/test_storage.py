@@ -0,0 +1,397 @@
+import sqlite3
+import threading
+from datetime import date
+
+from src.core.models import GazetteItem
+
+
+def _use_tmp_db(tmp_path, monkeypatch):
+    from src.db import storage
+
+    monkeypatch.setattr(storage, "DB_DIR", tmp_path)
+    monkeypatch.setattr(storage, "DB_PATH", tmp_path / "items.db")
+    return storage
+
+
+def test_schema_is_migrated_once_and_upgrades_unversioned_databases(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    # A database from before schema versioning: items table without the newer columns.
+    legacy = sqlite3.connect(tmp_path / "items.db")
+    legacy.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, run_date TEXT NOT NULL, "
+        "title TEXT NOT NULL, url TEXT NOT NULL, section TEXT DEFAULT '', subsection TEXT DEFAULT '', "
+        "inserted_at TEXT NOT NULL)"
+    )
+    legacy.commit()
+    legacy.close()
+
+    day = date(2026, 3, 5)
+    storage.save_parsed_items(day, [GazetteItem(title="Yönetmelik", url="https://example.com/a", edition="M1")])
+    storage.get_items()
+
+    conn = sqlite3.connect(tmp_path / "items.db")
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_version")]
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    assert versions == [version for version, _ in storage.MIGRATIONS]
+    assert journal_mode == "wal"
+    assert storage.get_items()[0]["edition"] == "M1"
+
+
+def test_threads_write_concurrently_on_their_own_connections(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    day = date(2026, 3, 5)
+    errors: list[Exception] = []
+
+    def write(n: int) -> None:
+        try:
+            for k in range(20):
+                storage.save_parsed_items(day, [GazetteItem(title=f"{n}-{k}", url=f"https://example.com/{n}/{k}")])
+                storage.get_day_progress(day)
+        except Exception as exc:  # pragma: no cover - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert storage.get_day_progress(day) == {"parsed": 80}
+
+
+def test_sequential_web_requests_on_new_threads_reuse_one_connection(tmp_path, monkeypatch) -> None:
+    from src.app.web import app
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    storage.save_parsed_items(date(2026, 3, 5), [GazetteItem(title="Yönetmelik", url="https://example.com/a")])
+    storage.release_connection()
+    opened: list[sqlite3.Connection] = []
+    connect = sqlite3.connect
+    monkeypatch.setattr(storage.sqlite3, "connect", lambda *a, **kw: opened.append(connect(*a, **kw)) or opened[-1])
+    statuses: list[int] = []
+
+    # Like Flask's threaded server: every request on a thread of its own.
+    for _ in range(2):
+        thread = threading.Thread(target=lambda: statuses.append(app.test_client().get("/api/items").status_code))
+        thread.start()
+        thread.join()
+
+    assert statuses == [200, 200]
+    assert opened == []
+
+
+def test_bulk_upsert_reports_inserted_and_updated_rows(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    first, second = date(2026, 3, 5), date(2026, 3, 6)
+    a = GazetteItem(title="A", url="https://example.com/a")
+    b = GazetteItem(title="B", url="https://example.com/b")
+
+    assert storage.upsert_items([(first, a, ()), (second, a, ("isg",))]) == (2, 0)
+    assert storage.save_items(first, [a, b], {a.url: {"ik", "kvkk"}}) == (1, 1)
+
+    rows = {(r["run_date"], r["url"]): r for r in storage.get_items()}
+    assert rows[("2026-03-05", a.url)]["departments"] == ["ik", "kvkk"]
+    assert rows[("2026-03-06", a.url)]["departments"] == ["isg"]
+    assert rows[("2026-03-05", b.url)]["departments"] == []
+
+
+def test_department_counts_and_filters_come_from_the_hit_table(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    # A pre-migration row with a legacy dept_* flag is carried over.
+    legacy = sqlite3.connect(tmp_path / "items.db")
+    legacy.execute(
+        "CREATE TABLE items (id INTEGER PRIMARY KEY AUTOINCREMENT, run_date TEXT NOT NULL, title TEXT NOT NULL, "
+        "url TEXT NOT NULL, section TEXT DEFAULT '', subsection TEXT DEFAULT '', dept_isg INTEGER DEFAULT 0, "
+        "inserted_at TEXT NOT NULL)"
+    )
+    legacy.execute("INSERT INTO items (run_date, title, url, dept_isg, inserted_at) VALUES ('2026-03-04', 'Eski', 'u0', 1, '')")
+    legacy.commit()
+    legacy.close()
+
+    day = date(2026, 3, 5)
+    isg = GazetteItem(title="İSG Yönetmeliği", url="u1")
+    other = GazetteItem(title="Enerji Tebliği", url="u2")
+    storage.save_item_outcomes(
+        day,
+        [
+            {"item": isg, "stage": "classified", "departments": {"isg", "ik"}, "confidence": 80, "evidence": "6331"},
+            {"item": other, "stage": "classified", "departments": {"enerji"}, "confidence": 70},
+        ],
+    )
+
+    counts = storage.get_department_counts()
+    assert (counts["isg"], counts["ik"], counts["enerji"], counts["kvkk"]) == (2, 1, 1, 0)
+    assert storage.get_department_counts(start=day)["isg"] == 1
+    assert [r["url"] for r in storage.get_items(department="isg")] == ["u1", "u0"]
+    assert [r["url"] for r in storage.get_items(department="enerji", search="tebliği")] == ["u2"]
+
+
+def test_search_ignores_turkish_casing_and_finds_detail_text(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    day = date(2026, 3, 5)
+    isg = GazetteItem(title="İŞ SAĞLIĞI VE GÜVENLİĞİ YÖNETMELİĞİ", url="https://example.com/isg")
+    kdv = GazetteItem(title="Katma Değer Vergisi Tebliği", url="https://example.com/kdv")
+    storage.save_parsed_items(day, [isg, kdv])
+    storage.save_item_outcomes(
+        day,
+        [{"item": kdv, "stage": "classified", "departments": set(), "text": "Bu tebliğ ile iş sağlığı kurulları..."}],
+    )
+
+    results = storage.get_items(search="is sagligi")
+
+    assert [r["url"] for r in results] == [isg.url, kdv.url]  # title match ranks first
+    assert results[0]["snippet"] == ""
+    assert "iş sağlığı" in results[1]["snippet"]
+    assert [r["url"] for r in storage.search_items("güvenliği yönet")] == [isg.url]
+    assert storage.search_items("!!") == []
+
+
+def test_detail_texts_and_decisions_are_stored_compressed(tmp_path, monkeypatch) -> None:
+    from src.core.compress import pack_text, unpack_text
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    assert pack_text("") is None and unpack_text(None) == ""
+    assert unpack_text(pack_text("İş sağlığı")) == "İş sağlığı"
+    assert unpack_text(pack_text("ğüşiöç" * 1000), max_chars=5) == "ğüşiö"
+
+    day = date(2026, 3, 5)
+    item = GazetteItem(title="Tebliğ", url="https://example.com/t")
+    text = "Bu tebliğ ile iş sağlığı ve güvenliği kurulları düzenlenmiştir. " * 200
+    decision = '{"isg": true, "confidence": 80, "raw": "{...}"}'
+    storage.save_item_outcomes(
+        day, [{"item": item, "stage": "classified", "departments": {"isg"}, "text": text, "decision": decision}]
+    )
+    # A later text-less outcome (e.g. a decision restored from the cache) keeps the stored artifact.
+    storage.save_item_outcomes(day, [{"item": item, "stage": "classified", "departments": {"isg"}}])
+
+    artifact = storage.get_artifacts([item.url, "missing"])[item.url]
+    assert list(storage.get_artifacts([item.url, "missing"])) == [item.url]
+    assert artifact.text == text and artifact.text_chars == len(text)
+    assert artifact.decision == {"isg": True, "confidence": 80, "raw": "{...}"}
+    assert artifact.stored_bytes < len(text) // 10
+    assert [r["url"] for r in storage.search_items("kurulları")] == [item.url]
+    assert storage.get_day_items(day)[0]["departments"] == ["isg"]
+
+
+def test_rewriting_an_unchanged_artifact_does_not_touch_the_search_index(tmp_path, monkeypatch) -> None:
+    from src.core.compress import unpack_text
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    # Texts the search triggers decompressed (decisions are unpacked by the upsert itself).
+    unpacked: list[str] = []
+
+    def recording_unpack(blob, *args) -> str:
+        text = unpack_text(blob, *args)
+        if not text.startswith("{"):
+            unpacked.append(text)
+        return text
+
+    monkeypatch.setattr(storage, "unpack_text", recording_unpack)
+    day = date(2026, 3, 5)
+    item = GazetteItem(title="Tebliğ", url="https://example.com/t")
+    outcome = {"item": item, "stage": "classified", "departments": set(), "text": "kurul kararı", "decision": "{}"}
+    storage.save_item_outcomes(day, [outcome])
+    updated_at = storage.get_artifacts([item.url])[item.url].updated_at
+    unpacked.clear()
+
+    storage.save_item_outcomes(day, [outcome])
+    assert unpacked == []
+    assert storage.get_artifacts([item.url])[item.url].updated_at == updated_at
+
+    storage.save_item_outcomes(day, [{**outcome, "decision": '{"isg": false}'}])
+    assert unpacked == []
+    storage.save_item_outcomes(day, [{**outcome, "text": "yeni metin"}])
+    assert unpacked == ["yeni metin"]
+    assert [r["url"] for r in storage.search_items("yeni")] == [item.url]
+
+
+def test_item_text_rows_move_to_artifacts(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    day = date(2026, 3, 5)
+    item = GazetteItem(title="Tebliğ", url="https://example.com/t")
+    storage.save_parsed_items(day, [item])
+    # Roll the schema back to version 3, where detail texts lived in item_text.
+    storage.close_connections()
+    conn = sqlite3.connect(tmp_path / "items.db")
+    conn.executescript(
+        "DROP TABLE item_artifacts; DELETE FROM schema_version WHERE version >= 4;"
+        "CREATE TABLE item_text (url TEXT PRIMARY KEY, text TEXT NOT NULL, updated_at TEXT NOT NULL);"
+        "INSERT INTO item_text VALUES ('https://example.com/t', 'eski metin kurul kararı', '');"
+    )
+    conn.close()
+    monkeypatch.setattr(storage, "_migrated", set())
+
+    assert storage.get_artifacts([item.url])[item.url].text == "eski metin kurul kararı"
+    with storage._db() as conn:
+        assert conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'item_text'").fetchone() is None
+
+
+def test_keyset_pages_walk_the_whole_history(tmp_path, monkeypatch) -> None:
+    from src.app.web import app
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    for n in range(20):
+        items = [GazetteItem(title=f"Madde {n}-{k}", url=f"https://example.com/{n}/{k}") for k in range(3)]
+        storage.save_items(date(2026, 3, 1 + n), items, {items[0].url: {"isg"}} if n < 5 else {})
+    client = app.test_client()
+
+    seen, cursor, pages = [], "", 0
+    while True:
+        pages += 1
+        page = client.get(f"/api/items?limit=50&cursor={cursor}").get_json()
+        seen.extend((r["run_date"], r["id"]) for r in page["items"])
+        assert "Madde" in page["html"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert pages == 2 and len(seen) == 60 and seen == sorted(set(seen), reverse=True)
+
+    first = storage.get_items(limit=2, department="isg")
+    rest = storage.get_items(limit=10, department="isg", before=(first[-1]["run_date"], first[-1]["id"]))
+    assert [r["run_date"] for r in first + rest] == [f"2026-03-0{d}" for d in (5, 4, 3, 2, 1)]
+    assert client.get("/api/items?cursor=bad").status_code == 400
+
+
+def test_daily_stats_are_refreshed_per_day_and_accumulate_llm_calls(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    day = date(2026, 3, 5)
+    isg = GazetteItem(title="İSG Yönetmeliği", url="u1")
+    skipped = GazetteItem(title="İlan", url="u2")
+    storage.save_parsed_items(day, [isg, skipped, GazetteItem(title="Bekleyen", url="u3")])
+    storage.save_item_outcomes(
+        day,
+        [
+            {"item": isg, "stage": "classified", "departments": {"isg", "ik"}, "confidence": 80},
+            {"item": skipped, "stage": "skipped", "departments": set()},
+        ],
+    )
+
+    storage.refresh_daily_stats(day, llm_calls=1)
+    storage.refresh_daily_stats(day, llm_calls=2)
+    storage.refresh_daily_stats(date(2026, 3, 6))
+
+    rows = storage.get_daily_stats(start=day, end=day)
+    assert len(rows) == 1
+    row = rows[0]
+    assert (row["items_found"], row["candidates"], row["classified"], row["hit_items"]) == (3, 1, 1, 1)
+    assert (row["llm_calls"], row["runs"]) == (3, 2)
+    assert (row["departments"]["isg"], row["departments"]["ik"], row["departments"]["kvkk"]) == (1, 1, 0)
+    assert [r["run_date"] for r in storage.get_daily_stats()] == ["2026-03-06", "2026-03-05"]
+
+
+def test_old_items_move_to_yearly_archives_and_stay_queryable(tmp_path, monkeypatch) -> None:
+    from src.daemon.maintenance import retention_cutoff
+
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    old = GazetteItem(title="Eski İSG Yönetmeliği", url="https://example.com/old")
+    shared = GazetteItem(title="Tekrar yayımlanan", url="https://example.com/shared")
+    mid = GazetteItem(title="Geçen yılın tebliği", url="https://example.com/mid")
+    new = GazetteItem(title="Yeni Tebliğ", url="https://example.com/new")
+    storage.save_item_outcomes(
+        date(2024, 6, 1),
+        [
+            {"item": old, "stage": "classified", "departments": {"isg"}, "text": "eski metin"},
+            {"item": shared, "stage": "classified", "departments": set(), "text": "ortak metin"},
+        ],
+    )
+    storage.save_item_outcomes(date(2025, 2, 1), [{"item": mid, "stage": "classified", "departments": set()}])
+    storage.save_item_outcomes(
+        date(2026, 3, 5),
+        [
+            {"item": new, "stage": "classified", "departments": {"ik"}},
+            {"item": shared, "stage": "classified", "departments": set()},
+        ],
+    )
+
+    cutoff = retention_cutoff(date(2026, 3, 19), 12)
+    assert cutoff == date(2025, 3, 1)
+    assert storage.archive_items_before(cutoff) == {2024: 2, 2025: 1}
+    assert storage.archive_items_before(cutoff) == {}
+
+    assert [r["url"] for r in storage.get_items()] == [shared.url, new.url]
+    assert storage.search_items("eski") == []
+    assert storage.get_department_counts()["isg"] == 0
+    # Only the artifact no kept item points at leaves the main database.
+    assert list(storage.get_artifacts([old.url, shared.url])) == [shared.url]
+    assert storage.archive_years() == [2024, 2025]
+    archived = storage.get_archived_items(department="isg")
+    assert [(r["url"], r["departments"]) for r in archived] == [(old.url, ["isg"])]
+    assert [r["run_date"] for r in storage.get_archived_items(limit=2)] == ["2025-02-01", "2024-06-01"]
+
+    before, after = storage.compact_db()
+    assert after <= before
+    assert not storage.maintenance_due("vacuum", 7)
+
+
+def test_compaction_frees_pages_in_steps_and_full_vacuum_converts_old_files(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    monkeypatch.setattr(storage, "VACUUM_STEP_PAGES", 16)
+    day = date(2026, 3, 5)
+    items = [GazetteItem(title=f"Madde {n}", url=f"https://example.com/{n}") for n in range(200)]
+    storage.save_item_outcomes(
+        day, [{"item": it, "stage": "classified", "departments": set(), "text": f"{it.url} " * 500} for it in items]
+    )
+    with storage._db() as conn:
+        conn.execute("DELETE FROM item_artifacts")
+        conn.execute("DELETE FROM items")
+    assert storage.incremental_vacuum_enabled()
+
+    before, after = storage.compact_db()
+    assert after < before
+    with storage._db() as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+    # A file from before incremental mode: only a full VACUUM switches it over.
+    storage.close_connections()
+    legacy = tmp_path / "legacy.db"
+    conn = sqlite3.connect(legacy)
+    conn.executescript("CREATE TABLE t (x); INSERT INTO t VALUES (1);")
+    conn.close()
+    monkeypatch.setattr(storage, "DB_PATH", legacy)
+    assert not storage.incremental_vacuum_enabled()
+    storage.compact_db(full=True)
+    assert storage.incremental_vacuum_enabled()
+
+
+def test_mail_log_is_rotated_and_gzipped(tmp_path, monkeypatch) -> None:
+    import gzip
+
+    from src.notify import mail_log
+
+    monkeypatch.setattr(mail_log, "LOG_DIR", tmp_path)
+    monkeypatch.setattr(mail_log, "JSONL_PATH", tmp_path / "mail_events.jsonl")
+    mail_log.JSONL_PATH.write_text('{"status": "sent"}\n' * 100, encoding="utf-8")
+    for stamp in ("20250101-000000", "20250201-000000"):
+        (tmp_path / f"mail_events-{stamp}.jsonl.gz").write_bytes(gzip.compress(b""))
+
+    assert mail_log.rotate_mail_log(max_bytes=10_000, keep_files=2) is None
+    archive = mail_log.rotate_mail_log(max_bytes=1000, keep_files=2)
+
+    assert archive is not None and not mail_log.JSONL_PATH.exists()
+    assert gzip.decompress(archive.read_bytes()).count(b"sent") == 100
+    assert sorted(p.name for p in tmp_path.glob("*.gz")) == ["mail_events-20250201-000000.jsonl.gz", archive.name]
+
+
+def test_latest_items_read_model_joins_hits_and_filters(tmp_path, monkeypatch) -> None:
+    storage = _use_tmp_db(tmp_path, monkeypatch)
+    assert storage.get_latest_run_id() is None
+    first, second = date(2026, 3, 5), date(2026, 3, 6)
+    a = GazetteItem(title="A", url="u1")
+    b = GazetteItem(title="B", url="u2")
+    storage.save_item_outcomes(
+        first, [{"item": a, "stage": "classified", "departments": {"isg"}, "confidence": 80, "evidence": "6331"}]
+    )
+    storage.save_item_outcomes(second, [{"item": b, "stage": "classified", "departments": {"ik"}, "confidence": 60}])
+    run_id = storage.save_run_log(second, 1)
+
+    latest = storage.get_latest_items(10)
+    assert [r["url"] for r in latest] == ["u2", "u1"]
+    assert latest[1]["hits"] == [{"department": "isg", "confidence": 80, "evidence": "6331"}]
+    assert [r["url"] for r in storage.get_latest_items(10, department="isg")] == ["u1"]
+    assert [r["url"] for r in storage.get_latest_items(10, day=second)] == ["u2"]
+    assert storage.get_latest_items(10, department="isg", day=second) == []
+    assert [r["url"] for r in storage.get_latest_items(10, department="isg", day=first)] == ["u1"]
+    assert "hits" not in storage.get_items(10)[0]
+    assert storage.get_latest_run_id() == run_id